@@ -1,12 +1,14 @@
 import os
 from flask import Flask, redirect, url_for, render_template
-from src.utils.database import init_db
+from src.utils.database import init_db, set_meta_value
 from src.auth.security import init_login_manager, limiter
 from src.auth.routes import auth_bp
 from src.juniper.routes import juniper_bp
+from src.utils.log import configure_logging
 from config import Config
 
 def create_app():
+    configure_logging()
     app = Flask(__name__)
     app.config.from_object(Config)
     
@@ -18,11 +20,39 @@ def create_app():
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(juniper_bp, url_prefix='/juniper')
+
+    # Stream gNMI hidup di proses ini: counter dashboard sisa proses sebelumnya direset
+    from src.juniper.telemetry import broker_enabled
+    if not broker_enabled():
+        set_meta_value('gnmi_streams_active', 0)
+
+    # Background collector (hanya satu proses yang mendapat lock)
+    if Config.COLLECTOR_ENABLED:
+        from src.juniper.collector import start_collector
+        start_collector()
     
     # Simple root route
     @app.route('/')
     def index():
         return redirect(url_for('auth.login'))
+
+    # Metrik Prometheus: token Bearer (METRICS_TOKEN) untuk scraper, atau user yang login
+    @app.route('/metrics')
+    def prometheus_metrics():
+        import hmac
+        from flask import Response, request
+        from flask_login import current_user
+        from src.utils import metrics
+
+        token = Config.METRICS_TOKEN
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not (token and hmac.compare_digest(supplied, token)) and not current_user.is_authenticated:
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        if not metrics.ENABLED:
+            return Response('Metrik nonaktif (prometheus_client tidak terpasang atau METRICS_ENABLED=false)\n',
+                            status=503, mimetype='text/plain')
+        body, content_type = metrics.render_metrics()
+        return Response(body, content_type=content_type)
     
     # Error handlers
     @app.errorhandler(404)
@@ -58,11 +88,11 @@ def create_app():
         from flask_login import current_user
         if current_user.is_authenticated:
             try:
-                from src.utils.database import get_database_stats
-                from src.models.device import get_juniper_devices_count
+                from src.utils.stats import get_stats
+                stats = get_stats()
                 return {
-                    'stats': get_database_stats(),
-                    'devices_count': get_juniper_devices_count()
+                    'stats': stats,
+                    'devices_count': stats['total_devices']
                 }
             except:
                 return {}
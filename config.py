@@ -16,6 +16,13 @@ class Config:
     
     # Database
     DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'instance', 'users.db')
+    # Koneksi SQLite thread-local (WAL): detik menunggu lock tulis dan ukuran cache prepared statement
+    DATABASE_BUSY_TIMEOUT = float(os.environ.get('DATABASE_BUSY_TIMEOUT', 5))
+    DATABASE_STATEMENT_CACHE = int(os.environ.get('DATABASE_STATEMENT_CACHE', 256))
+    # Registry device in-memory: jeda (detik) antar pengecekan perubahan dari worker lain, 0 = setiap akses
+    DEVICE_REGISTRY_CHECK_INTERVAL = float(os.environ.get('DEVICE_REGISTRY_CHECK_INTERVAL', 1.0))
+    # Statistik dashboard di-cache; jeda (detik) antar pengecekan perubahan dari proses lain
+    STATS_CHECK_INTERVAL = float(os.environ.get('STATS_CHECK_INTERVAL', 5.0))
     
     # Rate limiting
     RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
@@ -26,8 +33,110 @@ class Config:
     API_DEFAULT_PORT = int(os.environ.get('API_DEFAULT_PORT', 3000))
     API_DEFAULT_USE_SSL = os.environ.get('API_USE_SSL', 'false').lower() in {'1', 'true', 'yes'}
     API_DEFAULT_VERIFY_SSL = os.environ.get('API_VERIFY_SSL', 'false').lower() in {'1', 'true', 'yes'}
+    API_POOL_MAXSIZE = int(os.environ.get('API_POOL_MAXSIZE', 4))
+    API_SESSION_IDLE_TIMEOUT = int(os.environ.get('API_SESSION_IDLE_TIMEOUT', 300))
+    # RPC ke device yang sama dalam jendela ini (ms) digabung jadi satu POST /rpc (0 = nonaktif).
+    # Setiap RPC menunggu selama jendela ini, jadi hanya diaktifkan jika banyak request paralel per device.
+    API_BATCH_WINDOW_MS = float(os.environ.get('API_BATCH_WINDOW_MS', 0))
+    # AsyncJuniperAPI (butuh httpx): koneksi bersamaan maksimum per device per event loop
+    API_ASYNC_HOST_CONCURRENCY = int(os.environ.get('API_ASYNC_HOST_CONCURRENCY', API_POOL_MAXSIZE))
+
+    # REST RPC result cache (TTL dalam detik, 0 = tidak di-cache)
+    API_CACHE_ENABLED = os.environ.get('API_CACHE_ENABLED', 'true').lower() in {'1', 'true', 'yes'}
+    API_CACHE_MAX_ENTRIES = int(os.environ.get('API_CACHE_MAX_ENTRIES', 512))
+    API_CACHE_TTL = {
+        'system_info': int(os.environ.get('API_CACHE_TTL_SYSTEM_INFO', 10)),
+        'bgp_summary': int(os.environ.get('API_CACHE_TTL_BGP_SUMMARY', 15)),
+        'bgp_neighbor_detail': int(os.environ.get('API_CACHE_TTL_BGP_NEIGHBOR', 10)),
+        'policy_options': int(os.environ.get('API_CACHE_TTL_POLICY_OPTIONS', 60)),
+        'static_routes': int(os.environ.get('API_CACHE_TTL_STATIC_ROUTES', 30)),
+        'interfaces': int(os.environ.get('API_CACHE_TTL_INTERFACES', 60)),
+    }
+
+    # Fleet polling (/juniper/api/fleet/status)
+    FLEET_POLL_WORKERS = int(os.environ.get('FLEET_POLL_WORKERS', 16))
+    FLEET_DEVICE_DEADLINE = float(os.environ.get('FLEET_DEVICE_DEADLINE', 20))
+
+    # Background collector (snapshot state device, interval dalam detik, 0 = tidak dipoll)
+    COLLECTOR_ENABLED = os.environ.get('COLLECTOR_ENABLED', 'false').lower() in {'1', 'true', 'yes'}
+    COLLECTOR_WORKERS = int(os.environ.get('COLLECTOR_WORKERS', 4))
+    # Engine polling: auto (async jika httpx terpasang), async (satu event loop), thread (pool COLLECTOR_WORKERS)
+    COLLECTOR_ENGINE = os.environ.get('COLLECTOR_ENGINE', 'auto').lower()
+    COLLECTOR_INTERVALS = {
+        'system_info': int(os.environ.get('COLLECTOR_INTERVAL_SYSTEM_INFO', 60)),
+        'bgp_summary': int(os.environ.get('COLLECTOR_INTERVAL_BGP_SUMMARY', 30)),
+        'static_routes': int(os.environ.get('COLLECTOR_INTERVAL_STATIC_ROUTES', 300)),
+    }
+    COLLECTOR_DEVICE_REFRESH = int(os.environ.get('COLLECTOR_DEVICE_REFRESH', 60))
+    COLLECTOR_STALE_FACTOR = float(os.environ.get('COLLECTOR_STALE_FACTOR', 2))
+    COLLECTOR_SNAPSHOT_MAX_AGE = int(os.environ.get('COLLECTOR_SNAPSHOT_MAX_AGE', 900))
+    COLLECTOR_LOCK_PATH = os.environ.get(
+        'COLLECTOR_LOCK_PATH',
+        os.path.join(os.path.dirname(__file__), 'instance', 'collector.lock')
+    )
 
     # gNMI / Telemetry
     GNMI_DEFAULT_PORT = int(os.environ.get('GNMI_DEFAULT_PORT', 9339))
     GNMI_DEFAULT_USE_SSL = os.environ.get('GNMI_USE_SSL', 'false').lower() in {'1', 'true', 'yes'}
     GNMI_DEFAULT_VERIFY_SSL = os.environ.get('GNMI_VERIFY_SSL', 'false').lower() in {'1', 'true', 'yes'}
+    # Encoding Subscribe: auto (PROTO jika didukung router, lewat Capabilities), json, json_ietf, proto
+    GNMI_ENCODING = os.environ.get('GNMI_ENCODING', 'auto').lower()
+    # Jumlah path update gNMI yang disimpan hasil resolusinya (LRU, 0 = nonaktif)
+    GNMI_PATH_CACHE_SIZE = int(os.environ.get('GNMI_PATH_CACHE_SIZE', 20000))
+    # Profil subscription counter: sample, suppress, on_change, target_defined
+    GNMI_SUBSCRIPTION_PROFILE = os.environ.get('GNMI_SUBSCRIPTION_PROFILE', 'sample').lower()
+    GNMI_SUBINTERFACE_PROFILE = os.environ.get('GNMI_SUBINTERFACE_PROFILE', 'suppress').lower()
+    # Counter subinterface hanya disubscribe jika diminta (default tidak)
+    GNMI_INCLUDE_SUBINTERFACES = os.environ.get('GNMI_INCLUDE_SUBINTERFACES', 'false').lower() in {'1', 'true', 'yes'}
+    GNMI_SUBINTERFACE_INTERVAL_FACTOR = int(os.environ.get('GNMI_SUBINTERFACE_INTERVAL_FACTOR', 2))
+    # Heartbeat untuk profil suppress/on_change: interface idle tetap dikirim ulang (detik, 0 = nonaktif)
+    GNMI_HEARTBEAT_SECONDS = int(os.environ.get('GNMI_HEARTBEAT_SECONDS', 60))
+    # Batas RPC Subscribe per device saat interface ditambah ke stream yang berjalan
+    GNMI_MAX_SUBSCRIBE_RPCS = int(os.environ.get('GNMI_MAX_SUBSCRIBE_RPCS', 8))
+    # Rate dihitung dari timestamp notifikasi router (bukan waktu decode di server)
+    GNMI_USE_DEVICE_TIMESTAMP = os.environ.get('GNMI_USE_DEVICE_TIMESTAMP', 'true').lower() in {'1', 'true', 'yes'}
+    # Jendela (detik) estimasi offset jam router dari sampel latency minimum
+    GNMI_CLOCK_WINDOW_SECONDS = float(os.environ.get('GNMI_CLOCK_WINDOW_SECONDS', 300))
+    # Sampel dengan jeda lebih dari faktor ini x interval ditandai gap (0 = nonaktif)
+    GNMI_GAP_FACTOR = float(os.environ.get('GNMI_GAP_FACTOR', 3))
+
+    # Engine stream gNMI: 'thread' (satu thread per device) atau 'aio' (grpc.aio, satu event loop)
+    GNMI_ENGINE = os.environ.get('GNMI_ENGINE', 'thread').lower()
+    GNMI_AIO_QUEUE_SIZE = int(os.environ.get('GNMI_AIO_QUEUE_SIZE', 10000))
+    GNMI_RECONNECT_BASE = float(os.environ.get('GNMI_RECONNECT_BASE', 1))
+    GNMI_RECONNECT_MAX = float(os.environ.get('GNMI_RECONNECT_MAX', 60))
+    # Keepalive HTTP/2 channel gNMI (ms, 0 = nonaktif); koneksi mati terdeteksi tanpa menunggu TCP timeout
+    GNMI_KEEPALIVE_TIME_MS = int(os.environ.get('GNMI_KEEPALIVE_TIME_MS', 30000))
+    GNMI_KEEPALIVE_TIMEOUT_MS = int(os.environ.get('GNMI_KEEPALIVE_TIMEOUT_MS', 10000))
+
+    # Telemetry broker: proses terpisah pemilik semua stream gNMI (kosong = stream di proses web)
+    TELEMETRY_BROKER_ADDRESS = os.environ.get('TELEMETRY_BROKER_ADDRESS', '')
+    TELEMETRY_BROKER_AUTHKEY = os.environ.get('TELEMETRY_BROKER_AUTHKEY', '')
+
+    # Push traffic live via Server-Sent Events (/juniper/api/traffic/<id>/stream)
+    TRAFFIC_STREAM_ENABLED = os.environ.get('TRAFFIC_STREAM_ENABLED', 'true').lower() in {'1', 'true', 'yes'}
+    TRAFFIC_STREAM_MAX_CLIENTS = int(os.environ.get('TRAFFIC_STREAM_MAX_CLIENTS', 32))
+    TRAFFIC_STREAM_KEEPALIVE = int(os.environ.get('TRAFFIC_STREAM_KEEPALIVE', 15))
+    TRAFFIC_STREAM_MAX_SECONDS = int(os.environ.get('TRAFFIC_STREAM_MAX_SECONDS', 600))
+
+    # Riwayat traffic gNMI (ring buffer di memori + rollup di SQLite)
+    TRAFFIC_HISTORY_ENABLED = os.environ.get('TRAFFIC_HISTORY_ENABLED', 'true').lower() in {'1', 'true', 'yes'}
+    TRAFFIC_HISTORY_RAW_POINTS = int(os.environ.get('TRAFFIC_HISTORY_RAW_POINTS', 720))
+    TRAFFIC_HISTORY_ROLLUP_SECONDS = int(os.environ.get('TRAFFIC_HISTORY_ROLLUP_SECONDS', 60))
+    TRAFFIC_HISTORY_RETENTION_DAYS = int(os.environ.get('TRAFFIC_HISTORY_RETENTION_DAYS', 30))
+    TRAFFIC_HISTORY_MAX_POINTS = int(os.environ.get('TRAFFIC_HISTORY_MAX_POINTS', 1500))
+
+    # Metrik Prometheus di /metrics (butuh paket prometheus_client; tanpa itu metrik no-op)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in {'1', 'true', 'yes'}
+    # Token Bearer untuk scraper Prometheus; kosong = hanya user yang sudah login
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+    # Logging aplikasi: level global dan override per subsistem ("api=DEBUG,collector=WARNING")
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+    # Capture body response REST mentah per device (ring buffer di memori proses)
+    DEBUG_CAPTURE_ENABLED = os.environ.get('DEBUG_CAPTURE_ENABLED', 'false').lower() in {'1', 'true', 'yes'}
+    DEBUG_CAPTURE_RING_SIZE = int(os.environ.get('DEBUG_CAPTURE_RING_SIZE', 20))
+    DEBUG_CAPTURE_MAX_BYTES = int(os.environ.get('DEBUG_CAPTURE_MAX_BYTES', 65536))
+    DEBUG_CAPTURE_PER_MINUTE = int(os.environ.get('DEBUG_CAPTURE_PER_MINUTE', 30))
+    DEBUG_CAPTURE_SAMPLE_RATE = float(os.environ.get('DEBUG_CAPTURE_SAMPLE_RATE', 1.0))
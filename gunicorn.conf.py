@@ -11,8 +11,12 @@ def _int_env(name: str, default: int) -> int:
 
 
 bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', 5000)}")
-# gNMI monitoring keeps state in-process, so default to a single worker unless explicitly overridden.
-workers = _int_env("GUNICORN_WORKERS", 1)
+# gNMI monitoring keeps state in-process, so default to a single worker unless a telemetry
+# broker (TELEMETRY_BROKER_ADDRESS) owns the streams and workers are stateless readers.
+workers = _int_env(
+    "GUNICORN_WORKERS",
+    multiprocessing.cpu_count() if os.environ.get("TELEMETRY_BROKER_ADDRESS") else 1,
+)
 threads = _int_env("GUNICORN_THREADS", max(4, multiprocessing.cpu_count()))
 worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
 timeout = _int_env("GUNICORN_TIMEOUT", 90)
@@ -25,3 +29,54 @@ accesslog = os.environ.get("GUNICORN_ACCESSLOG", "-")
 errorlog = os.environ.get("GUNICORN_ERRORLOG", "-")
 capture_output = True
 preload_app = False
+
+
+def _prometheus_multiproc_dir() -> str:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir") or ""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def on_starting(server):
+    """Remove metric files of dead processes from PROMETHEUS_MULTIPROC_DIR.
+
+    Files of live processes (e.g. a running telemetry broker) are kept.
+    """
+    path = _prometheus_multiproc_dir()
+    if not path:
+        return
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        stem, _, pid = name[:-3].rpartition("_")
+        if not name.endswith(".db") or not stem:
+            continue
+        if not pid.isdigit() or not _pid_alive(int(pid)):
+            os.remove(os.path.join(path, name))
+
+
+def child_exit(server, worker):
+    """Drop live gauges of exited workers from the merged /metrics output."""
+    if not _prometheus_multiproc_dir():
+        return
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Close the worker's pooled SQLite connections (WAL checkpoint on last close)."""
+    try:
+        from src.utils.database import close_all_connections
+    except ImportError:
+        return
+    close_all_connections()
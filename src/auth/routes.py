@@ -45,11 +45,10 @@ def logout():
 @auth_bp.route('/dashboard')
 @login_required
 def dashboard():
-    from src.models.device import get_juniper_devices_count
-    from src.utils.database import get_database_stats
+    from src.utils.stats import get_stats
     
-    stats = get_database_stats()
-    devices_count = get_juniper_devices_count()
+    stats = get_stats()
+    devices_count = stats['total_devices']
     
     return render_template('dashboard.html', 
                          user=current_user, 
@@ -79,6 +78,5 @@ def api_health():
 @auth_bp.route('/api/stats')
 @login_required
 def api_stats():
-    from src.utils.database import get_database_stats
-    stats = get_database_stats()
-    return jsonify(stats)
\ No newline at end of file
+    from src.utils.stats import get_stats
+    return jsonify(get_stats())
\ No newline at end of file
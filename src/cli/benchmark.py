@@ -0,0 +1,438 @@
+import argparse
+import json
+import sys
+import os
+import time
+
+# Tambahkan path root project ke Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.juniper.api import JuniperAPI
+from src.juniper.counters import METRICS, CounterTable, PathCache
+from src.juniper.gnmi_client import JuniperGNMIClient, decode_typed_value
+from src.juniper.multipart import DEFAULT_CHUNK_SIZE, iter_json_parts
+
+BOUNDARY = 'harqgehabymwiax'
+
+
+def _legacy_clean_mime_response(response_text):
+    """Implementasi lama JuniperAPI._clean_mime_response (tanpa print)"""
+    start = response_text.find('{')
+    if start == -1:
+        return response_text
+
+    depth = 0
+    in_string = False
+    escape = False
+
+    for idx in range(start, len(response_text)):
+        ch = response_text[idx]
+
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+            continue
+
+        if ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return response_text[start : idx + 1]
+
+    return response_text[start:]
+
+
+def _legacy_extract_json_sections(response_text):
+    """Implementasi lama JuniperAPI._extract_json_sections"""
+    lines = response_text.splitlines()
+    boundary = None
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith('--') and len(line) > 2:
+            boundary = line
+            break
+
+    if not boundary:
+        cleaned = _legacy_clean_mime_response(response_text)
+        return [cleaned] if cleaned else []
+
+    sections = []
+    for part in response_text.split(boundary):
+        part = part.strip()
+        if not part or part == '--' or '{' not in part:
+            continue
+        json_part = part[part.index('{'):].strip()
+        if json_part.endswith('--'):
+            json_part = json_part[:-2].strip()
+        if json_part:
+            sections.append(json_part)
+    return sections
+
+
+def _legacy_get_nested_value(data, keys, default='N/A'):
+    """Implementasi lama JuniperAPI._get_nested_value"""
+    try:
+        current = data
+        for key in keys:
+            if current is None:
+                return default
+            if isinstance(current, list) and isinstance(key, int):
+                if key < len(current):
+                    current = current[key]
+                else:
+                    return default
+            elif isinstance(current, dict) and key in current:
+                current = current[key]
+            else:
+                return default
+        return current if current is not None else default
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return default
+
+
+def _legacy_parse_bgp_peers(bgp_info):
+    """Implementasi lama JuniperAPI._parse_bgp_peers_simple"""
+    get = _legacy_get_nested_value
+    peers = []
+    for peer in bgp_info.get('bgp-peer', []):
+        if not peer:
+            continue
+        peer_data = {
+            'peer_address': get(peer, ['peer-address', 0, 'data'], 'N/A'),
+            'peer_as': get(peer, ['peer-as', 0, 'data'], 'N/A'),
+            'peer_state': get(peer, ['peer-state', 0, 'data'], 'N/A'),
+            'description': get(peer, ['description', 0, 'data'], ''),
+            'input_messages': get(peer, ['input-messages', 0, 'data'], '0'),
+            'output_messages': get(peer, ['output-messages', 0, 'data'], '0'),
+            'flap_count': get(peer, ['flap-count', 0, 'data'], '0'),
+            'elapsed_time': get(peer, ['elapsed-time', 0, 'data'], 'N/A'),
+        }
+        peer_data['ribs'] = [
+            {
+                'name': get(rib, ['name', 0, 'data'], 'N/A'),
+                'active_prefix_count': get(rib, ['active-prefix-count', 0, 'data'], '0'),
+                'received_prefix_count': get(rib, ['received-prefix-count', 0, 'data'], '0'),
+            }
+            for rib in peer.get('bgp-rib', []) if rib
+        ]
+        peers.append(peer_data)
+    return peers
+
+
+def _build_bgp_information(peers):
+    """bgp-information sintetis ala route reflector dengan banyak peer"""
+    def d(value):
+        return [{'data': str(value)}]
+
+    bgp_peers = []
+    for i in range(peers):
+        peer = {
+            'peer-address': d(f'10.{i // 256 % 256}.{i % 256}.1+179'),
+            'peer-as': d(64512 + i % 1000),
+            'peer-state': d('Established' if i % 10 else 'Active'),
+            'input-messages': d(i * 31),
+            'output-messages': d(i * 29),
+            'flap-count': d(i % 7),
+            'elapsed-time': d('1w2d 03:04:05'),
+            'bgp-rib': [
+                {'name': d('inet.0'), 'active-prefix-count': d(i % 500), 'received-prefix-count': d(i % 900)},
+            ],
+        }
+        if i % 3:
+            peer['description'] = d(f'CUSTOMER-{i}')
+        bgp_peers.append(peer)
+    return {'bgp-information': [{'bgp-peer': bgp_peers}]}
+
+
+def _build_policy_options_body(prefix_lists):
+    """Body multipart sintetis mirip reply get-configuration policy-options"""
+    config = {
+        'configuration': {
+            '@': {'junos:changed-localtime': '2024-01-01 00:00:00 UTC'},
+            'policy-options': {
+                'prefix-list': [
+                    {
+                        'name': f'PL-CUSTOMER-{i}',
+                        'prefix-list-item': [{'name': f'10.{i % 256}.{j}.0/24'} for j in range(8)],
+                    }
+                    for i in range(prefix_lists)
+                ],
+                'policy-statement': [
+                    {
+                        'name': f'EXPORT-{i}',
+                        'term': [{'name': 't1', 'from': {'prefix-list': [{'name': f'PL-CUSTOMER-{i}'}]},
+                                  'then': {'local-preference': {'local-preference': 200}, 'accept': [None]}}],
+                    }
+                    for i in range(prefix_lists // 4)
+                ],
+            },
+        }
+    }
+    payload = json.dumps(config, indent=4)
+    body = (
+        f"--{BOUNDARY}\r\nContent-Type: application/json; charset=utf-8\r\n\r\n"
+        f"{payload}\r\n--{BOUNDARY}--\r\n"
+    )
+    return body.encode('utf-8')
+
+
+def _legacy_calculate_rates(raw_counters, prev_snapshots, current_traffic_data, current_time):
+    # Versi dict per interface dari JuniperGNMIClient._calculate_rates sebelum CounterTable
+    for iface, counters in raw_counters.items():
+        previous = prev_snapshots.get(iface)
+        if previous:
+            time_diff = current_time - previous['timestamp']
+            if time_diff <= 0:
+                continue
+            deltas = {
+                metric: max(counters.get(metric, 0) - previous['values'].get(metric, 0), 0)
+                for metric in METRICS
+            }
+            current_traffic_data[iface] = {
+                'in_rate': (deltas['in_octets'] / time_diff) * 8,
+                'out_rate': (deltas['out_octets'] / time_diff) * 8,
+                'in_pps': deltas['in_pkts'] / time_diff,
+                'out_pps': deltas['out_pkts'] / time_diff,
+                'in_errors_rate': deltas['in_errors'] / time_diff,
+                'out_errors_rate': deltas['out_errors'] / time_diff,
+                'timestamp': current_time,
+                'counters': counters.copy(),
+            }
+        prev_snapshots[iface] = {'timestamp': current_time, 'values': counters.copy(), 'primed': True}
+
+
+def _legacy_parse_typed_value(value):
+    # Probing HasField berurutan seperti JuniperGNMIClient._parse_typed_value sebelumnya
+    if value.HasField('int_val'):
+        return value.int_val
+    if value.HasField('uint_val'):
+        return value.uint_val
+    if value.HasField('float_val'):
+        return value.float_val
+    if value.HasField('double_val'):
+        return value.double_val
+    if 'sint_val' in value.DESCRIPTOR.fields_by_name and value.HasField('sint_val'):
+        return value.sint_val
+    if value.HasField('bool_val'):
+        return int(value.bool_val)
+    if value.HasField('string_val'):
+        try:
+            return float(value.string_val)
+        except ValueError:
+            return None
+    if value.HasField('json_val'):
+        try:
+            parsed = json.loads(value.json_val.decode())
+            if isinstance(parsed, (int, float)):
+                return parsed
+        except Exception:
+            return None
+    return None
+
+
+def _timeit(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_multipart(args):
+    body = _build_policy_options_body(args.prefix_lists)
+    chunks = [body[i:i + DEFAULT_CHUNK_SIZE] for i in range(0, len(body), DEFAULT_CHUNK_SIZE)]
+    content_type = f'multipart/mixed; boundary={BOUNDARY}'
+
+    def legacy_first():
+        # response.text lalu scan karakter per karakter
+        text = body.decode('utf-8')
+        return json.loads(_legacy_clean_mime_response(text))
+
+    def legacy_sections():
+        text = body.decode('utf-8')
+        return [json.loads(section) for section in _legacy_extract_json_sections(text)]
+
+    def streaming():
+        return list(iter_json_parts(iter(chunks), content_type))
+
+    assert streaming()[0] == legacy_first() == legacy_sections()[0]
+
+    print(f"Body size: {len(body) / 1024:.1f} KiB ({len(chunks)} chunks)")
+    results = [
+        ('legacy _clean_mime_response', _timeit(legacy_first, args.repeat)),
+        ('legacy _extract_json_sections', _timeit(legacy_sections, args.repeat)),
+        ('streaming iter_json_parts', _timeit(streaming, args.repeat)),
+    ]
+    baseline = results[0][1]
+    for label, seconds in results:
+        print(f"{label:<32} {seconds * 1000:10.2f} ms  ({baseline / seconds:6.1f}x)")
+
+
+def bench_extractors(args):
+    data = _build_bgp_information(args.peers)
+    bgp_info = data['bgp-information'][0]
+    # Parser tidak memakai state koneksi, jadi instance tanpa session cukup
+    api = JuniperAPI.__new__(JuniperAPI)
+
+    def legacy():
+        return _legacy_parse_bgp_peers(bgp_info)
+
+    def compiled():
+        return api._parse_bgp_peers_simple(bgp_info)
+
+    assert legacy() == compiled()
+
+    print(f"BGP peers: {args.peers}")
+    results = [
+        ('legacy _get_nested_value', _timeit(legacy, args.repeat)),
+        ('compiled extractors', _timeit(compiled, args.repeat)),
+        ('full _parse_bgp_summary', _timeit(lambda: api._parse_bgp_summary(data), args.repeat)),
+    ]
+    baseline = results[0][1]
+    for label, seconds in results:
+        print(f"{label:<32} {seconds * 1000:10.2f} ms  ({baseline / seconds:6.1f}x)")
+
+
+def bench_rates(args):
+    names = [f"ge-0/0/{i // 100}.{i % 100}" for i in range(args.interfaces)]
+    counters = {name: {metric: float(i * 1000 + j) for j, metric in enumerate(METRICS)} for i, name in enumerate(names)}
+    prev_snapshots = {}
+    traffic = {}
+    _legacy_calculate_rates(counters, prev_snapshots, traffic, 0.0)
+
+    table = CounterTable()
+    rows = [table.intern(name) for name in names for _ in METRICS]
+    columns = list(range(len(METRICS))) * len(names)
+    values = [counters[name][metric] for name in names for metric in METRICS]
+    touched = table.update(rows, columns, values)
+    table.compute(touched, 0.0)
+    table.compute(touched, 0.5)
+    clock = {'legacy': 1.0, 'table': 1.0}
+
+    def legacy():
+        clock['legacy'] += 1
+        _legacy_calculate_rates(counters, prev_snapshots, traffic, clock['legacy'])
+
+    def vectorized():
+        clock['table'] += 1
+        # Termasuk penulisan counter satu notifikasi dan pembuatan dict hasil
+        touched_rows = table.update(rows, columns, values)
+        batch = table.compute(touched_rows, clock['table'])
+        return [dict(zip(METRICS, row)) for row in batch.rates.tolist()]
+
+    print(f"Interfaces: {args.interfaces}")
+    results = [
+        ('legacy dict per interface', _timeit(legacy, args.repeat)),
+        ('CounterTable (NumPy)', _timeit(vectorized, args.repeat)),
+    ]
+    baseline = results[0][1]
+    for label, seconds in results:
+        print(f"{label:<32} {seconds * 1000:10.2f} ms  ({baseline / seconds:6.1f}x)")
+
+
+def bench_typed_values(args):
+    from src.juniper.gnmi.gnmi_pb2 import TypedValue
+
+    # Counter yang sama dalam encoding JSON (json_val) dan PROTO (uint_val)
+    json_values = [TypedValue(json_val=str(i * 1000).encode()) for i in range(args.updates)]
+    proto_values = [TypedValue(uint_val=i * 1000) for i in range(args.updates)]
+
+    assert [_legacy_parse_typed_value(v) for v in json_values] == [decode_typed_value(v) for v in json_values]
+
+    print(f"TypedValue: {args.updates}")
+    results = [
+        ('legacy HasField, json_val', _timeit(lambda: [_legacy_parse_typed_value(v) for v in json_values], args.repeat)),
+        ('legacy HasField, uint_val', _timeit(lambda: [_legacy_parse_typed_value(v) for v in proto_values], args.repeat)),
+        ('WhichOneof, json_val', _timeit(lambda: [decode_typed_value(v) for v in json_values], args.repeat)),
+        ('WhichOneof, uint_val', _timeit(lambda: [decode_typed_value(v) for v in proto_values], args.repeat)),
+    ]
+    baseline = results[0][1]
+    for label, seconds in results:
+        print(f"{label:<32} {seconds * 1000:10.2f} ms  ({baseline / seconds:6.1f}x)")
+
+
+def bench_paths(args):
+    from src.juniper.gnmi.gnmi_pb2 import Notification, Path, PathElem, SubscribeResponse, TypedValue, Update
+
+    leaves = ('in-octets', 'out-octets', 'in-pkts', 'out-pkts', 'in-errors', 'out-errors')
+    notification = Notification(timestamp=1)
+    for i in range(args.interfaces):
+        prefix = [
+            PathElem(name='interfaces'),
+            PathElem(name='interface', key={'name': f"ge-0/0/{i // 100}"}),
+            PathElem(name='subinterfaces'),
+            PathElem(name='subinterface', key={'index': str(i % 100)}),
+            PathElem(name='state'),
+            PathElem(name='counters'),
+        ]
+        for j, leaf in enumerate(leaves):
+            path = Path(elem=prefix + [PathElem(name=leaf)])
+            notification.update.append(Update(path=path, val=TypedValue(uint_val=i * 10 + j)))
+    response = SubscribeResponse(update=notification)
+
+    def make_client(cache_size):
+        client = JuniperGNMIClient('192.0.2.1')
+        client._path_cache = PathCache(cache_size)
+        client._calculate_rates = lambda *args: set()
+        client._process_gnmi_response(response)
+        return client
+
+    uncached = make_client(0)
+    cached = make_client(len(notification.update))
+
+    print(f"Updates per notifikasi: {len(notification.update)}")
+    results = [
+        ('resolve setiap update', _timeit(lambda: uncached._process_gnmi_response(response), args.repeat)),
+        ('PathCache (LRU)', _timeit(lambda: cached._process_gnmi_response(response), args.repeat)),
+    ]
+    baseline = results[0][1]
+    for label, seconds in results:
+        print(f"{label:<32} {seconds * 1000:10.2f} ms  ({baseline / seconds:6.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark jalur parsing Junos UI')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    multipart_parser = subparsers.add_parser('multipart', help='Parser multipart/JSON response REST')
+    multipart_parser.add_argument('--prefix-lists', type=int, default=5000, help='Jumlah prefix-list sintetis')
+    multipart_parser.add_argument('--repeat', type=int, default=5, help='Jumlah pengulangan (ambil waktu terbaik)')
+    multipart_parser.set_defaults(func=bench_multipart)
+
+    extractors_parser = subparsers.add_parser('extractors', help='Parser BGP summary: _get_nested_value vs extractor')
+    extractors_parser.add_argument('--peers', type=int, default=2000, help='Jumlah BGP peer sintetis')
+    extractors_parser.add_argument('--repeat', type=int, default=5, help='Jumlah pengulangan (ambil waktu terbaik)')
+    extractors_parser.set_defaults(func=bench_extractors)
+
+    rates_parser = subparsers.add_parser('rates', help='Perhitungan rate gNMI: dict per interface vs CounterTable')
+    rates_parser.add_argument('--interfaces', type=int, default=4000, help='Jumlah interface sintetis')
+    rates_parser.add_argument('--repeat', type=int, default=5, help='Jumlah pengulangan (ambil waktu terbaik)')
+    rates_parser.set_defaults(func=bench_rates)
+
+    typed_parser = subparsers.add_parser('typed-values', help='Decode gNMI TypedValue: HasField vs WhichOneof')
+    typed_parser.add_argument('--updates', type=int, default=50000, help='Jumlah TypedValue sintetis')
+    typed_parser.add_argument('--repeat', type=int, default=5, help='Jumlah pengulangan (ambil waktu terbaik)')
+    typed_parser.set_defaults(func=bench_typed_values)
+
+    paths_parser = subparsers.add_parser('paths', help='Resolusi path update gNMI: tanpa cache vs PathCache')
+    paths_parser.add_argument('--interfaces', type=int, default=4000, help='Jumlah subinterface sintetis')
+    paths_parser.add_argument('--repeat', type=int, default=5, help='Jumlah pengulangan (ambil waktu terbaik)')
+    paths_parser.set_defaults(func=bench_paths)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import signal
+import sys
+import os
+
+# Tambahkan path root project ke Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from config import Config
+from src.juniper.collector import SnapshotCollector, acquire_collector_lock
+from src.utils.database import init_db
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Collector snapshot device Juniper (system, BGP, static route)')
+    parser.add_argument('--once', action='store_true', help='Poll semua device satu kali lalu keluar')
+    parser.add_argument('--workers', type=int, default=Config.COLLECTOR_WORKERS, help='Jumlah worker polling')
+    args = parser.parse_args()
+
+    init_db()
+    collector = SnapshotCollector(workers=args.workers)
+    if not collector.intervals:
+        print("⚠️  Semua COLLECTOR_INTERVAL_* bernilai 0, tidak ada yang dipoll.")
+        sys.exit(1)
+
+    if args.once:
+        result = collector.run_once()
+        print(f"✅ Selesai: {result['success']} berhasil, {result['failed']} gagal")
+        return
+
+    if not acquire_collector_lock():
+        print(f"⚠️  Collector lain sudah berjalan (lock: {Config.COLLECTOR_LOCK_PATH})")
+        sys.exit(1)
+
+    intervals = ', '.join(f"{kind}={interval}s" for kind, interval in collector.intervals.items())
+    print(f"🚀 Collector berjalan (engine {collector.engine}, {collector.workers} worker; {intervals}). Ctrl+C untuk berhenti.")
+    signal.signal(signal.SIGTERM, lambda *_: collector.stop())
+    try:
+        collector.run_forever()
+    except KeyboardInterrupt:
+        collector.stop()
+    print("👋 Collector berhenti")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import logging
+import signal
+import sys
+import os
+
+# Tambahkan path root project ke Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from config import Config
+from src.juniper.telemetry import TelemetryBroker
+from src.utils.database import init_db, set_meta_value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Telemetry broker: pemilik stream gNMI untuk semua worker web')
+    parser.add_argument('--address', default=Config.TELEMETRY_BROKER_ADDRESS, help='Path Unix socket broker')
+    parser.add_argument('--verbose', action='store_true', help='Tampilkan log debug')
+    args = parser.parse_args()
+
+    if not args.address:
+        print("⚠️  TELEMETRY_BROKER_ADDRESS belum diisi (atau gunakan --address).")
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    init_db()
+    # Broker pemilik semua stream: counter dashboard sisa proses sebelumnya direset
+    set_meta_value('gnmi_streams_active', 0)
+    broker = TelemetryBroker(args.address)
+    signal.signal(signal.SIGTERM, lambda *_: broker.stop())
+
+    print(f"🚀 Telemetry broker berjalan di {args.address}. Ctrl+C untuk berhenti.")
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        broker.stop()
+    print("👋 Telemetry broker berhenti")
+
+
+if __name__ == '__main__':
+    main()
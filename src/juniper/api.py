@@ -1,4 +1,7 @@
+import functools
 import json
+import re
+import time
 from concurrent.futures import ThreadPoolExecutor
 
 import requests
@@ -7,12 +10,82 @@ from requests.auth import HTTPBasicAuth
 from urllib3.exceptions import InsecureRequestWarning
 
 from config import Config
+from src.juniper import extractors
+from src.juniper.batch import build_batch_body, demux_parts, get_batcher
+from src.juniper.cache import RPCCache
+from src.juniper.multipart import DEFAULT_CHUNK_SIZE, iter_json_parts, json_loads
+from src.juniper.sessions import close_device_sessions, get_device_session, session_key
+from src.models.device import on_device_change
+from src.utils import metrics
+from src.utils.log import get_logger, payload_capture
 
 if Config.SUPPRESS_TLS_WARNINGS:
     urllib3.disable_warnings(InsecureRequestWarning)
 
+# Cache hasil RPC bersama untuk semua request dalam proses ini
+rpc_cache = RPCCache(max_entries=Config.API_CACHE_MAX_ENTRIES)
+
+logger = get_logger('api')
+
+# Body RPC XML (dipakai bersama JuniperAPI dan AsyncJuniperAPI)
+SYSTEM_INFO_RPC = """<rpc>
+    <get-route-engine-information/>
+    <get-system-information/>
+</rpc>"""
+
+POLICY_OPTIONS_RPC = """<get-configuration>
+        <configuration>
+            <policy-options/>
+        </configuration>
+    </get-configuration>"""
+
+STATIC_ROUTES_RPC = """<get-route-information>
+        <brief/>
+        <protocol>static</protocol>
+    </get-route-information>"""
+
+INTERFACES_RPC = """<get-configuration>
+        <configuration>
+            <interfaces/>
+        </configuration>
+    </get-configuration>"""
+
+# RPC yang bisa digabung dalam satu POST: (elemen XML, key part balasan sesuai urutan).
+# Part get-configuration dicocokkan lewat subtree-nya agar tidak tertukar antar RPC.
+BATCH_RPCS = {
+    'system_info': (
+        '<get-route-engine-information/>\n<get-system-information/>',
+        ('route-engine-information', 'system-information'),
+    ),
+    'bgp_summary': ('<get-bgp-summary-information/>', ('bgp-information',)),
+    'static_routes': (STATIC_ROUTES_RPC, ('route-information',)),
+    'interfaces': (INTERFACES_RPC, ('configuration/interfaces',)),
+    'policy_options': (POLICY_OPTIONS_RPC, ('configuration/policy-options',)),
+}
+
+# Method JuniperAPI untuk RPC batch yang harus diulang sebagai request tersendiri
+BATCH_METHODS = {
+    'system_info': 'get_system_information',
+    'bgp_summary': 'get_bgp_summary',
+    'static_routes': 'get_static_routes',
+    'interfaces': 'get_interfaces',
+    'policy_options': 'get_policy_options',
+}
+
+
+@on_device_change
+def _on_device_changed(device_id, ip_addresses):
+    """Buang koneksi keep-alive dan cache lama ketika baris device diubah/dihapus"""
+    for ip_address in ip_addresses:
+        close_device_sessions(ip_address)
+        rpc_cache.invalidate(ip_address)
+
+
 class JuniperAPI:
-    def __init__(self, ip_address, port, username, password, use_ssl=False, verify_ssl=False):
+    def __init__(self, ip_address, port, username, password, use_ssl=False, verify_ssl=False, deadline=None):
+        self.host = ip_address
+        # Batas waktu absolut (time.monotonic) untuk semua request instance ini, mis. deadline fleet per device
+        self.deadline = deadline
         self.username = username
         self.password = password
         
@@ -24,245 +97,271 @@ class JuniperAPI:
             'Content-Type': 'application/xml',
             'Accept': 'application/json'
         }
+        # Session keep-alive dipakai bersama antar request Flask untuk device yang sama
+        self.session = get_device_session(
+            self.base_url,
+            ip_address,
+            username,
+            password,
+            verify=self.verify
+        )
     
+    @metrics.timed_rpc('test_connection')
     def test_connection(self):
         """Test koneksi ke device Juniper"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/rpc/get-system-information",
-                auth=self.auth,
-                headers=self.headers,
-                timeout=10,
-                verify=self.verify
+                timeout=10
             )
+            metrics.RPC_RESPONSE_BYTES.labels('test_connection').inc(len(response.content))
             return response.status_code == 200, response.text
         except requests.exceptions.RequestException as e:
             return False, f"Connection error: {str(e)}"
+
+    def _timeout(self, default):
+        """Timeout request: default, dipotong sisa waktu sampai deadline (minimal 0.1 detik)"""
+        if self.deadline is None:
+            return default
+        return max(min(default, self.deadline - time.monotonic()), 0.1)
+
+    def _expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def _post_rpc(self, xml_body, timeout=15):
+        """POST RPC XML dengan stream=True agar body dibaca per chunk"""
+        return self.session.post(
+            f"{self.base_url}/rpc?stop-on-error=1",
+            data=xml_body,
+            timeout=self._timeout(timeout),
+            stream=True
+        )
+
+    def _iter_json(self, response, rpc):
+        """Yield setiap part JSON dari response (multipart atau JSON biasa)"""
+        chunks = response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE)
+        chunks = payload_capture.wrap(self.host, rpc, response, metrics.count_bytes(chunks, rpc))
+        return iter_json_parts(
+            chunks,
+            response.headers.get('Content-Type'),
+            metrics.timed_loads(json_loads, rpc),
+        )
+
+    def _first_json(self, response, rpc):
+        """Ambil objek JSON pertama; sisa body tetap dibaca agar koneksi bisa dipakai ulang"""
+        first = None
+        for data in self._iter_json(response, rpc):
+            if first is None:
+                first = data
+        if first is None:
+            raise json.JSONDecodeError("Tidak dapat menemukan JSON dalam response", "", 0)
+        return first
+
+    def _parse_batch(self, rpc, parts):
+        """Parse part balasan batch milik satu RPC; None jika perlu diulang tersendiri"""
+        if rpc == 'system_info':
+            return self._merge_system_sections(parts)
+        parsers = {
+            'bgp_summary': self._parse_bgp_summary,
+            'static_routes': self._parse_static_routes,
+            'interfaces': self._parse_interfaces,
+            'policy_options': self._parse_policy_options,
+        }
+        return parsers[rpc](parts[0])
+
+    def _batch_result(self, rpc, parts):
+        """(success, data) dari part batch, atau None jika tidak ada part / hasil parse kosong"""
+        if not parts:
+            logger.info("%s %s: tidak ada part di response batch, diulang tersendiri", self.host, rpc)
+            return None
+        try:
+            parsed = self._parse_batch(rpc, parts)
+        except Exception as e:
+            logger.exception("%s %s error tak terduga (batch)", self.host, rpc)
+            return False, f"Unexpected error: {str(e)}"
+        return (True, parsed) if parsed is not None else None
+
+    def get_rpcs(self, names):
+        """Beberapa RPC (lihat BATCH_RPCS) dalam satu POST /rpc tanpa jendela tunggu.
+
+        Mengembalikan {nama: (success, data)}. RPC yang tidak mendapat part balasan,
+        atau seluruh batch jika router menolaknya, diulang sebagai request tersendiri.
+        """
+        try:
+            success, payload = self._send_batch(list(names))
+        except Exception as e:
+            logger.exception("%s batch %s error tak terduga", self.host, names)
+            success, payload = False, None
+        results = {}
+        for name in names:
+            if not success and payload:
+                # Error koneksi: tidak perlu mengulang setiap RPC ke device yang sama
+                results[name] = (False, payload)
+                continue
+            result = self._batch_result(name, payload.get(name)) if success else None
+            results[name] = result if result is not None else getattr(self, BATCH_METHODS[name])()
+        return results
+
+    def _batched(self, rpc):
+        """Jalankan RPC lewat batcher device (lihat src/juniper/batch.py).
+
+        Mengembalikan None jika batching nonaktif atau RPC perlu diulang sebagai
+        request tersendiri (HTTP error pada batch, tidak ada part untuk RPC ini).
+        """
+        if Config.API_BATCH_WINDOW_MS <= 0:
+            return None
+        key = session_key(self.base_url, self.username, self.password, self.verify)
+        batcher = get_batcher(key, Config.API_BATCH_WINDOW_MS / 1000.0)
+        try:
+            success, payload = batcher.submit([rpc], self._send_batch)[rpc].result()
+        except Exception as e:
+            logger.exception("%s %s error tak terduga (batch)", self.host, rpc)
+            return False, f"Unexpected error: {str(e)}"
+        if not success:
+            return (False, payload) if payload else None
+        return self._batch_result(rpc, payload)
+
+    @metrics.timed_rpc('batch')
+    def _send_batch(self, names):
+        """Satu POST /rpc untuk semua RPC di batch (tanpa stop-on-error agar RPC lain tetap dijawab)"""
+        try:
+            with self.session.post(
+                f"{self.base_url}/rpc",
+                data=build_batch_body(BATCH_RPCS[name] for name in names),
+                timeout=15,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    payload_capture.capture_response(self.host, 'batch', response)
+                    logger.info("%s batch %s gagal (HTTP %s), diulang tersendiri", self.host, names, response.status_code)
+                    return False, None
+                parts = list(self._iter_json(response, 'batch'))
+            logger.debug("%s batch %s: %d part", self.host, names, len(parts))
+            return True, demux_parts(names, BATCH_RPCS, parts)
+        except json.JSONDecodeError as e:
+            logger.warning("%s batch JSON decode error: %s", self.host, e)
+            return False, None
+        except requests.exceptions.RequestException as e:
+            logger.warning("%s batch %s connection error: %s", self.host, names, e)
+            return False, f"Connection error: {str(e)}"
     
+    @metrics.timed_rpc('bgp_summary')
     def get_bgp_summary(self):
         """Mendapatkan BGP summary information"""
+        batched = self._batched('bgp_summary')
+        if batched is not None:
+            return batched
         try:
-            response = requests.post(
+            with self.session.post(
                 f"{self.base_url}/rpc/get-bgp-summary-information",
-                auth=self.auth,
-                headers=self.headers,
                 data="",
-                timeout=15,
-                verify=self.verify
-            )
-            
-            if response.status_code == 200:
+                timeout=self._timeout(15),
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    payload_capture.capture_response(self.host, 'bgp_summary', response)
+                    logger.warning("%s bgp_summary gagal: HTTP %s", self.host, response.status_code)
+                    return False, f"API Error: {response.status_code}"
                 try:
-                    data = response.json()
+                    data = self._first_json(response, 'bgp_summary')
                     return True, self._parse_bgp_summary(data)
                 except json.JSONDecodeError as e:
                     return False, f"JSON decode error: {str(e)}"
-            else:
-                return False, f"API Error: {response.status_code}"
                 
         except requests.exceptions.RequestException as e:
             return False, f"Connection error: {str(e)}"
         except Exception as e:
             return False, f"Unexpected error: {str(e)}"
     
+    @metrics.timed_rpc('system_info')
     def get_system_information(self):
         """Mendapatkan system information dan route engine information sekaligus"""
+        batched = self._batched('system_info')
+        if batched is not None:
+            return batched
         try:
-            xml_body = """<rpc>
-    <get-route-engine-information/>
-    <get-system-information/>
-</rpc>"""
-
-            response = requests.post(
-                f"{self.base_url}/rpc?stop-on-error=1",
-                auth=self.auth,
-                headers=self.headers,
-                data=xml_body,
-                timeout=15,
-                verify=self.verify
-            )
-
-            if response.status_code == 200:
-                json_sections = self._extract_json_sections(response.text)
-                if not json_sections:
-                    print("[JuniperAPI] No JSON sections found in combined system info response, falling back")
-                    return self._fallback_system_information()
-                system_raw = None
-                route_engine_raw = None
-
-                for section in json_sections:
+            with self._post_rpc(SYSTEM_INFO_RPC) as response:
+                status_code = response.status_code
+                json_sections = []
+                if status_code != 200:
+                    payload_capture.capture_response(self.host, 'system_info', response)
+                else:
                     try:
-                        parsed = json.loads(section)
+                        json_sections = list(self._iter_json(response, 'system_info'))
                     except json.JSONDecodeError as e:
                         return False, f"JSON decode error: {str(e)}"
 
-                    if 'system-information' in parsed and system_raw is None:
-                        system_raw = parsed
-                    if 'route-engine-information' in parsed and route_engine_raw is None:
-                        route_engine_raw = parsed
-
-                system_parsed = self._parse_system_info(system_raw) if system_raw else None
-                route_engine_parsed = self._parse_route_engine_info(route_engine_raw) if route_engine_raw else None
-
-                if system_parsed or route_engine_parsed:
-                    return True, {
-                        'system': system_parsed,
-                        'route_engine': route_engine_parsed
-                    }
+            if status_code == 200:
+                if not json_sections:
+                    logger.info("%s system_info: response gabungan tanpa JSON, fallback ke RPC terpisah", self.host)
+                    return self._fallback_system_information()
+                merged = self._merge_system_sections(json_sections)
+                if merged:
+                    return True, merged
 
-            print(f"[JuniperAPI] Combined system info request failed with status {response.status_code}, falling back")
+            logger.info("%s system_info: request gabungan gagal (HTTP %s), fallback", self.host, status_code)
             return self._fallback_system_information()
 
         except requests.exceptions.RequestException as e:
-            print(f"[JuniperAPI] Combined system info request error: {e}. Falling back")
-            return self._fallback_system_information()
+            logger.info("%s system_info: request gabungan error (%s), fallback", self.host, e)
+            return self._fallback_system_information(f"Connection error: {str(e)}")
         except Exception as e:
-            print(f"[JuniperAPI] Unexpected error combined system info: {e}. Falling back")
+            logger.warning("%s system_info: error tak terduga, fallback", self.host, exc_info=True)
             return self._fallback_system_information()
     
+    def _merge_system_sections(self, json_sections):
+        """Gabungkan part system-information dan route-engine-information; None jika keduanya tidak ada"""
+        system_raw = None
+        route_engine_raw = None
+
+        for parsed in json_sections:
+            if 'system-information' in parsed and system_raw is None:
+                system_raw = parsed
+            if 'route-engine-information' in parsed and route_engine_raw is None:
+                route_engine_raw = parsed
+
+        system_parsed = self._parse_system_info(system_raw) if system_raw else None
+        route_engine_parsed = self._parse_route_engine_info(route_engine_raw) if route_engine_raw else None
+
+        if system_parsed or route_engine_parsed:
+            return {
+                'system': system_parsed,
+                'route_engine': route_engine_parsed
+            }
+        return None
+
+    @metrics.timed_rpc('policy_options')
     def get_policy_options(self):
         """Mendapatkan policy options configuration dengan XML request"""
+        batched = self._batched('policy_options')
+        if batched is not None:
+            return batched
         try:
-            # XML request body sesuai contoh curl
-            xml_body = """<get-configuration>
-        <configuration>
-            <policy-options/>
-        </configuration>
-    </get-configuration>"""
-            
-            response = requests.post(
-                f"{self.base_url}/rpc?stop-on-error=1",
-                auth=self.auth,
-                headers=self.headers,
-                data=xml_body,
-                timeout=15,
-                verify=self.verify
-            )
-            
-            print(f"🔧 POLICY OPTIONS STATUS: {response.status_code}")
-            print(f"🔧 RESPONSE TEXT: {response.text[:500]}...")  # Debug pertama 500 karakter
-            # print(f"🔧 RESPONSE TEXT: {response.text}")
-            
-            if response.status_code == 200:
+            with self._post_rpc(POLICY_OPTIONS_RPC) as response:
+                logger.debug("%s policy_options status %s", self.host, response.status_code)
+                
+                if response.status_code != 200:
+                    payload_capture.capture_response(self.host, 'policy_options', response)
+                    error_msg = f"API Error: {response.status_code} - {response.text}"
+                    logger.warning("%s policy_options gagal: HTTP %s", self.host, response.status_code)
+                    return False, error_msg
                 try:
-                    # Bersihkan response dari MIME boundary
-                    cleaned_response = self._clean_mime_response(response.text)
-                    data = json.loads(cleaned_response)
-                    print("🔧 POLICY OPTIONS JSON PARSED SUCCESSFULLY")
+                    # Part JSON di-decode langsung dari stream multipart
+                    data = self._first_json(response, 'policy_options')
                     return True, self._parse_policy_options(data)
                 except json.JSONDecodeError as e:
-                    print(f"🔧 JSON DECODE ERROR: {e}")
-                    # Coba parsing manual jika masih gagal
-                    return self._parse_policy_options_manual(response.text)
-            else:
-                error_msg = f"API Error: {response.status_code} - {response.text}"
-                print(f"🔧 {error_msg}")
-                return False, error_msg
+                    logger.warning("%s policy_options JSON decode error: %s", self.host, e)
+                    return False, f"JSON decode error: {str(e)}"
                 
         except requests.exceptions.RequestException as e:
             error_msg = f"Connection error: {str(e)}"
-            print(f"🔧 {error_msg}")
+            logger.warning("%s policy_options connection error: %s", self.host, e)
             return False, error_msg
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
-            print(f"🔧 {error_msg}")
+            logger.exception("%s policy_options error tak terduga", self.host)
             return False, error_msg
 
-    def _clean_mime_response(self, response_text):
-        """Extract the first complete JSON object from a multipart response."""
-        if not response_text:
-            return response_text
-
-        start = response_text.find('{')
-        if start == -1:
-            return response_text
-
-        depth = 0
-        in_string = False
-        escape = False
-
-        for idx in range(start, len(response_text)):
-            ch = response_text[idx]
-
-            if in_string:
-                if escape:
-                    escape = False
-                elif ch == '\\':
-                    escape = True
-                elif ch == '"':
-                    in_string = False
-                continue
-
-            if ch == '"':
-                in_string = True
-                continue
-
-            if ch == '{':
-                depth += 1
-            elif ch == '}':
-                depth -= 1
-                if depth == 0:
-                    cleaned_json = response_text[start : idx + 1]
-                    print(f"🔧 CLEANED JSON: {cleaned_json[:300]}...")
-                    return cleaned_json
-
-        # Fallback: return substring from first JSON brace
-        cleaned_json = response_text[start:]
-        print(f"🔧 CLEANED JSON (fallback): {cleaned_json[:300]}...")
-        return cleaned_json
-
-    def _extract_json_sections(self, response_text):
-        """Ekstrak setiap bagian JSON dari response multipart"""
-        lines = response_text.splitlines()
-        boundary = None
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith('--') and len(line) > 2:
-                boundary = line
-                break
-
-        if not boundary:
-            cleaned = self._clean_mime_response(response_text)
-            return [cleaned] if cleaned else []
-
-        parts = response_text.split(boundary)
-        sections = []
-
-        for part in parts:
-            part = part.strip()
-            if not part or part == '--':
-                continue
-
-            if '{' not in part:
-                continue
-
-            json_part = part[part.index('{'):]
-            json_part = json_part.strip()
-            if json_part.endswith('--'):
-                json_part = json_part[:-2].strip()
-
-            if json_part:
-                sections.append(json_part)
-
-        return sections
-
-    def _parse_policy_options_manual(self, response_text):
-        """Fallback parsing manual jika JSON parsing gagal"""
-        try:
-            # Coba ekstrak JSON secara manual
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = response_text[start_idx:end_idx]
-                data = json.loads(json_str)
-                return True, self._parse_policy_options(data)
-            else:
-                return False, "Tidak dapat menemukan JSON dalam response"
-        except Exception as e:
-            return False, f"Manual parsing error: {str(e)}"
-
     def _parse_bgp_summary(self, data):
         """Parse BGP summary data - versi sederhana"""
         try:
@@ -305,12 +404,7 @@ class JuniperAPI:
     
     def _parse_bgp_summary_info(self, bgp_info):
         """Parse summary information yang penting saja"""
-        summary = {
-            'peer_count': self._get_nested_value(bgp_info, ['peer-count', 0, 'data'], '0'),
-            'group_count': self._get_nested_value(bgp_info, ['group-count', 0, 'data'], '0'),
-            'down_peer_count': self._get_nested_value(bgp_info, ['down-peer-count', 0, 'data'], '0'),
-            'bgp_thread_mode': self._get_nested_value(bgp_info, ['bgp-thread-mode', 0, 'data'], 'N/A')
-        }
+        summary = extractors.extract_bgp_summary_counts(bgp_info)
         
         # Hitung established peers
         peers = bgp_info.get('bgp-peer', [])
@@ -319,7 +413,7 @@ class JuniperAPI:
         
         established_count = 0
         for peer in peers:
-            if peer and self._get_nested_value(peer, ['peer-state', 0, 'data']) == 'Established':
+            if peer and extractors.extract_peer_state(peer) == 'Established':
                 established_count += 1
         
         summary['established_peer_count'] = established_count
@@ -337,16 +431,7 @@ class JuniperAPI:
             if not peer:
                 continue
                 
-            peer_data = {
-                'peer_address': self._get_nested_value(peer, ['peer-address', 0, 'data'], 'N/A'),
-                'peer_as': self._get_nested_value(peer, ['peer-as', 0, 'data'], 'N/A'),
-                'peer_state': self._get_nested_value(peer, ['peer-state', 0, 'data'], 'N/A'),
-                'description': self._get_nested_value(peer, ['description', 0, 'data'], ''),
-                'input_messages': self._get_nested_value(peer, ['input-messages', 0, 'data'], '0'),
-                'output_messages': self._get_nested_value(peer, ['output-messages', 0, 'data'], '0'),
-                'flap_count': self._get_nested_value(peer, ['flap-count', 0, 'data'], '0'),
-                'elapsed_time': self._get_nested_value(peer, ['elapsed-time', 0, 'data'], 'N/A'),
-            }
+            peer_data = extractors.extract_bgp_peer(peer)
             
             # Parse RIBs untuk peer (hanya yang penting)
             peer_ribs = []
@@ -357,12 +442,7 @@ class JuniperAPI:
             for rib in bgp_ribs:
                 if not rib:
                     continue
-                rib_data = {
-                    'name': self._get_nested_value(rib, ['name', 0, 'data'], 'N/A'),
-                    'active_prefix_count': self._get_nested_value(rib, ['active-prefix-count', 0, 'data'], '0'),
-                    'received_prefix_count': self._get_nested_value(rib, ['received-prefix-count', 0, 'data'], '0'),
-                }
-                peer_ribs.append(rib_data)
+                peer_ribs.append(extractors.extract_bgp_peer_rib(rib))
             
             peer_data['ribs'] = peer_ribs
             peers.append(peer_data)
@@ -381,14 +461,7 @@ class JuniperAPI:
             if not rib:
                 continue
                 
-            rib_data = {
-                'name': self._get_nested_value(rib, ['name', 0, 'data'], 'N/A'),
-                'total_prefix_count': self._get_nested_value(rib, ['total-prefix-count', 0, 'data'], '0'),
-                'active_prefix_count': self._get_nested_value(rib, ['active-prefix-count', 0, 'data'], '0'),
-                'received_prefix_count': self._get_nested_value(rib, ['received-prefix-count', 0, 'data'], '0'),
-                'accepted_prefix_count': self._get_nested_value(rib, ['accepted-prefix-count', 0, 'data'], '0'),
-            }
-            ribs.append(rib_data)
+            ribs.append(extractors.extract_bgp_rib(rib))
         
         return ribs
     
@@ -419,14 +492,7 @@ class JuniperAPI:
             if isinstance(sys_info, list) and len(sys_info) > 0:
                 sys_info = sys_info[0]
             
-            result = {
-                'hostname': self._get_nested_value(sys_info, ['host-name', 0, 'data'], 'N/A'),
-                'model': self._get_nested_value(sys_info, ['hardware-model', 0, 'data'], 'N/A'),
-                'os_version': self._get_nested_value(sys_info, ['os-version', 0, 'data'], 'N/A'),
-                'serial_number': self._get_nested_value(sys_info, ['serial-number', 0, 'data'], 'N/A'),
-            }
-            
-            return result
+            return extractors.extract_system_info(sys_info)
             
         except Exception as e:
             return {'error': f"Parse error: {str(e)}"}
@@ -633,69 +699,42 @@ class JuniperAPI:
         
         return result
 
-    def _get_nested_value(self, data, keys, default='N/A'):
-        """Helper function to safely get nested values"""
-        try:
-            current = data
-            for key in keys:
-                if current is None:
-                    return default
-                    
-                if isinstance(current, list) and isinstance(key, int):
-                    if key < len(current):
-                        current = current[key]
-                    else:
-                        return default
-                elif isinstance(current, dict) and key in current:
-                    current = current[key]
-                else:
-                    return default
-            
-            return current if current is not None else default
-        except (KeyError, IndexError, TypeError, AttributeError):
-            return default
-
+    @metrics.timed_rpc('bgp_neighbor_detail')
     def get_bgp_neighbor_detail(self, neighbor_address):
         """Mendapatkan detail informasi BGP neighbor"""
         try:
-            print(f"🔧 GETTING BGP NEIGHBOR DETAIL: {neighbor_address}")
-            response = requests.get(
+            logger.debug("%s bgp_neighbor_detail %s", self.host, neighbor_address)
+            with self.session.get(
                 f"{self.base_url}/rpc/get-bgp-neighbor-information?neighbor-address={neighbor_address}",
-                auth=self.auth,
-                headers=self.headers,
                 timeout=15,
-                verify=self.verify
-            )
-            
-            print(f"🔧 NEIGHBOR DETAIL STATUS: {response.status_code}")
-            
-            if response.status_code == 200:
+                stream=True
+            ) as response:
+                logger.debug("%s bgp_neighbor_detail status %s", self.host, response.status_code)
+                
+                if response.status_code != 200:
+                    payload_capture.capture_response(self.host, 'bgp_neighbor_detail', response)
+                    error_msg = f"API Error: {response.status_code} - {response.text}"
+                    logger.warning("%s bgp_neighbor_detail gagal: HTTP %s", self.host, response.status_code)
+                    return False, error_msg
                 try:
-                    data = response.json()
-                    print(f"🔧 NEIGHBOR DETAIL JSON PARSED SUCCESSFULLY")
+                    data = self._first_json(response, 'bgp_neighbor_detail')
                     return True, self._parse_bgp_neighbor_detail(data)
                 except json.JSONDecodeError as e:
-                    print(f"🔧 JSON DECODE ERROR: {e}")
+                    logger.warning("%s bgp_neighbor_detail JSON decode error: %s", self.host, e)
                     return False, f"JSON decode error: {str(e)}"
-            else:
-                error_msg = f"API Error: {response.status_code} - {response.text}"
-                print(f"🔧 {error_msg}")
-                return False, error_msg
                 
         except requests.exceptions.RequestException as e:
             error_msg = f"Connection error: {str(e)}"
-            print(f"🔧 {error_msg}")
+            logger.warning("%s bgp_neighbor_detail connection error: %s", self.host, e)
             return False, error_msg
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
-            print(f"🔧 {error_msg}")
+            logger.exception("%s bgp_neighbor_detail error tak terduga", self.host)
             return False, error_msg
 
     def _parse_bgp_neighbor_detail(self, data):
         """Parse detail informasi BGP neighbor"""
         try:
-            print(f"🔧 PARSING BGP NEIGHBOR DETAIL...")
-            
             # Ekstrak bgp-information
             bgp_info = self._extract_bgp_info(data)
             
@@ -723,62 +762,24 @@ class JuniperAPI:
                 'bfd_info': self._parse_bfd_info(peer)
             }
             
-            print(f"🔧 NEIGHBOR DETAIL PARSING COMPLETED")
             return result
             
         except Exception as e:
             error_msg = f"Parse error: {str(e)}"
-            print(f"🔧 {error_msg}")
-            import traceback
-            print(f"🔧 TRACEBACK: {traceback.format_exc()}")
+            logger.warning("%s gagal parse BGP neighbor detail", self.host, exc_info=True)
             return {'error': error_msg}
 
     def _parse_basic_neighbor_info(self, peer):
         """Parse informasi dasar neighbor"""
-        return {
-            'peer_address': self._get_nested_value(peer, ['peer-address', 0, 'data'], 'N/A'),
-            'peer_as': self._get_nested_value(peer, ['peer-as', 0, 'data'], 'N/A'),
-            'local_address': self._get_nested_value(peer, ['local-address', 0, 'data'], 'N/A'),
-            'local_as': self._get_nested_value(peer, ['local-as', 0, 'data'], 'N/A'),
-            'description': self._get_nested_value(peer, ['description', 0, 'data'], ''),
-            'peer_group': self._get_nested_value(peer, ['peer-group', 0, 'data'], 'N/A'),
-            'peer_type': self._get_nested_value(peer, ['peer-type', 0, 'data'], 'N/A'),
-            'peer_state': self._get_nested_value(peer, ['peer-state', 0, 'data'], 'N/A'),
-            'peer_flags': self._get_nested_value(peer, ['peer-flags', 0, 'data'], 'N/A'),
-            'local_interface_name': self._get_nested_value(peer, ['local-interface-name', 0, 'data'], 'N/A'),
-            'peer_id': self._get_nested_value(peer, ['peer-id', 0, 'data'], 'N/A'),
-            'local_id': self._get_nested_value(peer, ['local-id', 0, 'data'], 'N/A')
-        }
+        return extractors.extract_neighbor_basic(peer)
 
     def _parse_session_info(self, peer):
         """Parse informasi session"""
-        return {
-            'last_state': self._get_nested_value(peer, ['last-state', 0, 'data'], 'N/A'),
-            'last_event': self._get_nested_value(peer, ['last-event', 0, 'data'], 'N/A'),
-            'last_error': self._get_nested_value(peer, ['last-error', 0, 'data'], 'N/A'),
-            'flap_count': self._get_nested_value(peer, ['flap-count', 0, 'data'], '0'),
-            'last_flap_event': self._get_nested_value(peer, ['last-flap-event', 0, 'data'], 'N/A'),
-            'active_holdtime': self._get_nested_value(peer, ['active-holdtime', 0, 'data'], 'N/A'),
-            'keepalive_interval': self._get_nested_value(peer, ['keepalive-interval', 0, 'data'], 'N/A'),
-            'peer_restart_nlri_configured': self._get_nested_value(peer, ['peer-restart-nlri-configured', 0, 'data'], 'N/A'),
-            'peer_restart_nlri_negotiated': self._get_nested_value(peer, ['peer-restart-nlri-negotiated', 0, 'data'], 'N/A')
-        }
+        return extractors.extract_neighbor_session(peer)
 
     def _parse_neighbor_statistics(self, peer):
         """Parse statistics neighbor"""
-        return {
-            'input_messages': self._get_nested_value(peer, ['input-messages', 0, 'data'], '0'),
-            'input_updates': self._get_nested_value(peer, ['input-updates', 0, 'data'], '0'),
-            'input_refreshes': self._get_nested_value(peer, ['input-refreshes', 0, 'data'], '0'),
-            'input_octets': self._get_nested_value(peer, ['input-octets', 0, 'data'], '0'),
-            'output_messages': self._get_nested_value(peer, ['output-messages', 0, 'data'], '0'),
-            'output_updates': self._get_nested_value(peer, ['output-updates', 0, 'data'], '0'),
-            'output_refreshes': self._get_nested_value(peer, ['output-refreshes', 0, 'data'], '0'),
-            'output_octets': self._get_nested_value(peer, ['output-octets', 0, 'data'], '0'),
-            'last_received': self._get_nested_value(peer, ['last-received', 0, 'data'], 'N/A'),
-            'last_sent': self._get_nested_value(peer, ['last-sent', 0, 'data'], 'N/A'),
-            'last_checked': self._get_nested_value(peer, ['last-checked', 0, 'data'], 'N/A')
-        }
+        return extractors.extract_neighbor_statistics(peer)
 
     def _parse_neighbor_options(self, peer):
         """Parse options neighbor"""
@@ -788,15 +789,7 @@ class JuniperAPI:
         
         options = options_info[0] if options_info else {}
         
-        return {
-            'export_policy': self._get_nested_value(options, ['export-policy', 0, 'data'], 'N/A'),
-            'import_policy': self._get_nested_value(options, ['import-policy', 0, 'data'], 'N/A'),
-            'bgp_options': self._get_nested_value(options, ['bgp-options', 0, 'data'], 'N/A'),
-            'bgp_options_extended': self._get_nested_value(options, ['bgp-options-extended', 0, 'data'], 'N/A'),
-            'holdtime': self._get_nested_value(options, ['holdtime', 0, 'data'], 'N/A'),
-            'preference': self._get_nested_value(options, ['preference', 0, 'data'], 'N/A'),
-            'local_as': self._get_nested_value(options, ['local-as', 0, 'data'], 'N/A')
-        }
+        return extractors.extract_neighbor_options(options)
 
     def _parse_neighbor_errors(self, peer):
         """Parse error information"""
@@ -809,12 +802,7 @@ class JuniperAPI:
         for error in bgp_errors:
             if not error:
                 continue
-            error_data = {
-                'name': self._get_nested_value(error, ['name', 0, 'data'], 'N/A'),
-                'send_count': self._get_nested_value(error, ['send-count', 0, 'data'], '0'),
-                'receive_count': self._get_nested_value(error, ['receive-count', 0, 'data'], '0')
-            }
-            errors.append(error_data)
+            errors.append(extractors.extract_neighbor_error(error))
         
         return errors
 
@@ -829,18 +817,7 @@ class JuniperAPI:
         for rib in bgp_ribs:
             if not rib:
                 continue
-            rib_data = {
-                'name': self._get_nested_value(rib, ['name', 0, 'data'], 'N/A'),
-                'rib_bit': self._get_nested_value(rib, ['rib-bit', 0, 'data'], 'N/A'),
-                'bgp_rib_state': self._get_nested_value(rib, ['bgp-rib-state', 0, 'data'], 'N/A'),
-                'send_state': self._get_nested_value(rib, ['send-state', 0, 'data'], 'N/A'),
-                'active_prefix_count': self._get_nested_value(rib, ['active-prefix-count', 0, 'data'], '0'),
-                'received_prefix_count': self._get_nested_value(rib, ['received-prefix-count', 0, 'data'], '0'),
-                'accepted_prefix_count': self._get_nested_value(rib, ['accepted-prefix-count', 0, 'data'], '0'),
-                'suppressed_prefix_count': self._get_nested_value(rib, ['suppressed-prefix-count', 0, 'data'], '0'),
-                'advertised_prefix_count': self._get_nested_value(rib, ['advertised-prefix-count', 0, 'data'], '0')
-            }
-            ribs.append(rib_data)
+            ribs.append(extractors.extract_neighbor_rib(rib))
         
         return ribs
 
@@ -852,54 +829,39 @@ class JuniperAPI:
         
         bfd = bfd_info[0] if bfd_info else {}
         
-        return {
-            'bfd_configuration_state': self._get_nested_value(bfd, ['bfd-configuration-state', 0, 'data'], 'disabled'),
-            'bfd_operational_state': self._get_nested_value(bfd, ['bfd-operational-state', 0, 'data'], 'down')
-        }
+        return extractors.extract_bfd(bfd)
     
     # STATIC ROUTE
+    @metrics.timed_rpc('static_routes')
     def get_static_routes(self):
         """Mendapatkan static routes information"""
+        batched = self._batched('static_routes')
+        if batched is not None:
+            return batched
         try:
-            # XML request body untuk static routes
-            xml_body = """<get-route-information>
-        <brief/>
-        <protocol>static</protocol>
-    </get-route-information>"""
-            
-            response = requests.post(
-                f"{self.base_url}/rpc?stop-on-error=1",
-                auth=self.auth,
-                headers=self.headers,
-                data=xml_body,
-                timeout=15,
-                verify=self.verify
-            )
-            
-            print(f"🔧 STATIC ROUTES STATUS: {response.status_code}")
-            
-            if response.status_code == 200:
+            with self._post_rpc(STATIC_ROUTES_RPC) as response:
+                logger.debug("%s static_routes status %s", self.host, response.status_code)
+                
+                if response.status_code != 200:
+                    payload_capture.capture_response(self.host, 'static_routes', response)
+                    error_msg = f"API Error: {response.status_code} - {response.text}"
+                    logger.warning("%s static_routes gagal: HTTP %s", self.host, response.status_code)
+                    return False, error_msg
                 try:
-                    # Bersihkan response dari MIME boundary
-                    cleaned_response = self._clean_mime_response(response.text)
-                    data = json.loads(cleaned_response)
-                    print("🔧 STATIC ROUTES JSON PARSED SUCCESSFULLY")
+                    # Part JSON di-decode langsung dari stream multipart
+                    data = self._first_json(response, 'static_routes')
                     return True, self._parse_static_routes(data)
                 except json.JSONDecodeError as e:
-                    print(f"🔧 JSON DECODE ERROR: {e}")
-                    return self._parse_static_routes_manual(response.text)
-            else:
-                error_msg = f"API Error: {response.status_code} - {response.text}"
-                print(f"🔧 {error_msg}")
-                return False, error_msg
+                    logger.warning("%s static_routes JSON decode error: %s", self.host, e)
+                    return False, f"JSON decode error: {str(e)}"
                 
         except requests.exceptions.RequestException as e:
             error_msg = f"Connection error: {str(e)}"
-            print(f"🔧 {error_msg}")
+            logger.warning("%s static_routes connection error: %s", self.host, e)
             return False, error_msg
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
-            print(f"🔧 {error_msg}")
+            logger.exception("%s static_routes error tak terduga", self.host)
             return False, error_msg
 
     def _parse_static_routes(self, data):
@@ -922,15 +884,8 @@ class JuniperAPI:
                     if not table:
                         continue
                         
-                    route_table = {
-                        'table_name': self._get_nested_value(table, ['table-name', 0, 'data'], 'N/A'),
-                        'destination_count': self._get_nested_value(table, ['destination-count', 0, 'data'], '0'),
-                        'total_route_count': self._get_nested_value(table, ['total-route-count', 0, 'data'], '0'),
-                        'active_route_count': self._get_nested_value(table, ['active-route-count', 0, 'data'], '0'),
-                        'holddown_route_count': self._get_nested_value(table, ['holddown-route-count', 0, 'data'], '0'),
-                        'hidden_route_count': self._get_nested_value(table, ['hidden-route-count', 0, 'data'], '0'),
-                        'routes': []
-                    }
+                    route_table = extractors.extract_route_table(table)
+                    route_table['routes'] = []
                     
                     # Parse routes
                     routes = table.get('rt', [])
@@ -941,13 +896,14 @@ class JuniperAPI:
                         if not route:
                             continue
                         
+                        fields = extractors.extract_route(route)
                         route_data = {
-                            'destination': self._get_nested_value(route, ['rt-destination', 0, 'data'], 'N/A'),
-                            'is_active': self._get_nested_value(route, ['rt-entry', 0, 'active-tag', 0, 'data']) == '*',
-                            'protocol': self._get_nested_value(route, ['rt-entry', 0, 'protocol-name', 0, 'data'], 'N/A'),
-                            'preference': self._get_nested_value(route, ['rt-entry', 0, 'preference', 0, 'data'], 'N/A'),
-                            'age': self._get_nested_value(route, ['rt-entry', 0, 'age', 0, 'data'], 'N/A'),
-                            'age_seconds': self._get_nested_value(route, ['rt-entry', 0, 'age', 0, 'attributes', 'junos:seconds'], '0'),
+                            'destination': fields['destination'],
+                            'is_active': fields['active_tag'] == '*',
+                            'protocol': fields['protocol'],
+                            'preference': fields['preference'],
+                            'age': fields['age'],
+                            'age_seconds': fields['age_seconds'],
                             'next_hop': self._parse_next_hop(route)
                         }
                         
@@ -981,85 +937,41 @@ class JuniperAPI:
 
             engine = route_engines[0] or {}
 
-            def _v(path, default='N/A'):
-                return self._get_nested_value(engine, path, default)
-
-            temperature_text = _v(['temperature', 0, 'data'], 'N/A')
-            temperature_c = self._get_nested_value(engine, ['temperature', 0, 'attributes', 'junos:celsius'], None)
-
-            cpu_user = _v(['cpu-user', 0, 'data'], '0')
-            cpu_system = _v(['cpu-system', 0, 'data'], '0')
-            cpu_idle = _v(['cpu-idle', 0, 'data'], '0')
-
-            load_one = _v(['load-average-one', 0, 'data'], '0')
-            load_five = _v(['load-average-five', 0, 'data'], '0')
-            load_fifteen = _v(['load-average-fifteen', 0, 'data'], '0')
-
-            memory_dram = _v(['memory-dram-size', 0, 'data'], '0')
-            memory_installed = _v(['memory-installed-size', 0, 'data'], '0')
-
-            return {
-                'status': _v(['status', 0, 'data'], 'N/A'),
-                'model': _v(['model', 0, 'data'], 'N/A'),
-                'temperature': {
-                    'text': temperature_text,
-                    'celsius': temperature_c
-                },
-                'cpu': {
-                    'user': cpu_user,
-                    'system': cpu_system,
-                    'idle': cpu_idle,
-                    'background': _v(['cpu-background', 0, 'data'], '0'),
-                    'interrupt': _v(['cpu-interrupt', 0, 'data'], '0'),
-                    'load_average': {
-                        'one': load_one,
-                        'five': load_five,
-                        'fifteen': load_fifteen
-                    }
-                },
-                'memory': {
-                    'dram': memory_dram,
-                    'installed': memory_installed,
-                    'buffer_utilization': _v(['memory-buffer-utilization', 0, 'data'], '0')
-                },
-                'uptime': {
-                    'start_time': _v(['start-time', 0, 'data'], 'N/A'),
-                    'seconds_since_boot': self._get_nested_value(engine, ['start-time', 0, 'attributes', 'junos:seconds'], '0'),
-                    'up_time': _v(['up-time', 0, 'data'], 'N/A'),
-                    'up_time_seconds': self._get_nested_value(engine, ['up-time', 0, 'attributes', 'junos:seconds'], '0'),
-                    'last_reboot_reason': _v(['last-reboot-reason', 0, 'data'], 'N/A')
-                }
-            }
+            return extractors.extract_route_engine(engine)
         except Exception as e:
             return {'error': f"Parse error: {str(e)}"}
 
-    def _fallback_system_information(self):
-        """Fallback ketika multi-RPC gagal: panggil API terpisah"""
+    def _fallback_system_information(self, error=None):
+        """Fallback ketika multi-RPC gagal: panggil API terpisah (dilewati jika deadline sudah lewat)"""
+        if self._expired():
+            logger.info("%s system_info: deadline terlampaui, fallback dilewati", self.host)
+            return False, error or 'Batas waktu device terlampaui'
         sys_error = None
         re_error = None
 
         def _fetch(endpoint: str, parser, label: str):
             try:
-                resp = requests.get(
+                resp = self.session.get(
                     f"{self.base_url}{endpoint}",
-                    auth=self.auth,
-                    headers=self.headers,
-                    timeout=10,
-                    verify=self.verify
+                    timeout=self._timeout(10)
                 )
                 if resp.status_code == 200:
                     try:
-                        return parser(resp.json()), None
+                        metrics.RPC_RESPONSE_BYTES.labels('system_info').inc(len(resp.content))
+                        with metrics.timer(metrics.JSON_PARSE_DURATION, 'system_info'):
+                            payload = resp.json()
+                        return parser(payload), None
                     except json.JSONDecodeError as e:
-                        print(f"[JuniperAPI] Fallback {label} JSON decode error: {e}")
+                        logger.warning("%s fallback %s JSON decode error: %s", self.host, label, e)
                         return None, f"JSON decode error: {str(e)}"
-                print(f"[JuniperAPI] Fallback {label} HTTP status {resp.status_code}")
+                payload_capture.capture_response(self.host, 'system_info', resp)
+                logger.warning("%s fallback %s gagal: HTTP %s", self.host, label, resp.status_code)
                 return None, f"API Error: {resp.status_code}"
             except requests.exceptions.RequestException as e:
-                print(f"[JuniperAPI] Fallback {label} connection error: {e}")
+                logger.warning("%s fallback %s connection error: %s", self.host, label, e)
                 return None, f"Connection error: {str(e)}"
             except Exception as e:
-                print(f"[JuniperAPI] Fallback {label} unexpected error: {e}")
+                logger.warning("%s fallback %s error tak terduga", self.host, label, exc_info=True)
                 return None, f"Unexpected error: {str(e)}"
 
         with ThreadPoolExecutor(max_workers=2) as executor:
@@ -1098,7 +1010,7 @@ class JuniperAPI:
         entry = rt_entry[0]
         
         # Check for next-hop type (Discard, Reject, etc.)
-        nh_type = self._get_nested_value(entry, ['nh-type', 0, 'data'])
+        nh_type = extractors.extract_nh_type(entry)
         if nh_type and nh_type != 'N/A':
             next_hop['type'] = nh_type
             return next_hop
@@ -1108,74 +1020,45 @@ class JuniperAPI:
         if not isinstance(nh, list) or not nh:
             return next_hop
         
-        nh_data = nh[0]
-        next_hop['to'] = self._get_nested_value(nh_data, ['to', 0, 'data'], 'N/A')
-        next_hop['via'] = self._get_nested_value(nh_data, ['via', 0, 'data'], 'N/A')
-        next_hop['selected'] = self._get_nested_value(nh_data, ['selected-next-hop', 0, 'data']) is not None
+        fields = extractors.extract_next_hop(nh[0])
+        next_hop['to'] = fields['to']
+        next_hop['via'] = fields['via']
+        next_hop['selected'] = fields['selected'] is not None
         
         return next_hop
 
-    def _parse_static_routes_manual(self, response_text):
-        """Fallback parsing manual jika JSON parsing gagal"""
-        try:
-            # Coba ekstrak JSON secara manual
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = response_text[start_idx:end_idx]
-                data = json.loads(json_str)
-                return True, self._parse_static_routes(data)
-            else:
-                return False, "Tidak dapat menemukan JSON dalam response"
-        except Exception as e:
-            return False, f"Manual parsing error: {str(e)}"
-
     # INTERFACES
     # Dalam class JuniperAPI, tambahkan method berikut:
+    @metrics.timed_rpc('interfaces')
     def get_interfaces(self):
         """Mendapatkan interfaces configuration"""
+        batched = self._batched('interfaces')
+        if batched is not None:
+            return batched
         try:
-            # XML request body untuk interfaces
-            xml_body = """<get-configuration>
-        <configuration>
-            <interfaces/>
-        </configuration>
-    </get-configuration>"""
-            
-            response = requests.post(
-                f"{self.base_url}/rpc?stop-on-error=1",
-                auth=self.auth,
-                headers=self.headers,
-                data=xml_body,
-                timeout=15,
-                verify=self.verify
-            )
-            
-            print(f"🔧 INTERFACES STATUS: {response.status_code}")
-            
-            if response.status_code == 200:
+            with self._post_rpc(INTERFACES_RPC) as response:
+                logger.debug("%s interfaces status %s", self.host, response.status_code)
+                
+                if response.status_code != 200:
+                    payload_capture.capture_response(self.host, 'interfaces', response)
+                    error_msg = f"API Error: {response.status_code} - {response.text}"
+                    logger.warning("%s interfaces gagal: HTTP %s", self.host, response.status_code)
+                    return False, error_msg
                 try:
-                    # Bersihkan response dari MIME boundary
-                    cleaned_response = self._clean_mime_response(response.text)
-                    data = json.loads(cleaned_response)
-                    print("🔧 INTERFACES JSON PARSED SUCCESSFULLY")
+                    # Part JSON di-decode langsung dari stream multipart
+                    data = self._first_json(response, 'interfaces')
                     return True, self._parse_interfaces(data)
                 except json.JSONDecodeError as e:
-                    print(f"🔧 JSON DECODE ERROR: {e}")
-                    return self._parse_interfaces_manual(response.text)
-            else:
-                error_msg = f"API Error: {response.status_code} - {response.text}"
-                print(f"🔧 {error_msg}")
-                return False, error_msg
+                    logger.warning("%s interfaces JSON decode error: %s", self.host, e)
+                    return False, f"JSON decode error: {str(e)}"
                 
         except requests.exceptions.RequestException as e:
             error_msg = f"Connection error: {str(e)}"
-            print(f"🔧 {error_msg}")
+            logger.warning("%s interfaces connection error: %s", self.host, e)
             return False, error_msg
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
-            print(f"🔧 {error_msg}")
+            logger.exception("%s interfaces error tak terduga", self.host)
             return False, error_msg
 
     def _parse_interfaces(self, data):
@@ -1304,21 +1187,6 @@ class JuniperAPI:
         
         return options
 
-    def _parse_interfaces_manual(self, response_text):
-        """Fallback parsing manual jika JSON parsing gagal"""
-        try:
-            # Coba ekstrak JSON secara manual
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = response_text[start_idx:end_idx]
-                data = json.loads(json_str)
-                return True, self._parse_interfaces(data)
-            else:
-                return False, "Tidak dapat menemukan JSON dalam response"
-        except Exception as e:
-            return False, f"Manual parsing error: {str(e)}"
 
 
 
@@ -1341,6 +1209,19 @@ def _resolve_verify(use_ssl=False, rest_insecure=True):
     return use_ssl_flag, verify_ssl_flag
 
 
+def rest_connection_kwargs(port, use_ssl, verify_ssl):
+    """Normalise REST connection flags for Juniper API calls."""
+    resolved_port = port if port is not None else Config.API_DEFAULT_PORT
+    use_ssl_flag = bool(use_ssl)
+    verify_ssl_flag = bool(verify_ssl)
+    rest_insecure = not verify_ssl_flag if use_ssl_flag else True
+    return {
+        'port': resolved_port,
+        'use_ssl': use_ssl_flag,
+        'rest_insecure': rest_insecure
+    }
+
+
 def _resolve_gnmi_tls(gnmi_insecure=None, gnmi_use_ssl=None):
     """Derive gNMI TLS usage from various flag combinations."""
     if gnmi_use_ssl is not None:
@@ -1352,6 +1233,56 @@ def _resolve_gnmi_tls(gnmi_insecure=None, gnmi_use_ssl=None):
     return use_tls
 
 
+def _cache_key(rpc, ip_address, api, args=()):
+    return (ip_address, api.base_url, api.username, api.verify, rpc, args)
+
+
+def _cached_rpc(rpc, ip_address, api, method, *args):
+    """Jalankan RPC lewat cache TTL; hanya hasil sukses yang disimpan"""
+    ttl = Config.API_CACHE_TTL.get(rpc, 0) if Config.API_CACHE_ENABLED else 0
+    return rpc_cache.get_or_load(
+        _cache_key(rpc, ip_address, api, args),
+        ttl,
+        lambda: method(*args),
+        cacheable=lambda result: bool(result and result[0])
+    )
+
+
+def get_juniper_rpcs(ip_address, port, username, password, names, use_ssl=False, rest_insecure=True):
+    """Fungsi helper untuk beberapa RPC sekaligus (halaman overview device).
+
+    RPC yang belum ada di cache diambil dalam satu POST /rpc; hasilnya disimpan
+    ke cache per RPC seperti helper tunggal. Mengembalikan {nama: (success, data)}.
+    """
+    use_ssl_flag, verify_ssl_flag = _resolve_verify(use_ssl, rest_insecure)
+    api = JuniperAPI(
+        ip_address,
+        port,
+        username,
+        password,
+        use_ssl=use_ssl_flag,
+        verify_ssl=verify_ssl_flag
+    )
+    results = {name: rpc_cache.peek(_cache_key(name, ip_address, api)) for name in names}
+    missing = [name for name, result in results.items() if result is None]
+    fetched = {}
+
+    def load(name):
+        # Batch dikirim sekali saat RPC pertama yang belum di-cache dimuat
+        if not fetched:
+            fetched.update(api.get_rpcs(missing))
+        return fetched[name]
+
+    for name in missing:
+        results[name] = _cached_rpc(name, ip_address, api, functools.partial(load, name))
+    return results
+
+
+def invalidate_device_cache(ip_address=None):
+    """Buang hasil RPC yang tersimpan untuk device (atau semua device)"""
+    return rpc_cache.invalidate(ip_address)
+
+
 def get_juniper_bgp_neighbor_detail(ip_address, port, username, password, neighbor_address, use_ssl=False, rest_insecure=True):
     """Fungsi helper untuk get BGP neighbor detail"""
     use_ssl_flag, verify_ssl_flag = _resolve_verify(use_ssl, rest_insecure)
@@ -1363,7 +1294,7 @@ def get_juniper_bgp_neighbor_detail(ip_address, port, username, password, neighb
         use_ssl=use_ssl_flag,
         verify_ssl=verify_ssl_flag
     )
-    return api.get_bgp_neighbor_detail(neighbor_address)
+    return _cached_rpc('bgp_neighbor_detail', ip_address, api, api.get_bgp_neighbor_detail, neighbor_address)
 
 def test_juniper_connection(ip_address, port, username, password, use_ssl=False, rest_insecure=True):
     """Fungsi helper untuk test koneksi"""
@@ -1378,8 +1309,8 @@ def test_juniper_connection(ip_address, port, username, password, use_ssl=False,
     )
     return api.test_connection()
 
-def get_juniper_bgp_summary(ip_address, port, username, password, use_ssl=False, rest_insecure=True):
-    """Fungsi helper untuk get BGP summary"""
+def get_juniper_bgp_summary(ip_address, port, username, password, use_ssl=False, rest_insecure=True, deadline=None):
+    """Fungsi helper untuk get BGP summary (deadline: batas waktu absolut time.monotonic)"""
     use_ssl_flag, verify_ssl_flag = _resolve_verify(use_ssl, rest_insecure)
     api = JuniperAPI(
         ip_address,
@@ -1387,12 +1318,13 @@ def get_juniper_bgp_summary(ip_address, port, username, password, use_ssl=False,
         username,
         password,
         use_ssl=use_ssl_flag,
-        verify_ssl=verify_ssl_flag
+        verify_ssl=verify_ssl_flag,
+        deadline=deadline
     )
-    return api.get_bgp_summary()
+    return _cached_rpc('bgp_summary', ip_address, api, api.get_bgp_summary)
 
-def get_juniper_system_info(ip_address, port, username, password, use_ssl=False, rest_insecure=True):
-    """Fungsi helper untuk get system info"""
+def get_juniper_system_info(ip_address, port, username, password, use_ssl=False, rest_insecure=True, deadline=None):
+    """Fungsi helper untuk get system info (deadline: batas waktu absolut time.monotonic)"""
     use_ssl_flag, verify_ssl_flag = _resolve_verify(use_ssl, rest_insecure)
     api = JuniperAPI(
         ip_address,
@@ -1400,9 +1332,10 @@ def get_juniper_system_info(ip_address, port, username, password, use_ssl=False,
         username,
         password,
         use_ssl=use_ssl_flag,
-        verify_ssl=verify_ssl_flag
+        verify_ssl=verify_ssl_flag,
+        deadline=deadline
     )
-    return api.get_system_information()
+    return _cached_rpc('system_info', ip_address, api, api.get_system_information)
 
 def get_juniper_policy_options(ip_address, port, username, password, use_ssl=False, rest_insecure=True):
     """Fungsi helper untuk get policy options"""
@@ -1415,7 +1348,7 @@ def get_juniper_policy_options(ip_address, port, username, password, use_ssl=Fal
         use_ssl=use_ssl_flag,
         verify_ssl=verify_ssl_flag
     )
-    return api.get_policy_options()
+    return _cached_rpc('policy_options', ip_address, api, api.get_policy_options)
 
 # STATIC ROUTE
 def get_juniper_static_routes(ip_address, port, username, password, use_ssl=False, rest_insecure=True):
@@ -1429,7 +1362,7 @@ def get_juniper_static_routes(ip_address, port, username, password, use_ssl=Fals
         use_ssl=use_ssl_flag,
         verify_ssl=verify_ssl_flag
     )
-    return api.get_static_routes()
+    return _cached_rpc('static_routes', ip_address, api, api.get_static_routes)
 
 # INTERFACES
 def get_juniper_interfaces(ip_address, port, username, password, use_ssl=False, rest_insecure=True):
@@ -1443,7 +1376,7 @@ def get_juniper_interfaces(ip_address, port, username, password, use_ssl=False,
         use_ssl=use_ssl_flag,
         verify_ssl=verify_ssl_flag
     )
-    return api.get_interfaces()
+    return _cached_rpc('interfaces', ip_address, api, api.get_interfaces)
 
 
 # GRPC Traffic Monitoring functions
@@ -1487,10 +1420,45 @@ def get_interfaces_for_monitoring(ip_address, port, username, password, use_ssl=
                         })
             
             return True, monitoring_interfaces
+        if not success:
+            return False, interfaces_data
+        return False, "Data interface tidak tersedia"
     except Exception as e:
         return False, f"gNMI Error: {str(e)}"
 
 
+def resolve_monitoring_interfaces(ip_address, username, password, interfaces=None, patterns=None, **rest_args):
+    """Gabungkan nama interface eksplisit dengan regex yang dicocokkan ke daftar interface device.
+
+    Regex di-resolve sekali menjadi nama (lewat REST), sehingga subscription gNMI
+    memakai path ber-key per interface, bukan wildcard.
+    """
+    names = {name.strip() for name in interfaces or [] if isinstance(name, str) and name.strip()}
+    if not patterns:
+        return True, sorted(names)
+
+    try:
+        compiled = [re.compile(pattern) for pattern in patterns]
+    except (re.error, TypeError) as exc:
+        return False, f"Regex interface tidak valid: {exc}"
+
+    success, available = get_interfaces_for_monitoring(ip_address, username=username, password=password, **rest_args)
+    if not success:
+        return False, available
+    matched = {
+        item['name'] for item in available
+        if any(pattern.fullmatch(item['name']) for pattern in compiled)
+    }
+    if not matched:
+        return False, "Tidak ada interface yang cocok dengan pola"
+    return True, sorted(names | matched)
+
+
+def _gnmi_client_key(ip_address, gnmi_port, use_tls):
+    """Key client gNMI (dan riwayat traffic-nya) untuk satu device"""
+    return f"{ip_address}:{gnmi_port}:{1 if use_tls else 0}"
+
+
 def start_grpc_traffic_monitoring(
     ip_address,
     username,
@@ -1503,15 +1471,15 @@ def start_grpc_traffic_monitoring(
 ):
     """Start gRPC streaming untuk monitoring traffic"""
     try:
-        from src.juniper.gnmi_client import start_gnmi_monitoring
+        from src.juniper import telemetry
 
         gnmi_port = gnmi_port or Config.GNMI_DEFAULT_PORT
         gnmi_use_ssl = kwargs.pop('gnmi_use_ssl', None)
         kwargs.pop('gnmi_verify_ssl', None)
         use_tls = _resolve_gnmi_tls(gnmi_insecure=gnmi_insecure, gnmi_use_ssl=gnmi_use_ssl)
         # NOTE: gNMI client saat ini belum membedakan verify flag, hanya menentukan TLS on/off.
-        device_id = f"{ip_address}:{gnmi_port}:{1 if use_tls else 0}"
-        success, message = start_gnmi_monitoring(
+        device_id = _gnmi_client_key(ip_address, gnmi_port, use_tls)
+        success, message = telemetry.start_monitoring(
             device_id,
             ip_address,
             gnmi_port,
@@ -1520,6 +1488,8 @@ def start_grpc_traffic_monitoring(
             interface_filter,
             sample_interval_ms,
             use_tls,
+            viewer=kwargs.pop('viewer', None),
+            include_subinterfaces=kwargs.pop('include_subinterfaces', None),
         )
         return success, message
     except Exception as e:
@@ -1534,14 +1504,36 @@ def stop_grpc_traffic_monitoring(
 ):
     """Hentikan sesi monitoring untuk device tertentu"""
     try:
-        from src.juniper.gnmi_client import stop_gnmi_monitoring
+        from src.juniper import telemetry
 
         gnmi_port = gnmi_port or Config.GNMI_DEFAULT_PORT
         gnmi_use_ssl = kwargs.pop('gnmi_use_ssl', None)
         kwargs.pop('gnmi_verify_ssl', None)
         use_tls = _resolve_gnmi_tls(gnmi_insecure=gnmi_insecure, gnmi_use_ssl=gnmi_use_ssl)
-        device_id = f"{ip_address}:{gnmi_port}:{1 if use_tls else 0}"
-        return stop_gnmi_monitoring(device_id)
+        device_id = _gnmi_client_key(ip_address, gnmi_port, use_tls)
+        return telemetry.stop_monitoring(device_id, kwargs.pop('viewer', None))
+    except Exception as e:
+        return False, f"gNMI Error: {str(e)}"
+
+
+def update_traffic_subscription(
+    ip_address,
+    add=(),
+    remove=(),
+    gnmi_port: int | None = None,
+    gnmi_insecure: bool | None = None,
+    **kwargs,
+):
+    """Tambah/lepas interface pada stream gNMI yang sedang berjalan (tanpa restart)"""
+    try:
+        from src.juniper import telemetry
+
+        gnmi_port = gnmi_port or Config.GNMI_DEFAULT_PORT
+        gnmi_use_ssl = kwargs.pop('gnmi_use_ssl', None)
+        kwargs.pop('gnmi_verify_ssl', None)
+        use_tls = _resolve_gnmi_tls(gnmi_insecure=gnmi_insecure, gnmi_use_ssl=gnmi_use_ssl)
+        device_id = _gnmi_client_key(ip_address, gnmi_port, use_tls)
+        return telemetry.update_subscriptions(device_id, kwargs.pop('viewer', None), add, remove)
     except Exception as e:
         return False, f"gNMI Error: {str(e)}"
 
@@ -1556,14 +1548,81 @@ def get_live_traffic_data(
 ):
     """Get live traffic data from GRPC client"""
     try:
-        from src.juniper.gnmi_client import get_gnmi_traffic_data
+        from src.juniper import telemetry
 
         gnmi_port = gnmi_port or Config.GNMI_DEFAULT_PORT
         gnmi_use_ssl = kwargs.pop('gnmi_use_ssl', None)
         use_tls = _resolve_gnmi_tls(gnmi_insecure=gnmi_insecure, gnmi_use_ssl=gnmi_use_ssl)
-        device_id = f"{ip_address}:{gnmi_port}:{1 if use_tls else 0}"
-        traffic_data = get_gnmi_traffic_data(device_id)
+        device_id = _gnmi_client_key(ip_address, gnmi_port, use_tls)
+        traffic_data = telemetry.get_traffic(device_id)
 
         return True, traffic_data
     except Exception as e:
         return False, f"Error getting traffic data: {str(e)}"
+
+
+def subscribe_live_traffic(
+    ip_address,
+    interface_filter=None,
+    gnmi_port: int | None = None,
+    gnmi_insecure: bool | None = None,
+    **kwargs,
+):
+    """Subscribe ke update traffic sesi gNMI aktif (untuk endpoint SSE)"""
+    try:
+        from src.juniper import telemetry
+
+        gnmi_port = gnmi_port or Config.GNMI_DEFAULT_PORT
+        gnmi_use_ssl = kwargs.pop('gnmi_use_ssl', None)
+        use_tls = _resolve_gnmi_tls(gnmi_insecure=gnmi_insecure, gnmi_use_ssl=gnmi_use_ssl)
+        subscriber, message = telemetry.subscribe(
+            _gnmi_client_key(ip_address, gnmi_port, use_tls),
+            interface_filter,
+        )
+        if subscriber is None:
+            return False, message
+        return True, subscriber
+    except Exception as e:
+        return False, f"Error subscribing traffic stream: {str(e)}"
+
+
+def get_traffic_health(
+    ip_address,
+    gnmi_port: int | None = None,
+    gnmi_insecure: bool | None = None,
+    **kwargs,
+):
+    """Status stream gNMI (connecting/streaming/reconnecting/stopped)"""
+    try:
+        from src.juniper import telemetry
+
+        gnmi_port = gnmi_port or Config.GNMI_DEFAULT_PORT
+        gnmi_use_ssl = kwargs.pop('gnmi_use_ssl', None)
+        use_tls = _resolve_gnmi_tls(gnmi_insecure=gnmi_insecure, gnmi_use_ssl=gnmi_use_ssl)
+        return True, telemetry.get_health(_gnmi_client_key(ip_address, gnmi_port, use_tls))
+    except Exception as e:
+        return False, f"Error getting gNMI health: {str(e)}"
+
+
+def get_traffic_history_data(
+    ip_address,
+    start,
+    end,
+    step,
+    interface_filter=None,
+    gnmi_port: int | None = None,
+    gnmi_insecure: bool | None = None,
+    **kwargs,
+):
+    """Ambil riwayat rate interface (ring buffer + rollup SQLite) untuk device"""
+    try:
+        from src.juniper import telemetry
+
+        gnmi_port = gnmi_port or Config.GNMI_DEFAULT_PORT
+        gnmi_use_ssl = kwargs.pop('gnmi_use_ssl', None)
+        use_tls = _resolve_gnmi_tls(gnmi_insecure=gnmi_insecure, gnmi_use_ssl=gnmi_use_ssl)
+        return telemetry.query_history(
+            _gnmi_client_key(ip_address, gnmi_port, use_tls), start, end, step, interface_filter
+        )
+    except Exception as e:
+        return False, f"Error getting traffic history: {str(e)}"
@@ -0,0 +1,237 @@
+"""Varian async JuniperAPI di atas httpx (opsional).
+
+``AsyncJuniperAPI`` memakai parser yang sama dengan ``JuniperAPI``; hanya transport
+yang berbeda dan semua method RPC-nya adalah coroutine. Setiap event loop punya
+satu ``httpx.AsyncClient`` per device (keep-alive HTTP/1.1) dengan jumlah koneksi
+dibatasi ``API_ASYNC_HOST_CONCURRENCY``; RPC berikutnya menunggu koneksi bebas
+tanpa menahan thread. Membatalkan task (``task.cancel()`` atau timeout
+``asyncio.wait_for``) ikut membatalkan request yang sedang berjalan.
+
+Dipakai collector (``COLLECTOR_ENGINE=async``) dan bisa dipanggil dari handler
+ASGI mana pun, karena client dibuat di event loop pemanggil.
+"""
+import asyncio
+import json
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:  # pragma: no cover - httpx opsional
+    httpx = None
+    HAS_HTTPX = False
+
+from config import Config
+from src.juniper.api import (
+    INTERFACES_RPC,
+    POLICY_OPTIONS_RPC,
+    STATIC_ROUTES_RPC,
+    SYSTEM_INFO_RPC,
+    JuniperAPI,
+    _resolve_verify,
+    logger,
+)
+from src.juniper.multipart import iter_json_parts, json_loads
+from src.juniper.sessions import session_key
+from src.models.device import on_device_change
+from src.utils import metrics
+from src.utils.log import payload_capture
+
+# {event loop: {key sesi: (host, AsyncClient)}}; client hanya boleh dipakai di loop pembuatnya
+_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, tuple]]' = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def _build_client(base_url: str, username: str, password: str, verify: bool) -> 'httpx.AsyncClient':
+    limit = max(Config.API_ASYNC_HOST_CONCURRENCY, 1)
+    return httpx.AsyncClient(
+        base_url=base_url,
+        auth=(username, password),
+        verify=verify,
+        headers={'Content-Type': 'application/xml', 'Accept': 'application/json'},
+        limits=httpx.Limits(
+            max_connections=limit,
+            max_keepalive_connections=limit,
+            keepalive_expiry=Config.API_SESSION_IDLE_TIMEOUT,
+        ),
+    )
+
+
+def _get_client(base_url: str, host: str, username: str, password: str, verify: bool) -> 'httpx.AsyncClient':
+    loop = asyncio.get_running_loop()
+    key = session_key(base_url, username, password, verify)
+    with _clients_lock:
+        clients = _clients.setdefault(loop, {})
+        entry = clients.get(key)
+        if entry is None or entry[1].is_closed:
+            entry = clients[key] = (host, _build_client(base_url, username, password, verify))
+        return entry[1]
+
+
+def close_async_clients(host: Optional[str] = None) -> int:
+    """Tutup client milik device (atau semua) di setiap event loop; aman dipanggil dari thread mana pun"""
+    closing = []
+    with _clients_lock:
+        for loop, clients in list(_clients.items()):
+            for key, (client_host, client) in list(clients.items()):
+                if host is None or client_host == host:
+                    del clients[key]
+                    closing.append((loop, client))
+    for loop, client in closing:
+        if loop.is_closed():
+            continue
+        try:
+            loop.call_soon_threadsafe(loop.create_task, client.aclose())
+        except RuntimeError:
+            continue
+    return len(closing)
+
+
+async def aclose_clients():
+    """Tutup semua client milik event loop yang sedang berjalan (sebelum loop dihentikan)"""
+    with _clients_lock:
+        clients = _clients.pop(asyncio.get_running_loop(), {})
+    await asyncio.gather(*(client.aclose() for _, client in clients.values()), return_exceptions=True)
+
+
+@on_device_change
+def _on_device_changed(device_id, ip_addresses):
+    for ip_address in ip_addresses:
+        close_async_clients(ip_address)
+
+
+class AsyncJuniperAPI(JuniperAPI):
+    """JuniperAPI dengan transport httpx async; method RPC harus di-``await``"""
+
+    def __init__(self, ip_address, port, username, password, use_ssl=False, verify_ssl=False):
+        if not HAS_HTTPX:
+            raise RuntimeError("AsyncJuniperAPI membutuhkan paket httpx (pip install httpx)")
+        self.host = ip_address
+        self.username = username
+        self.password = password
+
+        scheme = 'https' if use_ssl else 'http'
+        self.base_url = f"{scheme}://{ip_address}:{port}"
+        self.verify = verify_ssl if use_ssl else False
+        # Session requests milik JuniperAPI tidak dipakai
+        self.session = None
+
+    def _client(self) -> 'httpx.AsyncClient':
+        return _get_client(self.base_url, self.host, self.username, self.password, self.verify)
+
+    def _json_parts(self, response, rpc):
+        """Semua part JSON dari body response yang sudah dibaca"""
+        chunks = payload_capture.wrap(self.host, rpc, response, metrics.count_bytes([response.content], rpc))
+        return list(iter_json_parts(
+            chunks,
+            response.headers.get('Content-Type'),
+            metrics.timed_loads(json_loads, rpc),
+        ))
+
+    async def _request(self, rpc, method, path, body=None, params=None, timeout=15) -> Tuple[bool, object]:
+        """(True, list part JSON) atau (False, pesan error) untuk satu request"""
+        try:
+            response = await self._client().request(
+                method, path, content=body, params=params,
+                timeout=httpx.Timeout(timeout, pool=timeout),
+            )
+        except httpx.HTTPError as e:
+            logger.warning("%s %s connection error: %s", self.host, rpc, e)
+            return False, f"Connection error: {str(e)}"
+
+        if response.status_code != 200:
+            payload_capture.capture_response(self.host, rpc, response)
+            logger.warning("%s %s gagal: HTTP %s", self.host, rpc, response.status_code)
+            return False, f"API Error: {response.status_code} - {response.text}"
+        try:
+            return True, self._json_parts(response, rpc)
+        except json.JSONDecodeError as e:
+            logger.warning("%s %s JSON decode error: %s", self.host, rpc, e)
+            return False, f"JSON decode error: {str(e)}"
+
+    async def _call(self, rpc, parser, method, path, body=None, params=None, timeout=15):
+        """Request satu RPC lalu parse part JSON pertama dengan parser JuniperAPI"""
+        success, parts = await self._request(rpc, method, path, body, params, timeout)
+        if not success:
+            return False, parts
+        if not parts:
+            return False, "JSON decode error: Tidak dapat menemukan JSON dalam response"
+        try:
+            return True, parser(parts[0])
+        except Exception as e:
+            logger.exception("%s %s error tak terduga", self.host, rpc)
+            return False, f"Unexpected error: {str(e)}"
+
+    @metrics.timed_rpc('test_connection')
+    async def test_connection(self):
+        """Test koneksi ke device Juniper"""
+        try:
+            response = await self._client().get('/rpc/get-system-information', timeout=10)
+            metrics.RPC_RESPONSE_BYTES.labels('test_connection').inc(len(response.content))
+            return response.status_code == 200, response.text
+        except httpx.HTTPError as e:
+            return False, f"Connection error: {str(e)}"
+
+    @metrics.timed_rpc('bgp_summary')
+    async def get_bgp_summary(self):
+        """Mendapatkan BGP summary information"""
+        return await self._call('bgp_summary', self._parse_bgp_summary, 'POST', '/rpc/get-bgp-summary-information', '')
+
+    @metrics.timed_rpc('system_info')
+    async def get_system_information(self):
+        """Mendapatkan system information dan route engine information sekaligus"""
+        success, parts = await self._request('system_info', 'POST', '/rpc?stop-on-error=1', SYSTEM_INFO_RPC)
+        if success and parts:
+            merged = self._merge_system_sections(parts)
+            if merged:
+                return True, merged
+        logger.info("%s system_info: request gabungan gagal (%s), fallback", self.host,
+                    parts if not success else 'tanpa JSON')
+        return await self._fallback_system_information()
+
+    async def _fallback_system_information(self):
+        """Fallback ketika multi-RPC gagal: dua RPC terpisah secara bersamaan"""
+        (sys_ok, system_data), (re_ok, route_engine_data) = await asyncio.gather(
+            self._call('system_info', self._parse_system_info, 'GET', '/rpc/get-system-information', timeout=10),
+            self._call('system_info', self._parse_route_engine_info, 'GET', '/rpc/get-route-engine-information', timeout=10),
+        )
+        sys_error = None if sys_ok else system_data
+        re_error = None if re_ok else route_engine_data
+        result = {
+            'system': system_data if sys_ok and system_data else ({'error': sys_error} if sys_error else None),
+            'route_engine': route_engine_data if re_ok and route_engine_data else ({'error': re_error} if re_error else None)
+        }
+        if sys_ok and system_data:
+            return True, result
+        return False, sys_error or 'Failed to retrieve system information'
+
+    @metrics.timed_rpc('policy_options')
+    async def get_policy_options(self):
+        """Mendapatkan policy options configuration"""
+        return await self._call('policy_options', self._parse_policy_options, 'POST', '/rpc?stop-on-error=1', POLICY_OPTIONS_RPC)
+
+    @metrics.timed_rpc('bgp_neighbor_detail')
+    async def get_bgp_neighbor_detail(self, neighbor_address):
+        """Mendapatkan detail informasi BGP neighbor"""
+        return await self._call(
+            'bgp_neighbor_detail', self._parse_bgp_neighbor_detail, 'GET',
+            '/rpc/get-bgp-neighbor-information', params={'neighbor-address': neighbor_address},
+        )
+
+    @metrics.timed_rpc('static_routes')
+    async def get_static_routes(self):
+        """Mendapatkan static routes information"""
+        return await self._call('static_routes', self._parse_static_routes, 'POST', '/rpc?stop-on-error=1', STATIC_ROUTES_RPC)
+
+    @metrics.timed_rpc('interfaces')
+    async def get_interfaces(self):
+        """Mendapatkan interfaces configuration"""
+        return await self._call('interfaces', self._parse_interfaces, 'POST', '/rpc?stop-on-error=1', INTERFACES_RPC)
+
+
+def async_juniper_api(ip_address, port, username, password, use_ssl=False, rest_insecure=True) -> AsyncJuniperAPI:
+    """AsyncJuniperAPI dari argumen yang sama dengan helper sync (lihat rest_connection_kwargs)"""
+    use_ssl_flag, verify_ssl_flag = _resolve_verify(use_ssl, rest_insecure)
+    return AsyncJuniperAPI(ip_address, port, username, password, use_ssl=use_ssl_flag, verify_ssl=verify_ssl_flag)
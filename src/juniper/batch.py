@@ -0,0 +1,114 @@
+"""Penggabungan RPC REST Junos: beberapa RPC dikirim dalam satu POST ``/rpc``.
+
+RPC yang diminta untuk device yang sama dalam jendela ``API_BATCH_WINDOW_MS``
+(mis. beberapa request AJAX satu halaman, atau endpoint overview yang memanggil
+semuanya sekaligus) digabung menjadi satu ``<rpc>...</rpc>``. Router membalas
+multipart dengan satu part per RPC sesuai urutan; setiap part dikembalikan ke
+pemanggilnya berdasarkan urutan dan key-nya (key top-level, atau ``induk/anak``
+untuk membedakan part seperti ``configuration`` milik beberapa RPC
+``get-configuration``). RPC yang tidak mendapat
+part (mis. error XML dari router) dikembalikan kosong agar caller mengulanginya
+sebagai request tersendiri.
+"""
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# Spesifikasi RPC: (elemen XML di dalam <rpc>, key part JSON balasan sesuai urutan;
+# "induk/anak" cocok dengan part yang punya dict induk berisi key anak)
+RPCSpec = Tuple[str, Tuple[str, ...]]
+
+
+def build_batch_body(specs: Iterable[RPCSpec]) -> str:
+    return '<rpc>\n' + '\n'.join(xml for xml, _ in specs) + '\n</rpc>'
+
+
+def _part_keys(part: Any) -> set:
+    if not isinstance(part, dict):
+        return set()
+    reply = part.get('rpc-reply')
+    top = dict(part, **reply) if isinstance(reply, dict) else part
+    keys = set(top)
+    for key, value in top.items():
+        if isinstance(value, dict):
+            keys.update(f"{key}/{child}" for child in value)
+    return keys
+
+
+def demux_parts(names: List[str], specs: Dict[str, RPCSpec], parts: Iterable[Any]) -> Dict[str, list]:
+    """Bagi part JSON ke RPC asalnya; part dicocokkan maju sesuai urutan RPC di body"""
+    expected = [(name, key) for name in names for key in specs[name][1]]
+    result: Dict[str, list] = {name: [] for name in names}
+    position = 0
+    for part in parts:
+        keys = _part_keys(part)
+        match = position
+        while match < len(expected) and expected[match][1] not in keys:
+            match += 1
+        if match == len(expected):
+            continue
+        result[expected[match][0]].append(part)
+        position = match + 1
+    return result
+
+
+class RPCBatcher:
+    """Antrean RPC satu device; pemanggil pertama menunggu ``window`` detik lalu mengirim semuanya"""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._lock = threading.Lock()
+        # RPC yang sama dari beberapa caller dalam satu jendela berbagi Future
+        self._pending: Dict[str, Future] = {}
+
+    def submit(self, names: Iterable[str], send: Callable[[List[str]], Tuple[bool, Any]]) -> Dict[str, Future]:
+        """Daftarkan RPC; Future berisi (True, list part) atau (False, pesan error/None).
+
+        ``send(names)`` dijalankan sekali per batch oleh caller pertama dan
+        mengembalikan (True, {nama: list part}) atau (False, pesan error/None).
+        """
+        futures = {}
+        with self._lock:
+            leader = not self._pending
+            for name in names:
+                future = self._pending.get(name)
+                if future is None:
+                    future = self._pending[name] = Future()
+                futures[name] = future
+        if leader:
+            if self.window > 0:
+                time.sleep(self.window)
+            self._flush(send)
+        return futures
+
+    def _flush(self, send):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        names = list(batch)
+        try:
+            success, payload = send(names)
+        except BaseException as exc:
+            for future in batch.values():
+                future.set_exception(exc)
+            return
+        if not success:
+            for future in batch.values():
+                future.set_result((False, payload))
+            return
+        for name, future in batch.items():
+            future.set_result((True, payload.get(name, [])))
+
+
+# Satu batcher per device/kredensial selama masih ada RPC yang menunggu
+_batchers: 'weakref.WeakValueDictionary[tuple, RPCBatcher]' = weakref.WeakValueDictionary()
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(key: tuple, window: float) -> RPCBatcher:
+    with _batchers_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = _batchers[key] = RPCBatcher(window)
+        return batcher
@@ -0,0 +1,111 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _InFlight:
+    """Satu pemanggilan RPC yang sedang berjalan dan ditunggu oleh caller lain"""
+
+    __slots__ = ('event', 'value', 'error', 'generation')
+
+    def __init__(self, generation: int):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+        self.generation = generation
+
+
+class RPCCache:
+    """TTL cache untuk hasil RPC dengan single-flight coalescing.
+
+    Key berbentuk tuple dengan elemen pertama berupa host device sehingga
+    invalidasi bisa dilakukan per device. Nilai yang dikembalikan dibagikan
+    ke semua caller, jadi perlakukan sebagai read-only.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, tuple] = {}
+        self._inflight: Dict[Hashable, _InFlight] = {}
+        self._generations: Dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(
+        self,
+        key: tuple,
+        ttl: float,
+        loader: Callable[[], Any],
+        cacheable: Callable[[Any], bool] = lambda value: True,
+    ):
+        """Kembalikan nilai cache atau jalankan loader (sekali untuk semua caller yang bersamaan)"""
+        if ttl <= 0:
+            return loader()
+
+        host = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight(self._generations.get(host, 0))
+                self._inflight[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = loader()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                # Jangan simpan hasil yang dimulai sebelum invalidasi device
+                if (
+                    call.error is None
+                    and call.generation == self._generations.get(host, 0)
+                    and cacheable(call.value)
+                ):
+                    self._store(key, call.value, ttl)
+            call.event.set()
+
+        return call.value
+
+    def peek(self, key: tuple):
+        """Nilai cache yang masih berlaku tanpa memicu load (None jika tidak ada)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        return None
+
+    def _store(self, key, value, ttl):
+        now = time.monotonic()
+        if len(self._entries) >= self.max_entries:
+            for stale_key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                del self._entries[stale_key]
+            while len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        self._entries[key] = (now + ttl, value)
+
+    def invalidate(self, host=None) -> int:
+        """Hapus entry cache untuk host tertentu (atau semua jika host None)"""
+        with self._lock:
+            keys = [key for key in self._entries if host is None or key[0] == host]
+            for key in keys:
+                del self._entries[key]
+            if host is None:
+                for known_host in list(self._generations):
+                    self._generations[known_host] += 1
+                for call_key in self._inflight:
+                    self._generations[call_key[0]] = self._generations.get(call_key[0], 0) + 1
+            else:
+                self._generations[host] = self._generations.get(host, 0) + 1
+        return len(keys)
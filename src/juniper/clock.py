@@ -0,0 +1,59 @@
+"""Estimasi offset jam router terhadap jam server dari timestamp notifikasi gNMI.
+
+Setiap notifikasi memberi satu sampel ``waktu terima - timestamp router`` yang
+sama dengan offset jam ditambah latency pengiriman. Latency tidak pernah
+negatif, sehingga nilai minimum dalam jendela waktu terakhir adalah estimasi
+offset terbaik; selisih sampel dengan offset itu adalah latency pengiriman
+(jaringan + antrean di server), yang dilaporkan terpisah dari rate.
+"""
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class ClockOffsetEstimator:
+    def __init__(self, window: float = 300.0, latency_samples: int = 256):
+        self.window = window
+        # Minimum geser: (waktu terima, sampel offset), sampel menaik dari depan ke belakang
+        self._minimums: Deque[Tuple[float, float]] = deque()
+        self._latencies: Deque[float] = deque(maxlen=latency_samples)
+        self.offset: Optional[float] = None
+        self.samples = 0
+
+    def observe(self, device_time: float, receive_time: float) -> float:
+        """Catat satu notifikasi; kembalikan latency pengiriman (detik)"""
+        sample = receive_time - device_time
+        minimums = self._minimums
+        while minimums and minimums[-1][1] >= sample:
+            minimums.pop()
+        minimums.append((receive_time, sample))
+        while minimums[0][0] < receive_time - self.window:
+            minimums.popleft()
+
+        self.offset = minimums[0][1]
+        self.samples += 1
+        latency = sample - self.offset
+        self._latencies.append(latency)
+        return latency
+
+    def to_local(self, device_time: float) -> float:
+        """Timestamp router dalam jam server"""
+        return device_time + (self.offset or 0.0)
+
+    def to_device(self, local_time: float) -> float:
+        """Waktu server dalam jam router"""
+        return local_time - (self.offset or 0.0)
+
+    def stats(self) -> Dict:
+        latencies = sorted(self._latencies)
+        if not latencies:
+            return {'offset': self.offset, 'samples': self.samples, 'latency_ms': None}
+        return {
+            'offset': self.offset,
+            'samples': self.samples,
+            'latency_ms': {
+                'last': self._latencies[-1] * 1000,
+                'avg': sum(latencies) / len(latencies) * 1000,
+                'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+                'max': latencies[-1] * 1000,
+            },
+        }
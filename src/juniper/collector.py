@@ -0,0 +1,379 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+from config import Config
+from src.juniper.api import (
+    get_juniper_bgp_summary,
+    get_juniper_static_routes,
+    get_juniper_system_info
+)
+from src.juniper.api_async import HAS_HTTPX, aclose_clients, async_juniper_api
+from src.juniper.registry import all_device_entries
+from src.models.device import on_device_change
+from src.models.snapshot import (
+    delete_device_snapshots,
+    get_device_snapshot,
+    prune_device_snapshots,
+    save_device_snapshot
+)
+from src.utils.log import get_logger
+
+logger = get_logger('collector')
+
+# Jenis data yang dipoll collector beserta helper REST-nya
+COLLECTOR_KINDS: Dict[str, Callable] = {
+    'system_info': get_juniper_system_info,
+    'bgp_summary': get_juniper_bgp_summary,
+    'static_routes': get_juniper_static_routes,
+}
+
+# Method AsyncJuniperAPI per jenis data (engine async)
+ASYNC_COLLECTOR_METHODS: Dict[str, str] = {
+    'system_info': 'get_system_information',
+    'bgp_summary': 'get_bgp_summary',
+    'static_routes': 'get_static_routes',
+}
+
+# Jeda sebelum mencoba lagi jika device masih sibuk melayani poll lain
+_BUSY_RETRY = 1.0
+# Poll pertama tiap device disebar dalam rentang ini agar tidak serentak saat start
+_STARTUP_SPREAD = 10.0
+
+
+def _bgp_peers_down(data) -> Optional[int]:
+    """Jumlah BGP peer yang tidak Established dari hasil get_juniper_bgp_summary"""
+    summary = data.get('summary') if isinstance(data, dict) else None
+    if not summary:
+        return None
+    try:
+        return int(summary.get('down_peer_count'))
+    except (TypeError, ValueError):
+        return sum(1 for peer in data.get('peers', []) if peer.get('peer_state') != 'Established')
+
+
+class SnapshotCollector:
+    """Scheduler yang mem-poll setiap device secara berkala dan menyimpan snapshot.
+
+    Setiap pasangan (device, jenis data) punya jadwal sendiri di satu heap.
+    Maksimal satu RPC berjalan per device sehingga beban ke router tetap
+    terbatas. Engine ``thread`` menjalankan RPC di pool thread (jumlah worker
+    membatasi total koneksi keluar); engine ``async`` menjalankannya sebagai
+    task di satu event loop dengan AsyncJuniperAPI, sehingga router yang lambat
+    tidak menghabiskan worker.
+    """
+
+    def __init__(self, intervals: Optional[Dict[str, int]] = None, workers: Optional[int] = None,
+                 engine: Optional[str] = None):
+        intervals = intervals if intervals is not None else Config.COLLECTOR_INTERVALS
+        self.intervals = {
+            kind: interval for kind, interval in intervals.items()
+            if kind in COLLECTOR_KINDS and interval and interval > 0
+        }
+        self.workers = max(workers or Config.COLLECTOR_WORKERS, 1)
+        engine = (engine or Config.COLLECTOR_ENGINE).lower()
+        if engine == 'auto':
+            engine = 'async' if HAS_HTTPX else 'thread'
+        elif engine == 'async' and not HAS_HTTPX:
+            logger.warning("COLLECTOR_ENGINE=async membutuhkan httpx, memakai engine thread")
+            engine = 'thread'
+        self.engine = engine
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cond = threading.Condition()
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._targets: Dict[int, tuple] = {}
+        self._busy = set()
+        self._next_refresh = 0.0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # Device registry -----------------------------------------------------
+
+    def mark_devices_dirty(self):
+        """Paksa daftar device dibaca ulang pada putaran scheduler berikutnya"""
+        with self._cond:
+            self._next_refresh = 0.0
+            self._cond.notify()
+
+    def _load_targets(self) -> Dict[int, tuple]:
+        return {
+            entry.device['id']: (entry.device, entry.password, entry.rest_args)
+            for entry in all_device_entries()
+            if entry.password
+        }
+
+    def _refresh_targets(self, now: float):
+        """Dipanggil dengan self._cond terkunci"""
+        try:
+            targets = self._load_targets()
+            prune_device_snapshots()
+        except Exception as exc:
+            logger.warning("Gagal membaca daftar device: %s", exc)
+            self._next_refresh = now + Config.COLLECTOR_DEVICE_REFRESH
+            return
+
+        new_ids = set(targets) - set(self._targets)
+        self._targets = targets
+        for device_id in new_ids:
+            for kind, interval in self.intervals.items():
+                delay = random.uniform(0, min(interval, _STARTUP_SPREAD))
+                self._push(now + delay, device_id, kind)
+        self._next_refresh = now + Config.COLLECTOR_DEVICE_REFRESH
+
+    def _push(self, due: float, device_id: int, kind: str):
+        heapq.heappush(self._queue, (due, next(self._seq), device_id, kind))
+
+    # Polling -------------------------------------------------------------
+
+    def collect(self, device_id: int, kind: str) -> Optional[bool]:
+        """Poll satu jenis data dari satu device dan simpan snapshot-nya"""
+        target = self._targets.get(device_id)
+        if not target:
+            return None
+        device, password, rest_args = target
+        started = time.monotonic()
+        try:
+            success, data = COLLECTOR_KINDS[kind](
+                ip_address=device['ip_address'],
+                username=device['username'],
+                password=password,
+                **rest_args
+            )
+        except Exception as exc:
+            success, data = False, f"Error: {exc}"
+        self._save(device_id, kind, success, data, started)
+        return success
+
+    async def collect_async(self, device_id: int, kind: str) -> Optional[bool]:
+        """Seperti collect(), lewat AsyncJuniperAPI di event loop pemanggil"""
+        target = self._targets.get(device_id)
+        if not target:
+            return None
+        device, password, rest_args = target
+        started = time.monotonic()
+        try:
+            api = async_juniper_api(device['ip_address'], username=device['username'], password=password, **rest_args)
+            success, data = await getattr(api, ASYNC_COLLECTOR_METHODS[kind])()
+        except Exception as exc:
+            success, data = False, f"Error: {exc}"
+        # Tulis SQLite di thread lain agar busy timeout tidak menahan event loop
+        await asyncio.to_thread(self._save, device_id, kind, success, data, started)
+        return success
+
+    def _save(self, device_id: int, kind: str, success: bool, data, started: float):
+        duration_ms = int((time.monotonic() - started) * 1000)
+        peers_down = _bgp_peers_down(data) if success and kind == 'bgp_summary' else None
+        try:
+            save_device_snapshot(device_id, kind, success, data, duration_ms, peers_down)
+        except Exception as exc:
+            logger.warning("Gagal menyimpan snapshot %s device %s: %s", kind, device_id, exc)
+
+    def _job_done(self, device_id: int, kind: str):
+        with self._cond:
+            self._busy.discard(device_id)
+            if device_id in self._targets:
+                self._push(time.monotonic() + self.intervals[kind], device_id, kind)
+            self._cond.notify()
+
+    def _run_job(self, device_id: int, kind: str):
+        try:
+            self.collect(device_id, kind)
+        finally:
+            self._job_done(device_id, kind)
+
+    async def _run_job_async(self, device_id: int, kind: str):
+        try:
+            await self.collect_async(device_id, kind)
+        finally:
+            self._job_done(device_id, kind)
+
+    def run_once(self) -> Dict[str, int]:
+        """Poll semua device untuk semua jenis data sekali, lalu kembali"""
+        with self._cond:
+            self._refresh_targets(time.monotonic())
+            targets = list(self._targets)
+
+        if self.engine == 'async':
+            results = asyncio.run(self._poll_all_async(targets))
+        else:
+            def poll_device(device_id):
+                # Jenis data untuk satu device dijalankan berurutan
+                return [self.collect(device_id, kind) for kind in self.intervals]
+
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='collector') as executor:
+                results = list(executor.map(poll_device, targets))
+        outcomes = [ok for device_results in results for ok in device_results]
+        return {'success': outcomes.count(True), 'failed': len(outcomes) - outcomes.count(True)}
+
+    async def _poll_all_async(self, targets) -> List[list]:
+        async def poll_device(device_id):
+            return [await self.collect_async(device_id, kind) for kind in self.intervals]
+        try:
+            return await asyncio.gather(*(poll_device(device_id) for device_id in targets))
+        finally:
+            await aclose_clients()
+
+    def run_forever(self):
+        """Loop scheduler; berhenti setelah stop() dipanggil"""
+        if self.engine == 'async':
+            self._loop = asyncio.new_event_loop()
+            loop_thread = threading.Thread(target=self._loop.run_forever, name='collector-aio', daemon=True)
+            loop_thread.start()
+            submit = lambda job: asyncio.run_coroutine_threadsafe(self._run_job_async(*job), self._loop)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='collector')
+            submit = lambda job: self._executor.submit(self._run_job, *job)
+        try:
+            while not self._stopped.is_set():
+                job = self._next_job()
+                if job:
+                    submit(job)
+        finally:
+            if self._executor:
+                self._executor.shutdown(wait=False)
+            if self._loop:
+                asyncio.run_coroutine_threadsafe(self._shutdown_loop(), self._loop)
+                loop_thread.join(timeout=10)
+                self._loop.close()
+                self._loop = None
+
+    async def _shutdown_loop(self):
+        """Batalkan RPC yang masih berjalan, tutup client httpx, lalu hentikan loop"""
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await aclose_clients()
+        asyncio.get_running_loop().stop()
+
+    def _next_job(self) -> Optional[tuple]:
+        with self._cond:
+            now = time.monotonic()
+            if now >= self._next_refresh:
+                self._refresh_targets(now)
+
+            if not self._queue:
+                self._cond.wait(timeout=max(self._next_refresh - now, 0.1))
+                return None
+
+            due, _, device_id, kind = self._queue[0]
+            if due > now:
+                self._cond.wait(timeout=min(due, self._next_refresh) - now)
+                return None
+
+            heapq.heappop(self._queue)
+            if device_id not in self._targets:
+                return None
+            if device_id in self._busy:
+                self._push(now + _BUSY_RETRY, device_id, kind)
+                return None
+            self._busy.add(device_id)
+            return device_id, kind
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run_forever, name='snapshot-collector', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+
+
+# Collector di proses ini (jika berjalan di dalam aplikasi web)
+_collector: Optional[SnapshotCollector] = None
+_lock_file = None
+
+
+def acquire_collector_lock() -> bool:
+    """Pastikan hanya satu proses (worker gunicorn atau CLI) yang menjalankan collector"""
+    global _lock_file
+    if _lock_file is not None:
+        return True
+    if fcntl is None:
+        return True
+    os.makedirs(os.path.dirname(Config.COLLECTOR_LOCK_PATH), exist_ok=True)
+    handle = open(Config.COLLECTOR_LOCK_PATH, 'a+')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    _lock_file = handle
+    return True
+
+
+def start_collector() -> Optional[SnapshotCollector]:
+    """Jalankan collector di background thread jika belum ada proses lain yang menjalankannya"""
+    global _collector
+    if _collector is not None:
+        return _collector
+    if not acquire_collector_lock():
+        return None
+    _collector = SnapshotCollector()
+    _collector.start()
+    logger.info("Berjalan di PID %s (engine %s, %s worker)", os.getpid(), _collector.engine, _collector.workers)
+    return _collector
+
+
+@on_device_change
+def _on_device_changed(device_id, ip_addresses):
+    """Snapshot lama tidak lagi valid setelah device diubah/dihapus"""
+    try:
+        delete_device_snapshots(device_id)
+    except Exception:
+        pass
+    if _collector is not None:
+        _collector.mark_devices_dirty()
+
+
+def get_snapshot(device_id: int, kind: str) -> Optional[Dict]:
+    """Snapshot yang masih layak ditampilkan, lengkap dengan indikator staleness.
+
+    Mengembalikan None jika belum ada data sukses atau umurnya melewati
+    COLLECTOR_SNAPSHOT_MAX_AGE (caller sebaiknya fallback ke RPC langsung).
+    """
+    snapshot = get_device_snapshot(device_id, kind)
+    if not snapshot or snapshot['data'] is None:
+        return None
+    if snapshot['age'] > Config.COLLECTOR_SNAPSHOT_MAX_AGE:
+        return None
+    interval = Config.COLLECTOR_INTERVALS.get(kind) or 0
+    snapshot['stale'] = interval <= 0 or snapshot['age'] > interval * Config.COLLECTOR_STALE_FACTOR
+    return snapshot
+
+
+def snapshot_meta(snapshot: Optional[Dict]) -> Dict:
+    """Informasi sumber data untuk ditampilkan di UI / response JSON"""
+    if not snapshot:
+        return {'source': 'live', 'collected_at': time.time(), 'age': 0, 'stale': False, 'error': None}
+    return {
+        'source': 'snapshot',
+        'collected_at': snapshot['collected_at'],
+        'age': round(snapshot['age'], 1),
+        'stale': snapshot['stale'],
+        'error': snapshot['error'],
+    }
@@ -0,0 +1,218 @@
+"""Penyimpanan counter interface gNMI dalam bentuk kolom (NumPy).
+
+Setiap interface mendapat id baris tetap; setiap metric adalah kolom. Update
+satu notifikasi ditulis sekaligus (fancy indexing), lalu delta dan rate untuk
+semua interface yang tersentuh dihitung dalam satu operasi vektor. Snapshot
+sebelumnya disimpan dengan menyalin baris array, bukan menyalin dict.
+
+Delta negatif tidak lagi dipotong ke nol: wrap counter 64-bit (lebar leaf
+``counter64`` OpenConfig) dihitung ulang, sedangkan clear counter (delta negatif
+lain atau perubahan ``last-clear``/``carrier-transitions``) membuat baseline baru
+tanpa sampel rate palsu.
+"""
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+METRICS = ('in_octets', 'out_octets', 'in_pkts', 'out_pkts', 'in_errors', 'out_errors')
+METRIC_INDEX = {name: index for index, name in enumerate(METRICS)}
+RATE_FIELDS = ('in_rate', 'out_rate', 'in_pps', 'out_pps', 'in_errors_rate', 'out_errors_rate')
+# Leaf penanda diskontinuitas: disimpan sebagai kolom tambahan, tidak dihitung rate-nya
+MARKERS = ('last_clear', 'carrier_transitions')
+COLUMN_INDEX = {name: index for index, name in enumerate(METRICS + MARKERS)}
+# Semua counter yang disubscribe adalah counter64; heuristik 32-bit akan membaca clear
+# counter bernilai 2^31..2^32 sebagai wrap dan menghasilkan lonjakan rate palsu
+COUNTER_WIDTHS = (64,)
+
+# Octet dikonversi ke bit per detik, sisanya per detik
+_RATE_SCALE = np.array([8.0, 8.0, 1.0, 1.0, 1.0, 1.0])
+
+# Status baris: belum ada snapshot, baseline pertama, sudah siap dihitung rate-nya
+_EMPTY, _BASELINE, _PRIMED = 0, 1, 2
+
+# Baris dianggap idle jika tidak ada update selama lebih dari faktor ini x interval
+IDLE_FACTOR = 1.5
+
+
+class RateBatch(NamedTuple):
+    """Hasil ``CounterTable.compute`` untuk satu notifikasi"""
+    baseline_rows: np.ndarray   # baseline awal/priming, belum ada rate
+    rate_rows: np.ndarray       # baris dengan rate baru
+    rates: np.ndarray           # rate per detik untuk rate_rows (kolom RATE_FIELDS)
+    wrapped: np.ndarray         # per rate_rows: ada counter yang wrap
+    gaps: np.ndarray            # per rate_rows: jeda antar sampel melebihi ambang gap
+    reset_rows: np.ndarray      # counter di-clear/diskontinu: baseline baru, tanpa rate
+
+
+def _unwrap(previous: np.ndarray, current: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Delta counter dengan koreksi wrap; kembalikan (delta, mask wrap).
+
+    Delta negatif dianggap wrap jika kedua nilai muat dalam lebar counter dan
+    jarak setelah wrap kurang dari setengah rentangnya; selain itu tetap negatif
+    (diperlakukan sebagai reset oleh pemanggil).
+    """
+    deltas = current - previous
+    negative = deltas < 0
+    unwrapped = np.full_like(deltas, np.inf)
+    for width in COUNTER_WIDTHS:
+        span = float(2 ** width)
+        candidate = current + span - previous
+        # <= karena nilai mendekati 2^64 dibulatkan ke 2^64 oleh float64
+        fits = negative & (previous <= span) & (current < span) & (candidate < span / 2)
+        unwrapped = np.where(fits & (candidate < unwrapped), candidate, unwrapped)
+    wrapped = negative & np.isfinite(unwrapped)
+    return np.where(wrapped, unwrapped, deltas), wrapped
+
+
+class CounterTable:
+    def __init__(self, capacity: int = 64):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity: int):
+        width = len(COLUMN_INDEX)
+        old = getattr(self, 'values', None)
+        values = np.zeros((capacity, width))
+        previous = np.zeros((capacity, width))
+        previous_time = np.zeros(capacity)
+        state = np.zeros(capacity, dtype=np.int8)
+        subinterface = np.zeros(capacity, dtype=bool)
+        if old is not None:
+            size = len(self.names)
+            values[:size] = self.values[:size]
+            previous[:size] = self.previous[:size]
+            previous_time[:size] = self.previous_time[:size]
+            state[:size] = self.state[:size]
+            subinterface[:size] = self.subinterface[:size]
+        self.values, self.previous, self.previous_time, self.state = values, previous, previous_time, state
+        self.subinterface = subinterface
+
+    def intern(self, name: str, subinterface: bool = False) -> int:
+        """Id baris untuk interface (dibuat jika belum ada)"""
+        row = self.index.get(name)
+        if row is None:
+            row = len(self.names)
+            if row >= len(self.state):
+                self._allocate(len(self.state) * 2)
+            self.names.append(name)
+            self.index[name] = row
+            self.subinterface[row] = subinterface
+        return row
+
+    def _expected_interval(self, rows: np.ndarray, intervals: Tuple[float, float]) -> np.ndarray:
+        return np.where(self.subinterface[rows], intervals[1], intervals[0])
+
+    def update(self, rows: Sequence[int], columns: Sequence[int], values: Sequence[float]) -> np.ndarray:
+        """Tulis semua nilai counter satu notifikasi; kembalikan id baris unik yang tersentuh"""
+        rows = np.asarray(rows, dtype=np.intp)
+        self.values[rows, np.asarray(columns, dtype=np.intp)] = values
+        return np.unique(rows)
+
+    def counters(self, row: int) -> Dict[str, float]:
+        return dict(zip(METRICS, self.values[row].tolist()))
+
+    def compute(
+        self,
+        rows: np.ndarray,
+        now: float,
+        idle: Optional[Tuple[float, float]] = None,
+        gap: Optional[Tuple[float, float]] = None,
+    ) -> RateBatch:
+        """Hitung rate untuk baris yang tersentuh (``now`` = waktu sampel).
+
+        ``idle`` berisi interval (detik) interface dan subinterface untuk
+        subscription yang tidak mengirim ulang counter yang tetap (0 = selalu
+        dikirim). Setelah jeda idle, perubahan counter terjadi dalam interval
+        terakhir, sehingga rate dihitung terhadap satu interval, bukan seluruh jeda.
+
+        ``gap`` berisi ambang jeda (detik) interface dan subinterface; sampel
+        dengan jeda lebih panjang ditandai di ``RateBatch.gaps`` (0 = tidak dicek).
+        """
+        state = self.state[rows]
+        elapsed = now - self.previous_time[rows]
+        valid = elapsed > 0
+        gapped = np.zeros(len(rows), dtype=bool)
+        if gap is not None:
+            threshold = self._expected_interval(rows, gap)
+            gapped = (threshold > 0) & (elapsed > threshold)
+        if idle is not None:
+            expected = self._expected_interval(rows, idle)
+            elapsed = np.where((expected > 0) & (elapsed > expected * IDLE_FACTOR), expected, elapsed)
+
+        new = state == _EMPTY
+        # Delta pertama setelah baseline dilewati agar tidak ada spike awal
+        priming = (state == _BASELINE) & valid
+        ready = (state == _PRIMED) & valid
+
+        width = len(METRICS)
+        ready_rows = rows[ready]
+        deltas, wrap = _unwrap(self.previous[ready_rows, :width], self.values[ready_rows, :width])
+        # Penanda berubah dari nilai sebelumnya (bukan dari nol/belum diterima) berarti counter di-clear
+        markers, previous_markers = self.values[ready_rows, width:], self.previous[ready_rows, width:]
+        cleared = np.any((markers != previous_markers) & (previous_markers != 0), axis=1)
+        reset = np.any(deltas < 0, axis=1) | cleared
+
+        keep = ~reset
+        rates = deltas[keep] / elapsed[ready][keep, None] * _RATE_SCALE
+
+        advance = rows[new | priming | ready]
+        self.previous[advance] = self.values[advance]
+        self.previous_time[advance] = now
+        self.state[rows[new]] = _BASELINE
+        self.state[rows[priming]] = _PRIMED
+
+        return RateBatch(
+            baseline_rows=rows[new | priming],
+            rate_rows=ready_rows[keep],
+            rates=rates,
+            wrapped=np.any(wrap, axis=1)[keep],
+            gaps=gapped[ready][keep],
+            reset_rows=ready_rows[reset],
+        )
+
+    def idle_rows(self, now: float, idle: Tuple[float, float]) -> np.ndarray:
+        """Baris siap yang tidak mendapat update lebih dari ``IDLE_FACTOR`` x interval"""
+        rows = np.flatnonzero(self.state[:len(self.names)] == _PRIMED)
+        expected = self._expected_interval(rows, idle)
+        stale = (expected > 0) & (now - self.previous_time[rows] > expected * IDLE_FACTOR)
+        return rows[stale]
+
+
+# Penanda path yang sudah diperiksa tetapi bukan counter interface yang dipetakan
+UNMAPPED = (-1, -1)
+
+
+class PathCache:
+    """LRU path gNMI terserialisasi -> (id baris interface, id kolom metric).
+
+    Path yang sama muncul berulang setiap sample, sehingga resolusi nama
+    interface/metric (string building) hanya terjadi sekali per path.
+    ``maxsize`` 0 menonaktifkan cache.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, Tuple[int, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[Tuple[int, int]]:
+        target = self._entries.get(key)
+        if target is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return target
+
+    def put(self, key: tuple, target: Tuple[int, int]):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = target
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,248 @@
+"""Extractor field Junos JSON yang dikompilasi sekali.
+
+Junos membungkus setiap nilai sebagai ``{"key": [{"data": "..."}]}`` sehingga
+parser lama memanggil ``_get_nested_value(record, ['key', 0, 'data'])``
+berulang kali per baris. Di sini spesifikasi field dideklarasikan sekali lalu
+dikompilasi menjadi satu fungsi Python per jenis record yang melakukan
+subscript langsung; key yang hilang atau tipe yang tidak cocok menghasilkan
+nilai default, sama seperti ``_get_nested_value``.
+"""
+from typing import Any, Callable, Dict, Sequence, Tuple, Union
+
+FieldSpec = Tuple[Sequence[Union[str, int]], Any]
+RecordSpec = Dict[str, Union[FieldSpec, 'RecordSpec']]
+
+_MISSING_ERRORS = (KeyError, IndexError, TypeError)
+
+
+def _subscript(path: Sequence[Union[str, int]]) -> str:
+    return ''.join(f'[{key!r}]' for key in path)
+
+
+def compile_record(name: str, spec: RecordSpec) -> Callable[[Any], Dict[str, Any]]:
+    """Kompilasi spesifikasi ``{output_key: (path, default)}`` menjadi fungsi extractor.
+
+    Nilai spesifikasi boleh berupa dict lain untuk menghasilkan output bertingkat.
+    """
+    lines = [f'def extract_{name}(record):']
+    namespace: Dict[str, Any] = {'_MISSING_ERRORS': _MISSING_ERRORS}
+    counter = [0]
+
+    def emit_fields(fields: RecordSpec) -> str:
+        items = []
+        for output_key, field in fields.items():
+            if isinstance(field, dict):
+                items.append(f'{output_key!r}: {emit_fields(field)}')
+                continue
+            path, default = field
+            index = counter[0]
+            counter[0] += 1
+            namespace[f'_d{index}'] = default
+            lines.extend([
+                '    try:',
+                f'        v{index} = record{_subscript(path)}',
+                '    except _MISSING_ERRORS:',
+                f'        v{index} = None',
+            ])
+            items.append(f'{output_key!r}: _d{index} if v{index} is None else v{index}')
+        return '{' + ', '.join(items) + '}'
+
+    body = emit_fields(spec)
+    lines.append(f'    return {body}')
+    exec(compile('\n'.join(lines), f'<extractor {name}>', 'exec'), namespace)
+    return namespace[f'extract_{name}']
+
+
+def compile_path(path: Sequence[Union[str, int]], default: Any = 'N/A') -> Callable[[Any], Any]:
+    """Extractor untuk satu nilai (pengganti ``_get_nested_value`` dengan path tetap)"""
+    extract = compile_record('value', {'value': (path, default)})
+    return lambda record: extract(record)['value']
+
+
+def data(key: str, default: Any = 'N/A') -> FieldSpec:
+    """Path standar Junos ``key[0].data``"""
+    return ([key, 0, 'data'], default)
+
+
+def seconds(key: str, default: Any = '0') -> FieldSpec:
+    """Path atribut ``key[0].attributes['junos:seconds']``"""
+    return ([key, 0, 'attributes', 'junos:seconds'], default)
+
+
+# BGP SUMMARY
+extract_bgp_summary_counts = compile_record('bgp_summary_counts', {
+    'peer_count': data('peer-count', '0'),
+    'group_count': data('group-count', '0'),
+    'down_peer_count': data('down-peer-count', '0'),
+    'bgp_thread_mode': data('bgp-thread-mode', 'N/A'),
+})
+
+extract_peer_state = compile_path(['peer-state', 0, 'data'], None)
+
+extract_bgp_peer = compile_record('bgp_peer', {
+    'peer_address': data('peer-address'),
+    'peer_as': data('peer-as'),
+    'peer_state': data('peer-state'),
+    'description': data('description', ''),
+    'input_messages': data('input-messages', '0'),
+    'output_messages': data('output-messages', '0'),
+    'flap_count': data('flap-count', '0'),
+    'elapsed_time': data('elapsed-time'),
+})
+
+extract_bgp_peer_rib = compile_record('bgp_peer_rib', {
+    'name': data('name'),
+    'active_prefix_count': data('active-prefix-count', '0'),
+    'received_prefix_count': data('received-prefix-count', '0'),
+})
+
+extract_bgp_rib = compile_record('bgp_rib', {
+    'name': data('name'),
+    'total_prefix_count': data('total-prefix-count', '0'),
+    'active_prefix_count': data('active-prefix-count', '0'),
+    'received_prefix_count': data('received-prefix-count', '0'),
+    'accepted_prefix_count': data('accepted-prefix-count', '0'),
+})
+
+# BGP NEIGHBOR DETAIL
+extract_neighbor_basic = compile_record('neighbor_basic', {
+    'peer_address': data('peer-address'),
+    'peer_as': data('peer-as'),
+    'local_address': data('local-address'),
+    'local_as': data('local-as'),
+    'description': data('description', ''),
+    'peer_group': data('peer-group'),
+    'peer_type': data('peer-type'),
+    'peer_state': data('peer-state'),
+    'peer_flags': data('peer-flags'),
+    'local_interface_name': data('local-interface-name'),
+    'peer_id': data('peer-id'),
+    'local_id': data('local-id'),
+})
+
+extract_neighbor_session = compile_record('neighbor_session', {
+    'last_state': data('last-state'),
+    'last_event': data('last-event'),
+    'last_error': data('last-error'),
+    'flap_count': data('flap-count', '0'),
+    'last_flap_event': data('last-flap-event'),
+    'active_holdtime': data('active-holdtime'),
+    'keepalive_interval': data('keepalive-interval'),
+    'peer_restart_nlri_configured': data('peer-restart-nlri-configured'),
+    'peer_restart_nlri_negotiated': data('peer-restart-nlri-negotiated'),
+})
+
+extract_neighbor_statistics = compile_record('neighbor_statistics', {
+    'input_messages': data('input-messages', '0'),
+    'input_updates': data('input-updates', '0'),
+    'input_refreshes': data('input-refreshes', '0'),
+    'input_octets': data('input-octets', '0'),
+    'output_messages': data('output-messages', '0'),
+    'output_updates': data('output-updates', '0'),
+    'output_refreshes': data('output-refreshes', '0'),
+    'output_octets': data('output-octets', '0'),
+    'last_received': data('last-received'),
+    'last_sent': data('last-sent'),
+    'last_checked': data('last-checked'),
+})
+
+extract_neighbor_options = compile_record('neighbor_options', {
+    'export_policy': data('export-policy'),
+    'import_policy': data('import-policy'),
+    'bgp_options': data('bgp-options'),
+    'bgp_options_extended': data('bgp-options-extended'),
+    'holdtime': data('holdtime'),
+    'preference': data('preference'),
+    'local_as': data('local-as'),
+})
+
+extract_neighbor_error = compile_record('neighbor_error', {
+    'name': data('name'),
+    'send_count': data('send-count', '0'),
+    'receive_count': data('receive-count', '0'),
+})
+
+extract_neighbor_rib = compile_record('neighbor_rib', {
+    'name': data('name'),
+    'rib_bit': data('rib-bit'),
+    'bgp_rib_state': data('bgp-rib-state'),
+    'send_state': data('send-state'),
+    'active_prefix_count': data('active-prefix-count', '0'),
+    'received_prefix_count': data('received-prefix-count', '0'),
+    'accepted_prefix_count': data('accepted-prefix-count', '0'),
+    'suppressed_prefix_count': data('suppressed-prefix-count', '0'),
+    'advertised_prefix_count': data('advertised-prefix-count', '0'),
+})
+
+extract_bfd = compile_record('bfd', {
+    'bfd_configuration_state': data('bfd-configuration-state', 'disabled'),
+    'bfd_operational_state': data('bfd-operational-state', 'down'),
+})
+
+# SYSTEM / ROUTE ENGINE
+extract_system_info = compile_record('system_info', {
+    'hostname': data('host-name'),
+    'model': data('hardware-model'),
+    'os_version': data('os-version'),
+    'serial_number': data('serial-number'),
+})
+
+extract_route_engine = compile_record('route_engine', {
+    'status': data('status'),
+    'model': data('model'),
+    'temperature': {
+        'text': data('temperature'),
+        'celsius': (['temperature', 0, 'attributes', 'junos:celsius'], None),
+    },
+    'cpu': {
+        'user': data('cpu-user', '0'),
+        'system': data('cpu-system', '0'),
+        'idle': data('cpu-idle', '0'),
+        'background': data('cpu-background', '0'),
+        'interrupt': data('cpu-interrupt', '0'),
+        'load_average': {
+            'one': data('load-average-one', '0'),
+            'five': data('load-average-five', '0'),
+            'fifteen': data('load-average-fifteen', '0'),
+        },
+    },
+    'memory': {
+        'dram': data('memory-dram-size', '0'),
+        'installed': data('memory-installed-size', '0'),
+        'buffer_utilization': data('memory-buffer-utilization', '0'),
+    },
+    'uptime': {
+        'start_time': data('start-time'),
+        'seconds_since_boot': seconds('start-time'),
+        'up_time': data('up-time'),
+        'up_time_seconds': seconds('up-time'),
+        'last_reboot_reason': data('last-reboot-reason'),
+    },
+})
+
+# STATIC ROUTE
+extract_route_table = compile_record('route_table', {
+    'table_name': data('table-name'),
+    'destination_count': data('destination-count', '0'),
+    'total_route_count': data('total-route-count', '0'),
+    'active_route_count': data('active-route-count', '0'),
+    'holddown_route_count': data('holddown-route-count', '0'),
+    'hidden_route_count': data('hidden-route-count', '0'),
+})
+
+extract_route = compile_record('route', {
+    'destination': data('rt-destination'),
+    'active_tag': (['rt-entry', 0, 'active-tag', 0, 'data'], None),
+    'protocol': (['rt-entry', 0, 'protocol-name', 0, 'data'], 'N/A'),
+    'preference': (['rt-entry', 0, 'preference', 0, 'data'], 'N/A'),
+    'age': (['rt-entry', 0, 'age', 0, 'data'], 'N/A'),
+    'age_seconds': (['rt-entry', 0, 'age', 0, 'attributes', 'junos:seconds'], '0'),
+})
+
+extract_next_hop = compile_record('next_hop', {
+    'to': data('to'),
+    'via': data('via'),
+    'selected': data('selected-next-hop'),
+})
+
+extract_nh_type = compile_path(['nh-type', 0, 'data'])
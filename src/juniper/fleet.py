@@ -0,0 +1,145 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, Optional
+
+from config import Config
+from src.juniper.api import get_juniper_bgp_summary, get_juniper_system_info
+
+# Worker pool bersama untuk semua request fleet agar jumlah thread tetap terbatas
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(Config.FLEET_POLL_WORKERS, 1),
+                thread_name_prefix='fleet-poll',
+            )
+        return _executor
+
+
+class _FleetJob:
+    """Polling satu device: system information + BGP summary"""
+
+    def __init__(self, device: Dict, password: Optional[str], rest_args: Dict, deadline: float):
+        self.device = device
+        self.password = password
+        self.rest_args = rest_args
+        self.deadline = deadline
+        self.started: Optional[float] = None
+
+    def _base_result(self) -> Dict:
+        return {
+            'device_id': self.device['id'],
+            'name': self.device['name'],
+            'ip_address': self.device['ip_address'],
+        }
+
+    def run(self) -> Dict:
+        self.started = time.monotonic()
+        result = self._base_result()
+
+        if not self.password:
+            result.update({'status': 'down', 'message': 'Password device tidak tersedia'})
+            return result
+
+        # Timeout setiap RPC dipotong sisa deadline agar worker tidak tertahan device mati
+        expires = self.started + self.deadline
+        connection = dict(
+            ip_address=self.device['ip_address'],
+            username=self.device['username'],
+            password=self.password,
+            deadline=expires,
+            **self.rest_args
+        )
+
+        sys_success, sys_overview = get_juniper_system_info(**connection)
+        if not sys_success or not isinstance(sys_overview, dict):
+            result.update({
+                'status': 'down',
+                'message': sys_overview if isinstance(sys_overview, str) else 'Device tidak dapat dijangkau',
+                'elapsed_ms': self.elapsed_ms(),
+            })
+            return result
+
+        if time.monotonic() >= expires:
+            bgp_success, bgp_data = False, 'Dilewati: batas waktu device terlampaui'
+        else:
+            bgp_success, bgp_data = get_juniper_bgp_summary(**connection)
+        bgp_summary = None
+        if bgp_success and isinstance(bgp_data, dict):
+            bgp_summary = bgp_data.get('summary') or {'error': bgp_data.get('error')}
+
+        result.update({
+            'status': 'up',
+            'system': sys_overview.get('system'),
+            'route_engine': sys_overview.get('route_engine'),
+            'bgp': bgp_summary,
+            'bgp_error': None if bgp_success else bgp_data,
+            'elapsed_ms': self.elapsed_ms(),
+        })
+        return result
+
+    def elapsed_ms(self) -> Optional[int]:
+        if self.started is None:
+            return None
+        return int((time.monotonic() - self.started) * 1000)
+
+    def timeout_result(self, deadline: float) -> Dict:
+        result = self._base_result()
+        result.update({
+            'status': 'timeout',
+            'message': f'Tidak ada respons dalam {deadline:g} detik',
+            'elapsed_ms': self.elapsed_ms(),
+        })
+        return result
+
+
+def poll_fleet(targets: Iterable[tuple], deadline: Optional[float] = None) -> Iterator[Dict]:
+    """Poll semua device secara paralel dan yield hasil begitu selesai.
+
+    ``targets`` berisi tuple ``(device, password, rest_args)``. Deadline
+    dihitung sejak job mulai berjalan di worker, sehingga device yang masih
+    antre tidak dianggap timeout. Timeout RPC di dalam job juga dibatasi
+    deadline, jadi device mati menahan worker paling lama sekitar ``deadline``.
+    """
+    deadline = deadline if deadline is not None else Config.FLEET_DEVICE_DEADLINE
+    executor = _get_executor()
+
+    jobs = {}
+    for device, password, rest_args in targets:
+        job = _FleetJob(device, password, rest_args, deadline)
+        jobs[executor.submit(job.run)] = job
+
+    pending = set(jobs)
+    try:
+        while pending:
+            now = time.monotonic()
+            for future in [f for f in pending if jobs[f].started is not None]:
+                if not future.done() and now - jobs[future].started >= deadline:
+                    pending.discard(future)
+                    yield jobs[future].timeout_result(deadline)
+
+            if not pending:
+                break
+
+            expiries = [jobs[f].started + deadline for f in pending if jobs[f].started is not None]
+            wait_for = min(expiries) - now if expiries else deadline
+            done, _ = wait(pending, timeout=max(wait_for, 0.05), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                pending.discard(future)
+                try:
+                    yield future.result()
+                except Exception as exc:
+                    result = jobs[future]._base_result()
+                    result.update({'status': 'down', 'message': f'Error: {exc}'})
+                    yield result
+    finally:
+        # Client terputus: batalkan device yang belum sempat dijalankan
+        for future in pending:
+            future.cancel()
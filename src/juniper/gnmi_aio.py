@@ -0,0 +1,237 @@
+"""Engine gNMI berbasis ``grpc.aio``: semua stream Subscribe dalam satu event loop.
+
+Dipakai bila ``GNMI_ENGINE=aio``. Setiap RPC Subscribe mendapat satu task
+asyncio (bukan satu thread); response masuk ke queue terbatas dan diproses oleh satu
+consumer di loop yang sama, sehingga ratusan stream tidak menambah thread.
+Rollup riwayat traffic (SQLite) ditulis oleh satu thread writer agar lock tulis
+database tidak menahan loop yang membawa semua stream.
+Stream yang putus dibuka ulang dengan backoff eksponensial ber-jitter.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import grpc
+from grpc import aio
+
+from config import Config
+from src.utils import metrics
+
+try:
+    from .gnmi.gnmi_pb2 import CapabilityRequest, Encoding
+    from .gnmi.gnmi_pb2_grpc import gNMIStub
+except ImportError:  # pragma: no cover - guarded by JuniperGNMIClient.connect
+    gNMIStub = None
+
+logger = logging.getLogger(__name__)
+
+_QUEUE_DEPTH = metrics.QUEUE_DEPTH.labels('aio')
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Backoff eksponensial dengan full jitter"""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+class AioGNMIEngine:
+    def __init__(self, queue_size: Optional[int] = None):
+        self.queue_size = queue_size or Config.GNMI_AIO_QUEUE_SIZE
+        self.loop = asyncio.new_event_loop()
+        # Satu task per RPC Subscribe (GNMIStream); satu device bisa punya beberapa
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._connect_locks: Dict[int, asyncio.Lock] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        # Satu thread untuk write SQLite rollup riwayat; urutan write tetap terjaga
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gnmi-history')
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='gnmi-aio', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self.loop.create_task(self._consume())
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    @property
+    def stream_count(self) -> int:
+        return len(self._tasks)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    # API thread-safe (dipanggil dari thread request Flask / broker) ---------
+
+    def connect(self, client, timeout: float = 10) -> bool:
+        try:
+            self._submit(self._connect(client, timeout)).result(timeout + 1)
+            return True
+        except Exception as exc:
+            client.last_error = (
+                f"Timeout menghubungi {client.ip_address}:{client.port}. Pastikan gRPC service aktif."
+                if isinstance(exc, (asyncio.TimeoutError, TimeoutError))
+                else f"Kesalahan koneksi gNMI: {exc}"
+            )
+            return False
+
+    def start_stream(self, client, stream):
+        self._submit(self._start_stream(client, stream)).result(5)
+
+    def stop_stream(self, client, stream, timeout: float = 1):
+        try:
+            self._submit(self._stop_stream(stream)).result(timeout)
+        except Exception:
+            pass
+
+    def close_channel(self, client):
+        try:
+            self._submit(self._close_channel(client)).result(2)
+        except Exception:
+            pass
+
+    # Coroutine di event loop -----------------------------------------------------
+
+    async def _connect(self, client, timeout: float):
+        from .gnmi_client import channel_options
+
+        await self._close_channel(client)
+        target = f"{client.ip_address}:{client.port}"
+        options = channel_options()
+        if client.use_tls:
+            channel = aio.secure_channel(target, grpc.ssl_channel_credentials(), options=options)
+        else:
+            channel = aio.insecure_channel(target, options=options)
+        try:
+            await asyncio.wait_for(channel.channel_ready(), timeout)
+        except BaseException:
+            await channel.close()
+            raise
+        client.channel = channel
+        client.stub = gNMIStub(channel)
+        if client.encoding is None:
+            await self._negotiate_encoding(client)
+        client.is_connected = True
+        client.last_error = None
+
+    async def _negotiate_encoding(self, client):
+        from .gnmi_client import select_encoding
+
+        if Config.GNMI_ENCODING != 'auto':
+            client.encoding = select_encoding(())
+            return
+        try:
+            response = await client.stub.Capabilities(
+                CapabilityRequest(), metadata=client._metadata(), timeout=5
+            )
+            client.encoding = select_encoding(response.supported_encodings)
+        except Exception as exc:
+            client.logger.info("Capabilities gagal, memakai encoding JSON: %s", exc)
+            client.encoding = Encoding.JSON
+
+    async def _close_channel(self, client):
+        channel, client.channel, client.stub = client.channel, None, None
+        client.is_connected = False
+        if channel is not None:
+            await channel.close()
+
+    async def _start_stream(self, client, stream):
+        await self._stop_stream(stream)
+        self._tasks[id(stream)] = self.loop.create_task(self._run_stream(client, stream))
+
+    async def _stop_stream(self, stream):
+        task = self._tasks.pop(id(stream), None)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _ensure_channel(self, client):
+        # Beberapa RPC satu device berbagi channel; hanya satu yang membuka ulang
+        lock = self._connect_locks.setdefault(id(client), asyncio.Lock())
+        async with lock:
+            if client.stub is None:
+                await self._connect(client, 10)
+        return client.channel
+
+    async def _run_stream(self, client, stream):
+        from .gnmi_client import RECONNECTING, STREAMING
+
+        attempt = 0
+        while client.is_streaming and stream.active:
+            channel = None
+            try:
+                channel = await self._ensure_channel(client)
+                request = client._create_gnmi_subscription(stream.interfaces, client.sample_interval_ms)
+
+                async def request_iterator():
+                    yield request
+
+                call = client.stub.Subscribe(request_iterator(), metadata=client._metadata())
+                async for response in call:
+                    if stream.state != STREAMING:
+                        stream.set_state(STREAMING)
+                        attempt = 0
+                    # Queue penuh: stream ini menunggu (flow control gRPC) tanpa menahan stream lain
+                    await self._queue.put((client, response))
+                client.last_error = "gNMI stream ditutup oleh router"
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                client.last_error = f"gNMI streaming error: {exc}"
+                client.logger.info("gNMI stream terputus: %s", exc)
+                if channel is not None and client.channel is channel:
+                    await self._close_channel(client)
+
+            if not client.is_streaming or not stream.active:
+                break
+            delay = backoff_delay(attempt, Config.GNMI_RECONNECT_BASE, Config.GNMI_RECONNECT_MAX)
+            attempt += 1
+            stream.reconnects += 1
+            stream.set_state(RECONNECTING)
+            stream.next_retry = time.time() + delay
+            client.logger.info("Reconnect gNMI dalam %.1f detik (percobaan %d)", delay, attempt)
+            await asyncio.sleep(delay)
+
+    async def _consume(self):
+        while True:
+            client, response = await self._queue.get()
+            _QUEUE_DEPTH.set(self._queue.qsize())
+            if not client.is_streaming:
+                continue
+            try:
+                client._process_gnmi_response(response, flush_history=False)
+                self._flush_history(client)
+            except Exception:
+                client.logger.error("Gagal memproses notifikasi gNMI", exc_info=True)
+
+    def _flush_history(self, client):
+        """Ambil bucket rollup yang selesai di loop (memori saja), tulis ke SQLite di thread writer"""
+        if client.history is None:
+            return
+        rows, prune_before = client.history.collect()
+        if rows or prune_before is not None:
+            self._writer.submit(client.history.write, rows, prune_before)
+
+
+_engine: Optional[AioGNMIEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_aio_engine() -> AioGNMIEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AioGNMIEngine()
+        return _engine
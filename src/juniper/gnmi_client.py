@@ -3,17 +3,23 @@ import json
 import time
 import threading
 import logging
-from typing import Dict, Optional, Callable
+from typing import Dict, FrozenSet, Iterable, Optional, Callable, Union
 
+from config import Config
+from src.utils import metrics
+from .gnmi_aio import backoff_delay
+from .clock import ClockOffsetEstimator
+from .counters import COLUMN_INDEX, RATE_FIELDS, UNMAPPED, CounterTable, PathCache
+from .history import TrafficHistory, get_traffic_history
+from .subscriptions import build_subscriptions, match_interface, normalize_interfaces, profile_skips_idle
 
 # Try to import gNMI protobufs
 try:
     from .gnmi.gnmi_pb2 import (
-        Path,
+        CapabilityRequest,
+        Encoding,
         SubscribeRequest,
-        Subscription,
         SubscriptionList,
-        SubscriptionMode,
     )
     from .gnmi.gnmi_pb2_grpc import gNMIStub
     HAS_GNMI = True
@@ -35,9 +41,139 @@ METRIC_MAP = {
     'if_out_pkts': 'out_pkts',
     'if_in_errors': 'in_errors',
     'if_out_errors': 'out_errors',
+    # Penanda diskontinuitas (clear counter / link flap)
+    'last_clear': 'last_clear',
+    'carrier_transitions': 'carrier_transitions',
 }
 
 
+_NUMERIC_VALUES = frozenset(('int_val', 'uint_val', 'float_val', 'double_val'))
+
+
+def _decode_text(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode_json(raw):
+    # Angka JSON langsung dikonversi; uint64 pada JSON_IETF dikirim sebagai string
+    try:
+        return float(raw)
+    except ValueError:
+        pass
+    try:
+        parsed = json.loads(raw)
+    except ValueError:
+        return None
+    if isinstance(parsed, bool):
+        return int(parsed)
+    if isinstance(parsed, (int, float)):
+        return parsed
+    return _decode_text(parsed) if isinstance(parsed, str) else None
+
+
+def _decode_decimal(decimal):
+    return decimal.digits / (10 ** decimal.precision)
+
+
+_TYPED_VALUE_DECODERS = {
+    'bool_val': int,
+    'string_val': _decode_text,
+    'ascii_val': _decode_text,
+    'json_val': _decode_json,
+    'json_ietf_val': _decode_json,
+    'decimal_val': _decode_decimal,
+}
+
+
+_ENCODING_NAMES = {'json': 'JSON', 'json_ietf': 'JSON_IETF', 'proto': 'PROTO'}
+
+
+def select_encoding(supported) -> int:
+    """Encoding Subscribe sesuai GNMI_ENCODING; mode auto memilih PROTO bila router mendukung"""
+    preference = Config.GNMI_ENCODING
+    if preference in _ENCODING_NAMES:
+        return Encoding.Value(_ENCODING_NAMES[preference])
+    if Encoding.PROTO in supported:
+        return Encoding.PROTO
+    return Encoding.JSON
+
+
+def decode_typed_value(value):
+    """Nilai numerik dari gNMI TypedValue (satu WhichOneof, tanpa probing HasField)"""
+    if value is None:
+        return None
+    kind = value.WhichOneof('value')
+    if kind in _NUMERIC_VALUES:
+        return getattr(value, kind)
+    decoder = _TYPED_VALUE_DECODERS.get(kind)
+    if decoder is None:
+        return None
+    return decoder(getattr(value, kind))
+
+
+def channel_options() -> list:
+    """Opsi channel gRPC: keepalive HTTP/2 agar koneksi mati (mis. switchover RE) cepat terdeteksi"""
+    if Config.GNMI_KEEPALIVE_TIME_MS <= 0:
+        return []
+    return [
+        ('grpc.keepalive_time_ms', Config.GNMI_KEEPALIVE_TIME_MS),
+        ('grpc.keepalive_timeout_ms', Config.GNMI_KEEPALIVE_TIMEOUT_MS),
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.http2.max_pings_without_data', 0),
+    ]
+
+
+# Status stream: connecting -> streaming -> reconnecting -> streaming ... -> stopped
+CONNECTING, STREAMING, RECONNECTING, STOPPED = 'connecting', 'streaming', 'reconnecting', 'stopped'
+_STATE_SEVERITY = {STREAMING: 0, CONNECTING: 1, RECONNECTING: 2, STOPPED: 3}
+
+
+class GNMIStream:
+    """Satu RPC Subscribe pada channel client untuk sekumpulan interface (None = semua)"""
+
+    def __init__(self, interfaces: Optional[FrozenSet[str]]):
+        self.interfaces = interfaces
+        self.active = True
+        self.thread: Optional[threading.Thread] = None
+        self.call = None
+        self.state = CONNECTING
+        self.since = time.time()
+        self.reconnects = 0
+        self.next_retry: Optional[float] = None
+        self._cancelled = threading.Event()
+
+    def set_state(self, state: str):
+        if state != self.state:
+            self.state = state
+            self.since = time.time()
+        if state != RECONNECTING:
+            self.next_retry = None
+
+    def wait(self, delay: float) -> bool:
+        """Tunggu sebelum reconnect; True jika stream dibatalkan selama menunggu"""
+        return self._cancelled.wait(delay)
+
+    def cancel(self):
+        self.active = False
+        self.set_state(STOPPED)
+        self._cancelled.set()
+        if self.call is not None:
+            self.call.cancel()
+            self.call = None
+
+    def describe(self) -> Dict:
+        return {
+            'interfaces': sorted(self.interfaces) if self.interfaces is not None else None,
+            'state': self.state,
+            'since': self.since,
+            'reconnects': self.reconnects,
+            'next_retry': self.next_retry,
+        }
+
+
 class JuniperGNMIClient:
     def __init__(
         self,
@@ -46,6 +182,8 @@ class JuniperGNMIClient:
         username: str = "",
         password: str = "",
         use_tls: bool = False,
+        history: Optional[TrafficHistory] = None,
+        engine=None,
     ):
         self.ip_address = ip_address
         self.port = port
@@ -58,14 +196,38 @@ class JuniperGNMIClient:
         self.is_streaming = False
         self.current_traffic_data = {}
         self.callbacks = []
-        self.raw_counters: Dict[str, Dict[str, float]] = {}
-        self.prev_snapshots: Dict[str, Dict[str, float]] = {}
+        self.counters = CounterTable()
+        self._path_cache = PathCache(Config.GNMI_PATH_CACHE_SIZE)
+        # Engine thread menjalankan satu thread per RPC Subscribe; decode, CounterTable,
+        # PathCache, estimator jam, dan current_traffic_data hanya diubah sambil memegang lock ini
+        self._data_lock = threading.RLock()
         self.last_update_time = time.time()
-        self.stream_thread: Optional[threading.Thread] = None
-        self.interface_filter: Optional[str] = None
+        # RPC Subscribe aktif; interface yang ditambah saat stream berjalan mendapat RPC sendiri
+        self._streams: list[GNMIStream] = []
+        # Beberapa RPC berbagi satu channel; hanya satu thread yang membuka ulang channel
+        self._channel_lock = threading.Lock()
+        self.interfaces: Optional[FrozenSet[str]] = None
         self.sample_interval_ms: int = 10000
+        self.include_subinterfaces = False
+        # Interval (detik) interface/subinterface untuk profil yang tidak mengirim counter idle
+        self._idle_interval: Optional[tuple[float, float]] = None
+        # Ambang jeda antar sampel (detik) sebelum sampel ditandai gap
+        self._gap_threshold: Optional[tuple[float, float]] = None
+        # Offset jam router dan latency pengiriman notifikasi
+        self.clock = ClockOffsetEstimator(Config.GNMI_CLOCK_WINDOW_SECONDS)
+        self.discontinuities = {'wrap': 0, 'reset': 0, 'gap': 0}
+        self._idle_interfaces: set[str] = set()
+        self._last_idle_sweep = 0.0
         self.last_error: Optional[str] = None
+        # Encoding Subscribe hasil negosiasi Capabilities (None = belum dinegosiasi)
+        self.encoding: Optional[int] = None
+        self.history = history
+        # AioGNMIEngine (GNMI_ENGINE=aio) atau None untuk satu thread per stream
+        self.engine = engine
         self.logger = logging.getLogger(f"JuniperGNMIClient[{ip_address}:{port}]")
+        self._notification_metric, self._decode_metric, self._latency_metric = metrics.gnmi_device_metrics(
+            f"{ip_address}:{port}"
+        )
 
     def connect(self) -> bool:
         """Establish gNMI connection to Juniper device"""
@@ -75,22 +237,32 @@ class JuniperGNMIClient:
                 "dan gnmi/gnmi_pb2_grpc.py sudah tersedia."
             )
 
+        if self.engine is not None:
+            if self.engine.connect(self):
+                self.logger.info("gNMI connected (aio)")
+                return True
+            return False
+
         try:
             target = f"{self.ip_address}:{self.port}"
             if self.use_tls:
                 credentials = grpc.ssl_channel_credentials()
-                self.channel = grpc.secure_channel(target, credentials)
+                self.channel = grpc.secure_channel(target, credentials, options=channel_options())
             else:
-                self.channel = grpc.insecure_channel(target)
+                self.channel = grpc.insecure_channel(target, options=channel_options())
             
             try:
                 grpc.channel_ready_future(self.channel).result(timeout=10)
                 self.stub = gNMIStub(self.channel)
+                if self.encoding is None:
+                    self._negotiate_encoding()
                 self.is_connected = True
                 self.last_error = None
                 self.logger.info("gNMI connected")
                 return True
             except grpc.FutureTimeoutError:
+                self.channel.close()
+                self.channel = None
                 self.last_error = (
                     f"Timeout menghubungi {self.ip_address}:{self.port}. Pastikan gRPC service aktif."
                 )
@@ -101,19 +273,35 @@ class JuniperGNMIClient:
             self.logger.error("gNMI connection error", exc_info=True)
             return False
 
+    def _negotiate_encoding(self):
+        """Pilih encoding Subscribe dari Capabilities router (PROTO jika didukung)"""
+        if Config.GNMI_ENCODING != 'auto':
+            self.encoding = select_encoding(())
+            return
+        try:
+            response = self.stub.Capabilities(CapabilityRequest(), metadata=self._metadata(), timeout=5)
+            self.encoding = select_encoding(response.supported_encodings)
+        except Exception as exc:
+            self.logger.info("Capabilities gagal, memakai encoding JSON: %s", exc)
+            self.encoding = Encoding.JSON
+        self.logger.info("gNMI encoding: %s", Encoding.Name(self.encoding))
+
     def disconnect(self):
         """Close gNMI connection"""
         self.stop_interface_monitoring()
         self.is_streaming = False
-        if self.channel:
+        if self.engine is not None:
+            self.engine.close_channel(self)
+        elif self.channel:
             self.channel.close()
         self.is_connected = False
         self.logger.info("gNMI disconnected")
 
     def start_interface_monitoring(
         self,
-        interface_filter: Optional[str] = None,
+        interfaces: Union[None, str, Iterable[str]] = None,
         sample_interval_ms: int = 10000,
+        include_subinterfaces: bool = False,
     ) -> bool:
         """Start monitoring interface traffic via gNMI"""
         if self.is_streaming:
@@ -123,22 +311,18 @@ class JuniperGNMIClient:
             return False
 
         try:
-            self.interface_filter = interface_filter
+            self.interfaces = normalize_interfaces(interfaces)
             self.sample_interval_ms = max(sample_interval_ms, 1000)
+            self.include_subinterfaces = include_subinterfaces
+            self._idle_interval = self._idle_intervals()
+            self._gap_threshold = self._gap_thresholds()
             self.is_streaming = True
-
-            # Start streaming dalam thread terpisah
-            self.stream_thread = threading.Thread(
-                target=self._start_streaming,
-                args=(self.interface_filter, self.sample_interval_ms),
-                daemon=True
-            )
-            self.stream_thread.start()
+            self._drop_unselected()
+            self._open_stream(self.interfaces)
             self.logger.info(
                 "gNMI streaming started%s",
-                f" filter={interface_filter}" if interface_filter else "",
+                f" interfaces={','.join(sorted(self.interfaces))}" if self.interfaces else "",
             )
-
             return True
 
         except Exception as e:
@@ -146,177 +330,280 @@ class JuniperGNMIClient:
             self.logger.error("Unable to start gNMI monitoring", exc_info=True)
             return False
 
-    def stop_interface_monitoring(self):
-        """Stop active streaming thread if present"""
-        self.is_streaming = False
-        if self.stream_thread and self.stream_thread.is_alive():
-            self.stream_thread.join(timeout=1)
-        self.stream_thread = None
+    def update_interfaces(self, interfaces: Union[None, str, Iterable[str]]) -> bool:
+        """Ubah interface yang disubscribe tanpa memutus channel.
 
-    def _start_streaming(self, interface_filter: Optional[str], sample_interval: int):
-        """Start streaming - menggunakan gNMI real atau simulation"""
-        if self.stub is None:
+        Interface baru mendapat RPC Subscribe tambahan; RPC yang berisi interface
+        yang dilepas dibuka ulang hanya untuk sisa interface-nya. Baseline counter
+        interface lain tetap tersimpan, sehingga rate-nya tidak terputus.
+        """
+        interfaces = normalize_interfaces(interfaces)
+        if not self.is_streaming or interfaces is None or self.interfaces is None:
+            return self.start_interface_monitoring(
+                interfaces, self.sample_interval_ms, self.include_subinterfaces
+            )
+
+        added = interfaces - self.interfaces
+        removed = self.interfaces - interfaces
+        self.interfaces = interfaces
+        for stream in list(self._streams):
+            if stream.interfaces & removed:
+                self._close_stream(stream)
+                if stream.interfaces - removed:
+                    self._open_stream(stream.interfaces - removed)
+        if added:
+            if len(self._streams) >= Config.GNMI_MAX_SUBSCRIBE_RPCS:
+                # Terlalu banyak RPC kecil: gabungkan kembali menjadi satu subscription
+                for stream in list(self._streams):
+                    self._close_stream(stream)
+                self._open_stream(interfaces)
+            else:
+                self._open_stream(added)
+
+        self._drop_unselected()
+        self.logger.info(
+            "gNMI interface diperbarui: +%d -%d (%d RPC)", len(added), len(removed), len(self._streams)
+        )
+        return True
+
+    def _drop_unselected(self):
+        """Buang data interface yang tidak lagi disubscribe agar tidak tampil basi"""
+        with self._data_lock:
+            for iface in list(self.current_traffic_data):
+                if not match_interface(iface, self.interfaces):
+                    self.current_traffic_data.pop(iface, None)
+                    self._idle_interfaces.discard(iface)
+
+    def _open_stream(self, interfaces: Optional[FrozenSet[str]]):
+        stream = GNMIStream(interfaces)
+        self._streams.append(stream)
+        if self.engine is not None:
+            self.engine.start_stream(self, stream)
             return
-        self._start_gnmi_streaming(interface_filter, sample_interval)
+        # Start streaming dalam thread terpisah
+        stream.thread = threading.Thread(target=self._start_gnmi_streaming, args=(stream,), daemon=True)
+        stream.thread.start()
+
+    def _close_stream(self, stream: GNMIStream):
+        stream.cancel()
+        if stream in self._streams:
+            self._streams.remove(stream)
+        if self.engine is not None:
+            self.engine.stop_stream(self, stream)
+        elif stream.thread and stream.thread.is_alive() and stream.thread is not threading.current_thread():
+            stream.thread.join(timeout=1)
+
+    def stop_interface_monitoring(self):
+        """Stop all active Subscribe streams"""
+        self.is_streaming = False
+        for stream in list(self._streams):
+            self._close_stream(stream)
+        if self.history:
+            self.history.flush(force=True)
 
     def _create_gnmi_subscription(
         self,
-        interface_filter: Optional[str] = None,
+        interfaces: Optional[FrozenSet[str]] = None,
         sample_interval_ms: int = 10000,
     ):
         """Create gNMI subscription request untuk Juniper MX"""
-        subscriptions = []
-        interval_ns = max(sample_interval_ms, 1000) * 1_000_000
-
-        def _add_path(path_components):
-            path = Path()
-            for component in path_components:
-                if isinstance(component, tuple):
-                    name, keys = component
-                    elem = path.elem.add()
-                    elem.name = name
-                    for k, v in keys.items():
-                        elem.key[k] = v
-                else:
-                    path.elem.add(name=component)
-            return path
-
-        key = {}
-        if interface_filter and interface_filter != "all":
-            key = {"name": interface_filter}
-
-        interface_path = _add_path(
-            [
-                "interfaces",
-                ("interface", key),
-                "state",
-                "counters",
-            ]
-        )
-
-        subinterface_path = _add_path(
-            [
-                "interfaces",
-                ("interface", key),
-                "subinterfaces",
-                "subinterface",
-                "state",
-                "counters",
-            ]
-        )
-
-        subscriptions.append(
-            Subscription(
-                path=interface_path,
-                mode=SubscriptionMode.SAMPLE,
-                sample_interval=interval_ns,
-            )
-        )
-        subscriptions.append(
-            Subscription(
-                path=subinterface_path,
-                mode=SubscriptionMode.SAMPLE,
-                sample_interval=interval_ns * 2,
-            )
+        subscriptions = build_subscriptions(
+            sorted(interfaces) if interfaces else [None],
+            sample_interval_ms,
+            self.include_subinterfaces,
         )
 
         return SubscribeRequest(
             subscribe=SubscriptionList(
                 subscription=subscriptions,
                 mode=SubscriptionList.STREAM,
-                encoding=0,  # JSON encoding
+                encoding=self.encoding if self.encoding is not None else Encoding.JSON,
             )
         )
 
-    def _start_gnmi_streaming(self, interface_filter: Optional[str], sample_interval: int):
-        """Real gNMI streaming implementation"""
-        try:
-            subscription_request = self._create_gnmi_subscription(
-                interface_filter, sample_interval
-            )
+    def _idle_intervals(self) -> Optional[tuple[float, float]]:
+        """Interval yang diharapkan per jenis baris bila profil tidak mengirim counter idle"""
+        interval = self.sample_interval_ms / 1000
+        interface = interval if profile_skips_idle(Config.GNMI_SUBSCRIPTION_PROFILE) else 0.0
+        subinterface = 0.0
+        if self.include_subinterfaces and profile_skips_idle(Config.GNMI_SUBINTERFACE_PROFILE):
+            subinterface = interval * max(Config.GNMI_SUBINTERFACE_INTERVAL_FACTOR, 1)
+        if not interface and not subinterface:
+            return None
+        return interface, subinterface
 
-            metadata = self._metadata()
+    def _gap_thresholds(self) -> Optional[tuple[float, float]]:
+        """Ambang gap per jenis baris; profil yang tidak mengirim counter idle tidak dicek"""
+        if Config.GNMI_GAP_FACTOR <= 0:
+            return None
+        interval = self.sample_interval_ms / 1000 * Config.GNMI_GAP_FACTOR
+        idle = self._idle_interval or (0.0, 0.0)
+        interface = 0.0 if idle[0] else interval
+        subinterface = 0.0 if idle[1] else interval * max(Config.GNMI_SUBINTERFACE_INTERVAL_FACTOR, 1)
+        return interface, subinterface
 
-            def request_iterator():
-                yield subscription_request
+    def _ensure_channel(self):
+        """Channel aktif untuk RPC Subscribe; dibuka ulang jika sebelumnya putus"""
+        with self._channel_lock:
+            if self.stub is None and not self.connect():
+                raise ConnectionError(self.last_error or "Tidak dapat terhubung ke gNMI")
+            return self.channel
 
-            responses = self.stub.Subscribe(
-                request_iterator(),
-                metadata=metadata,
-            )
-            
-            for response in responses:
-                if not self.is_streaming:
+    def _drop_channel(self, channel):
+        """Tutup channel yang gagal (jika belum diganti oleh RPC lain)"""
+        with self._channel_lock:
+            if channel is None or self.channel is not channel:
+                return
+            self.channel, self.stub = None, None
+            self.is_connected = False
+        channel.close()
+
+    def _start_gnmi_streaming(self, stream: GNMIStream):
+        """Real gNMI streaming implementation.
+
+        Stream diawasi: jika RPC Subscribe gagal atau ditutup router, channel
+        dibuka ulang dengan backoff eksponensial ber-jitter sampai stream
+        dihentikan. CounterTable tetap dipakai, sehingga baseline counter tidak
+        hilang setelah reconnect.
+        """
+        attempt = 0
+        while self.is_streaming and stream.active:
+            channel = None
+            try:
+                channel = self._ensure_channel()
+                subscription_request = self._create_gnmi_subscription(
+                    stream.interfaces, self.sample_interval_ms
+                )
+
+                def request_iterator():
+                    yield subscription_request
+
+                responses = self.stub.Subscribe(request_iterator(), metadata=self._metadata())
+                stream.call = responses
+                if not stream.active:
+                    responses.cancel()
+                for response in responses:
+                    # Thread lama berhenti jika stream sudah ditutup atau dibuat ulang
+                    if not self.is_streaming or not stream.active:
+                        break
+                    if stream.state != STREAMING:
+                        stream.set_state(STREAMING)
+                        attempt = 0
+                    self._process_gnmi_response(response)
+                else:
+                    self.last_error = "gNMI stream ditutup oleh router"
+            except Exception as e:
+                # Pembatalan dari stop_interface_monitoring/update_interfaces bukan error
+                if not self.is_streaming or not stream.active:
                     break
-                self._process_gnmi_response(response)
-                
-        except Exception as e:
-            if getattr(self, 'last_error', None) is None:
                 self.last_error = f"gNMI streaming error: {e}"
-            self.logger.info("gNMI streaming dihentikan: %s", e)
+                self.logger.info("gNMI stream terputus: %s", e)
+                self._drop_channel(channel)
 
-    def _process_gnmi_response(self, response):
-        """Process gNMI response dan update traffic data"""
+            if not self.is_streaming or not stream.active:
+                break
+            delay = backoff_delay(attempt, Config.GNMI_RECONNECT_BASE, Config.GNMI_RECONNECT_MAX)
+            attempt += 1
+            stream.reconnects += 1
+            stream.set_state(RECONNECTING)
+            stream.next_retry = time.time() + delay
+            self.logger.info("Reconnect gNMI dalam %.1f detik (percobaan %d)", delay, attempt)
+            if stream.wait(delay):
+                break
+
+    def health(self) -> Dict:
+        """Status stream untuk endpoint health: state terburuk dari semua RPC Subscribe"""
+        streams = list(self._streams)
+        if self.is_streaming and streams:
+            state = max((stream.state for stream in streams), key=_STATE_SEVERITY.get)
+            since = min(stream.since for stream in streams if stream.state == state)
+        else:
+            state, since = STOPPED, None
+        with self._data_lock:
+            clock = self.clock.stats()
+        return {
+            'state': state,
+            'since': since,
+            'connected': self.is_connected,
+            'last_update': self.last_update_time,
+            'last_error': self.last_error,
+            'reconnects': sum(stream.reconnects for stream in streams),
+            'discontinuities': dict(self.discontinuities),
+            'clock': clock,
+            'engine': 'aio' if self.engine is not None else 'thread',
+            'streams': [stream.describe() for stream in streams],
+        }
+
+    def _process_gnmi_response(self, response, flush_history: bool = True):
+        """Process gNMI response dan update traffic data.
+
+        ``flush_history=False`` dipakai engine aio: rollup riwayat ditulis oleh
+        thread writer engine, bukan di event loop.
+        """
         try:
-            if not hasattr(response, 'update') or not response.HasField('update'):
+            if response.WhichOneof('response') != 'update':
                 return
 
             notification = response.update
+            started = time.perf_counter()
             current_time = time.time()
-            touched_interfaces = set()
-
-            prefix = notification.prefix if hasattr(notification, 'prefix') else None
-            if prefix and getattr(prefix, 'elem', None):
-                prefix_path = '/'.join(f"{elem.name}[{','.join(f'{k}={v}' for k,v in elem.key.items())}]" if elem.key else elem.name for elem in prefix.elem)
-                self.logger.debug("Notification prefix: %s", prefix_path)
-
-            for update in notification.update:
-                interface_name, metric_key = self._extract_interface_metric(prefix, update.path)
-                if not interface_name or not metric_key:
-                    self.logger.debug(
-                        "Skip update path due to missing interface/metric: %s",
-                        '/'.join(elem.name for elem in update.path.elem)
-                        if getattr(update.path, 'elem', None)
-                        else 'unknown',
-                    )
-                    continue
+            with self._data_lock:
+                # Rate dihitung dari timestamp router (ns), bukan waktu decode di Python;
+                # timestamp tampilan/riwayat memakai waktu sampel dalam jam server
+                sample_time = None
+                if Config.GNMI_USE_DEVICE_TIMESTAMP and notification.timestamp:
+                    sample_time = notification.timestamp / 1e9
+                    self._latency_metric.observe(self.clock.observe(sample_time, current_time))
+                    current_time = self.clock.to_local(sample_time)
 
-                value = self._parse_typed_value(update.val)
-                if value is None:
-                    self.logger.debug(
-                        "Skip update metric %s no value (%s)", metric_key, update.val
-                    )
-                    continue
+                prefix = notification.prefix if notification.HasField('prefix') else None
+                if prefix is not None and self.logger.isEnabledFor(logging.DEBUG):
+                    prefix_path = '/'.join(f"{elem.name}[{','.join(f'{k}={v}' for k,v in elem.key.items())}]" if elem.key else elem.name for elem in prefix.elem)
+                    self.logger.debug("Notification prefix: %s", prefix_path)
 
-                normalized_key = METRIC_MAP.get(metric_key)
-                if not normalized_key:
-                    self.logger.debug("Metric %s tidak dipetakan", metric_key)
-                    continue
+                prefix_key = prefix.SerializeToString() if prefix is not None else b''
+                path_cache = self._path_cache
+                rows, columns, values = [], [], []
+                for update in notification.update:
+                    cache_key = (prefix_key, update.path.SerializeToString())
+                    target = path_cache.get(cache_key)
+                    if target is None:
+                        target = self._resolve_path(prefix, update.path)
+                        path_cache.put(cache_key, target)
+                    if target is UNMAPPED:
+                        continue
 
-                interface_counters = self.raw_counters.setdefault(interface_name, {})
-                interface_counters[normalized_key] = float(value)
-                touched_interfaces.add(interface_name)
-
-            if touched_interfaces:
-                self._calculate_rates(touched_interfaces, current_time)
-                self._notify_callbacks()
-                for iface in touched_interfaces:
-                    self.logger.debug(
-                        "Updated counters for %s: in_rate=%.2f kbps out_rate=%.2f kbps",
-                        iface,
-                        self.current_traffic_data.get(iface, {}).get('in_rate', 0) / 1000,
-                        self.current_traffic_data.get(iface, {}).get('out_rate', 0) / 1000,
-                    )
+                    value = decode_typed_value(update.val)
+                    if value is None:
+                        self.logger.debug("Skip update tanpa nilai numerik (%s)", update.val)
+                        continue
+
+                    rows.append(target[0])
+                    columns.append(target[1])
+                    values.append(value)
+
+                if rows:
+                    touched_rows = self.counters.update(rows, columns, values)
+                    touched_interfaces = self._calculate_rates(touched_rows, current_time, sample_time)
+                    self._notify_callbacks(touched_interfaces)
+                self._sweep_idle(current_time)
+            # Rollup ditulis ke SQLite setelah _data_lock dilepas agar pembaca data live tidak ikut menunggu
+            if self.history and flush_history:
+                self.history.flush(current_time)
+            self._notification_metric.inc()
+            self._decode_metric.observe(time.perf_counter() - started)
         except Exception as e:
             # Reraise untuk penanganan di level atas bila diperlukan
             raise
 
     def get_current_traffic_data(self) -> Dict:
         """Get current traffic data"""
-        return self.current_traffic_data.copy()
+        with self._data_lock:
+            self._sweep_idle(time.time())
+            return self.current_traffic_data.copy()
     
     def add_callback(self, callback: Callable):
-        """Add callback for real-time data updates"""
+        """Add callback for real-time data updates (dipanggil dengan interface yang berubah saja)"""
         self.callbacks.append(callback)
     
     def remove_callback(self, callback: Callable):
@@ -330,6 +617,24 @@ class JuniperGNMIClient:
             ('password', self.password or ''),
         )
 
+    def _resolve_path(self, prefix, path) -> tuple[int, int]:
+        """(baris CounterTable, kolom metric) untuk path update, atau UNMAPPED"""
+        interface_name, metric_key = self._extract_interface_metric(prefix, path)
+        if not interface_name or not metric_key:
+            self.logger.debug(
+                "Skip update path due to missing interface/metric: %s",
+                '/'.join(elem.name for elem in path.elem) if getattr(path, 'elem', None) else 'unknown',
+            )
+            return UNMAPPED
+
+        normalized_key = METRIC_MAP.get(metric_key)
+        if not normalized_key:
+            self.logger.debug("Metric %s tidak dipetakan", metric_key)
+            return UNMAPPED
+        # Nama subinterface Junos selalu berakhiran .<unit>
+        row = self.counters.intern(interface_name, subinterface='.' in interface_name)
+        return row, COLUMN_INDEX[normalized_key]
+
     def _extract_interface_metric(self, prefix, path) -> tuple[Optional[str], Optional[str]]:
         interface_name = None
         unit = None
@@ -356,128 +661,204 @@ class JuniperGNMIClient:
         return interface_name, metric
 
     def _parse_typed_value(self, value):
-        if value is None:
-            return None
+        return decode_typed_value(value)
 
-        if value.HasField('int_val'):
-            return value.int_val
-        if value.HasField('uint_val'):
-            return value.uint_val
-        if value.HasField('float_val'):
-            return value.float_val
-        if value.HasField('double_val'):
-            return value.double_val
-        if hasattr(value, 'HasField') and 'sint_val' in value.DESCRIPTOR.fields_by_name:
-            if value.HasField('sint_val'):
-                return value.sint_val
-        if value.HasField('bool_val'):
-            return int(value.bool_val)
-        if value.HasField('string_val'):
-            try:
-                return float(value.string_val)
-            except ValueError:
-                return None
-        if value.HasField('ascii_val'):
-            try:
-                return float(value.ascii_val.decode())
-            except Exception:
-                return None
-        if value.HasField('json_val'):
-            try:
-                parsed = json.loads(value.json_val.decode())
-                if isinstance(parsed, (int, float)):
-                    return parsed
-            except Exception:
-                return None
-        return None
+    def _rate_data(self, row: int, timestamp: float, rates=None, discontinuity=None, gap=False) -> Dict:
+        data = dict(zip(RATE_FIELDS, rates)) if rates is not None else dict.fromkeys(RATE_FIELDS, 0)
+        data['timestamp'] = timestamp
+        data['counters'] = self.counters.counters(row)
+        data['discontinuity'] = discontinuity
+        data['gap'] = gap
+        return data
 
-    def _calculate_rates(self, interfaces: set[str], current_time: float):
-        for iface in interfaces:
-            counters = self.raw_counters.get(iface, {})
-            if not counters:
-                continue
+    def _calculate_rates(self, rows, current_time: float, sample_time: Optional[float] = None) -> set[str]:
+        """Hitung rate untuk baris counter yang tersentuh; kembalikan nama interface yang berubah.
 
-            previous = self.prev_snapshots.get(iface)
-            if previous:
-                time_diff = current_time - previous['timestamp']
-                if time_diff <= 0:
-                    continue
+        ``sample_time`` adalah timestamp notifikasi dari router (default
+        ``current_time``); ``current_time`` adalah waktu sampel dalam jam server
+        untuk tampilan dan riwayat.
+        """
+        table = self.counters
+        batch = table.compute(
+            rows,
+            current_time if sample_time is None else sample_time,
+            self._idle_interval,
+            self._gap_threshold,
+        )
+        touched = set()
 
-                # Lewati delta pertama setelah streaming dimulai agar tidak ada spike awal
-                if not previous.get('primed'):
-                    self.current_traffic_data.setdefault(
-                        iface,
-                        {
-                            'in_rate': 0,
-                            'out_rate': 0,
-                            'in_pps': 0,
-                            'out_pps': 0,
-                            'in_errors_rate': 0,
-                            'out_errors_rate': 0,
-                            'timestamp': current_time,
-                            'counters': counters.copy(),
-                        },
-                    )
-                    previous['primed'] = True
-                    previous['timestamp'] = current_time
-                    previous['values'] = counters.copy()
-                    self.prev_snapshots[iface] = previous
-                    continue
+        # Baseline pertama/priming: tampilkan meter nol sampai delta pertama tersedia
+        for row in batch.baseline_rows.tolist():
+            iface = table.names[row]
+            if iface not in self.current_traffic_data:
+                self.current_traffic_data[iface] = self._rate_data(row, current_time)
+            touched.add(iface)
 
-                delta_in_octets = max(counters.get('in_octets', 0) - previous['values'].get('in_octets', 0), 0)
-                delta_out_octets = max(counters.get('out_octets', 0) - previous['values'].get('out_octets', 0), 0)
-                delta_in_pkts = max(counters.get('in_pkts', 0) - previous['values'].get('in_pkts', 0), 0)
-                delta_out_pkts = max(counters.get('out_pkts', 0) - previous['values'].get('out_pkts', 0), 0)
-                delta_in_err = max(counters.get('in_errors', 0) - previous['values'].get('in_errors', 0), 0)
-                delta_out_err = max(counters.get('out_errors', 0) - previous['values'].get('out_errors', 0), 0)
-
-                self.current_traffic_data[iface] = {
-                    'in_rate': (delta_in_octets / time_diff) * 8,
-                    'out_rate': (delta_out_octets / time_diff) * 8,
-                    'in_pps': delta_in_pkts / time_diff,
-                    'out_pps': delta_out_pkts / time_diff,
-                    'in_errors_rate': delta_in_err / time_diff,
-                    'out_errors_rate': delta_out_err / time_diff,
-                    'timestamp': current_time,
-                    'counters': counters.copy(),
-                }
-            else:
-                # Pertama kali menerima data, simpan sebagai baseline dengan nilai meter nol
-                self.current_traffic_data.setdefault(
-                    iface,
-                    {
-                        'in_rate': 0,
-                        'out_rate': 0,
-                        'in_pps': 0,
-                        'out_pps': 0,
-                        'in_errors_rate': 0,
-                        'out_errors_rate': 0,
-                        'timestamp': current_time,
-                        'counters': counters.copy(),
-                    },
-                )
+        # Counter di-clear: baseline baru, rate terakhir tetap tampil dan tidak dicatat ke riwayat
+        for row in batch.reset_rows.tolist():
+            iface = table.names[row]
+            previous = self.current_traffic_data.get(iface) or {}
+            data = self._rate_data(row, current_time, [previous.get(field, 0) for field in RATE_FIELDS], 'reset')
+            self.current_traffic_data[iface] = data
+            self.discontinuities['reset'] += 1
+            touched.add(iface)
+        if len(batch.reset_rows):
+            self.logger.info("Counter reset terdeteksi: %d interface", len(batch.reset_rows))
 
-            primed_flag = previous.get('primed', False) if previous else False
-            self.prev_snapshots[iface] = {
-                'timestamp': current_time,
-                'values': counters.copy(),
-                'primed': primed_flag,
-            }
+        for row, values, wrapped, gap in zip(
+            batch.rate_rows.tolist(), batch.rates.tolist(), batch.wrapped.tolist(), batch.gaps.tolist()
+        ):
+            iface = table.names[row]
+            data = self._rate_data(row, current_time, values, 'wrap' if wrapped else None, gap)
+            self.current_traffic_data[iface] = data
+            touched.add(iface)
+            self._idle_interfaces.discard(iface)
+            if wrapped:
+                self.discontinuities['wrap'] += 1
+            if gap:
+                self.discontinuities['gap'] += 1
+            if self.history:
+                self.history.record(iface, current_time, data)
 
         self.last_update_time = current_time
+        return touched
+
+    def _sweep_idle(self, now: float):
+        """Nolkan rate interface yang tidak dikirim ulang router (suppress_redundant/ON_CHANGE).
+
+        Tanpa update berarti counter tidak berubah, sehingga rate yang tampil
+        harus nol, bukan nilai terakhir sebelum interface idle.
+        """
+        if self._idle_interval is None or not self.is_streaming or now - self._last_idle_sweep < 1:
+            return
+        self._last_idle_sweep = now
+        table = self.counters
+        zeroed = set()
+        # previous_time tersimpan dalam jam router
+        for row in table.idle_rows(self.clock.to_device(now), self._idle_interval).tolist():
+            iface = table.names[row]
+            if iface in self._idle_interfaces or iface not in self.current_traffic_data:
+                continue
+            data = self._rate_data(row, now)
+            self.current_traffic_data[iface] = data
+            self._idle_interfaces.add(iface)
+            zeroed.add(iface)
+            if self.history:
+                self.history.record(iface, now, data)
+        if zeroed:
+            self._notify_callbacks(zeroed)
 
-    def _notify_callbacks(self):
+    def _notify_callbacks(self, interfaces: set[str]):
         if not self.callbacks:
             return
-        snapshot = self.get_current_traffic_data()
+        changed = {
+            iface: self.current_traffic_data[iface]
+            for iface in interfaces
+            if iface in self.current_traffic_data
+        }
+        if not changed:
+            return
         for callback in list(self.callbacks):
             try:
-                callback(snapshot)
+                callback(changed)
             except Exception:
                 continue
 
+
+_SUBSCRIBER_QUEUE = metrics.QUEUE_DEPTH.labels('subscriber')
+
+
+class TrafficSubscriber:
+    """Antrian update traffic untuk satu client SSE.
+
+    Update digabung per interface (hanya nilai terbaru yang disimpan), sehingga
+    client yang lambat tidak menahan thread stream gNMI dan memorinya tidak
+    tumbuh; sampel yang tertimpa dihitung di ``dropped``.
+    """
+
+    def __init__(self, client: 'JuniperGNMIClient', interface_filter: Optional[str] = None):
+        self.client = client
+        self.interface_filter = None if interface_filter in (None, '', 'all') else interface_filter
+        self.dropped = 0
+        self._pending: Dict[str, Dict] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _matches(self, iface: str) -> bool:
+        return match_interface(iface, self.interface_filter)
+
+    def __call__(self, changed: Dict[str, Dict]):
+        with self._cond:
+            for iface, data in changed.items():
+                if not self._matches(iface):
+                    continue
+                if iface in self._pending:
+                    self.dropped += 1
+                else:
+                    _SUBSCRIBER_QUEUE.inc()
+                self._pending[iface] = data
+            if self._pending:
+                self._cond.notify()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {
+            iface: data
+            for iface, data in self.client.get_current_traffic_data().items()
+            if self._matches(iface)
+        }
+
+    def get(self, timeout: float) -> Dict[str, Dict]:
+        """Tunggu update berikutnya; dict kosong jika timeout atau subscriber ditutup"""
+        with self._cond:
+            if not self._pending and not self._closed:
+                self._cond.wait(timeout)
+            pending, self._pending = self._pending, {}
+            _SUBSCRIBER_QUEUE.dec(len(pending))
+            return pending
+
+    @property
+    def active(self) -> bool:
+        # Ditutup oleh stop_gnmi_monitoring; restart stream (filter viewer berubah) tidak memutus subscriber
+        return not self._closed
+
+    def close(self):
+        self.client.remove_callback(self)
+        with self._cond:
+            self._closed = True
+            _SUBSCRIBER_QUEUE.dec(len(self._pending))
+            self._pending = {}
+            self._cond.notify_all()
+        with _subscribers_lock:
+            _subscribers.discard(self)
+
+
 # Global client management
 _gnmi_clients: Dict[str, JuniperGNMIClient] = {}
+# Viewer (user/halaman) yang sedang memakai stream per device:
+# {device_id: {viewer: (interfaces, interval_ms, include_subinterfaces)}}, interfaces None = semua
+_gnmi_viewers: Dict[str, Dict[str, tuple]] = {}
+_gnmi_lock = threading.RLock()
+# Jumlah stream yang terakhir ditulis ke app_meta (statistik dashboard worker lain)
+_published_streams: Optional[int] = None
+
+def publish_stream_count(force: bool = False):
+    """Tulis jumlah device yang sedang di-stream ke app_meta jika berubah (dipanggil dengan _gnmi_lock)"""
+    global _published_streams
+    count = sum(1 for client in _gnmi_clients.values() if client.is_streaming)
+    if count == _published_streams and not force:
+        return
+    try:
+        from src.utils.database import set_meta_value
+        set_meta_value('gnmi_streams_active', count)
+        _published_streams = count
+    except Exception as exc:
+        logging.getLogger(__name__).debug("Gagal menulis jumlah stream aktif: %s", exc)
+
+def _get_engine():
+    if Config.GNMI_ENGINE != 'aio':
+        return None
+    from .gnmi_aio import get_aio_engine
+    return get_aio_engine()
 
 def get_gnmi_client(
     device_id: str,
@@ -488,11 +869,41 @@ def get_gnmi_client(
     use_tls: bool = False,
 ) -> JuniperGNMIClient:
     """Get or create gNMI client for device"""
-    if device_id not in _gnmi_clients:
-        _gnmi_clients[device_id] = JuniperGNMIClient(
-            ip_address, port, username, password, use_tls
-        )
-    return _gnmi_clients[device_id]
+    with _gnmi_lock:
+        if device_id not in _gnmi_clients:
+            _gnmi_clients[device_id] = JuniperGNMIClient(
+                ip_address, port, username, password, use_tls,
+                history=get_traffic_history(device_id),
+                engine=_get_engine(),
+            )
+        return _gnmi_clients[device_id]
+
+def _effective_subscription(viewers: Dict[str, tuple]) -> tuple[Optional[FrozenSet[str]], int, bool]:
+    """Gabungkan permintaan semua viewer menjadi satu subscription.
+
+    Interface yang dipilih digabung (union); jika ada viewer yang memantau semua
+    interface, stream memakai path wildcard. Interval memakai yang paling rapat,
+    subinterface disubscribe jika ada viewer yang memintanya.
+    """
+    selections = [interfaces for interfaces, _, _ in viewers.values()]
+    interfaces = None if None in selections else frozenset().union(*selections)
+    return (
+        interfaces,
+        min(interval for _, interval, _ in viewers.values()),
+        any(include for _, _, include in viewers.values()),
+    )
+
+def _client_subscription(client: JuniperGNMIClient) -> tuple[Optional[FrozenSet[str]], int, bool]:
+    return client.interfaces, client.sample_interval_ms, client.include_subinterfaces
+
+def _apply_subscription(client: JuniperGNMIClient, effective: tuple) -> bool:
+    """Samakan stream client dengan gabungan viewer; hanya daftar interface yang berubah tidak me-restart stream"""
+    current = _client_subscription(client)
+    if client.is_streaming and current == effective:
+        return True
+    if client.is_streaming and current[1:] == effective[1:]:
+        return client.update_interfaces(effective[0])
+    return client.start_interface_monitoring(*effective)
 
 def start_gnmi_monitoring(
     device_id: str,
@@ -500,23 +911,44 @@ def start_gnmi_monitoring(
     port: int,
     username: str,
     password: str,
-    interface_filter: Optional[str] = None,
+    interface_filter: Union[None, str, Iterable[str]] = None,
     sample_interval_ms: Optional[int] = None,
     use_tls: bool = False,
+    viewer: Optional[str] = None,
+    include_subinterfaces: Optional[bool] = None,
 ) -> tuple[bool, str]:
-    """Start gNMI monitoring for device"""
+    """Start gNMI monitoring for device.
+
+    ``interface_filter`` berupa None/'all', satu nama, atau list nama interface.
+    Beberapa viewer untuk device yang sama berbagi satu stream Subscribe; stream
+    hanya dibuat ulang jika gabungan interval/subinterface berubah, perubahan
+    daftar interface diterapkan tanpa restart.
+    """
     try:
-        client = get_gnmi_client(
-            device_id, ip_address, port, username, password, use_tls
-        )
-        connected = client.is_connected or client.connect()
-        if not connected:
-            return False, client.last_error or "Tidak dapat terhubung ke gNMI"
-
-        interval = sample_interval_ms if sample_interval_ms else 10000
-        if client.start_interface_monitoring(interface_filter, interval):
-            return True, f"gNMI monitoring started for {ip_address}"
-        return False, client.last_error or "Failed to start gNMI monitoring"
+        with _gnmi_lock:
+            client = get_gnmi_client(
+                device_id, ip_address, port, username, password, use_tls
+            )
+            connected = client.is_connected or client.connect()
+            if not connected:
+                return False, client.last_error or "Tidak dapat terhubung ke gNMI"
+
+            interval = max(sample_interval_ms if sample_interval_ms else 10000, 1000)
+            viewers = _gnmi_viewers.setdefault(device_id, {})
+            if include_subinterfaces is None:
+                include_subinterfaces = Config.GNMI_INCLUDE_SUBINTERFACES
+            viewers[viewer or ''] = (normalize_interfaces(interface_filter), interval, bool(include_subinterfaces))
+            effective = _effective_subscription(viewers)
+
+            if client.is_streaming and _client_subscription(client) == effective:
+                return True, f"gNMI monitoring already running for {ip_address} ({len(viewers)} viewer)"
+
+            started = _apply_subscription(client, effective)
+            publish_stream_count()
+            if started:
+                return True, f"gNMI monitoring started for {ip_address}"
+            viewers.pop(viewer or '', None)
+            return False, client.last_error or "Failed to start gNMI monitoring"
     except RuntimeError as err:
         if not HAS_GNMI:
             return False, (
@@ -527,15 +959,77 @@ def start_gnmi_monitoring(
     except Exception as e:
         return False, f"gNMI Error: {str(e)}"
 
-def stop_gnmi_monitoring(device_id: str) -> tuple[bool, str]:
-    """Stop gNMI monitoring for device"""
-    if device_id in _gnmi_clients:
-        client = _gnmi_clients[device_id]
+def stop_gnmi_monitoring(device_id: str, viewer: Optional[str] = None) -> tuple[bool, str]:
+    """Stop gNMI monitoring for device (atau lepaskan satu viewer saja)"""
+    with _gnmi_lock:
+        client = _gnmi_clients.get(device_id)
+        if client is None:
+            return False, "No active monitoring"
+
+        viewers = _gnmi_viewers.get(device_id, {})
+        if viewer is not None:
+            viewers.pop(viewer, None)
+            if viewers:
+                _apply_subscription(client, _effective_subscription(viewers))
+                return True, f"Viewer dilepas, monitoring tetap berjalan untuk {len(viewers)} viewer lain"
+
+        for callback in list(client.callbacks):
+            if isinstance(callback, TrafficSubscriber):
+                callback.close()
         client.stop_interface_monitoring()
         client.disconnect()
         del _gnmi_clients[device_id]
+        _gnmi_viewers.pop(device_id, None)
+        publish_stream_count()
         return True, "gNMI monitoring stopped"
-    return False, "No active monitoring"
+
+def update_gnmi_subscription(
+    device_id: str,
+    viewer: Optional[str] = None,
+    add: Iterable[str] = (),
+    remove: Iterable[str] = (),
+) -> tuple[bool, object]:
+    """Tambah/lepas interface milik viewer pada stream yang sedang berjalan.
+
+    Tanpa ``add``/``remove`` hanya mengembalikan status subscription.
+    """
+    with _gnmi_lock:
+        client = _gnmi_clients.get(device_id)
+        if client is None or not client.is_streaming:
+            return False, "No active monitoring"
+
+        viewers = _gnmi_viewers.setdefault(device_id, {})
+        current = viewers.get(viewer or '', (frozenset(), client.sample_interval_ms, client.include_subinterfaces))
+        selection, interval, include_subinterfaces = current
+        add = normalize_interfaces(add) or frozenset()
+        remove = normalize_interfaces(remove) or frozenset()
+
+        if add or remove:
+            if selection is None:
+                return False, "Viewer memantau semua interface; mulai ulang dengan daftar interface"
+            selection = (selection | add) - remove
+            if not selection:
+                return False, "Minimal satu interface harus dipantau"
+            viewers[viewer or ''] = (selection, interval, include_subinterfaces)
+            if not _apply_subscription(client, _effective_subscription(viewers)):
+                viewers[viewer or ''] = current
+                return False, client.last_error or "Gagal memperbarui subscription gNMI"
+
+        return True, {
+            'interfaces': sorted(selection) if selection is not None else None,
+            'streaming': sorted(client.interfaces) if client.interfaces is not None else None,
+            'rpcs': len(client._streams),
+            'viewers': len(viewers),
+        }
+
+def get_gnmi_health(device_id: str) -> Dict:
+    """Status stream gNMI device (state machine + statistik reconnect)"""
+    client = _gnmi_clients.get(device_id)
+    if not client:
+        return {'state': STOPPED, 'streams': []}
+    health = client.health()
+    health['viewers'] = len(_gnmi_viewers.get(device_id, {}))
+    return health
 
 def get_gnmi_traffic_data(device_id: str) -> Dict:
     """Get current traffic data from gNMI client"""
@@ -543,3 +1037,26 @@ def get_gnmi_traffic_data(device_id: str) -> Dict:
     if not client:
         return {}
     return client.get_current_traffic_data()
+
+
+_subscribers: set = set()
+_subscribers_lock = threading.Lock()
+
+
+def subscribe_gnmi_traffic(
+    device_id: str,
+    interface_filter: Optional[str] = None,
+    max_subscribers: Optional[int] = None,
+) -> tuple[Optional[TrafficSubscriber], str]:
+    """Daftarkan subscriber push untuk sesi gNMI yang sedang berjalan"""
+    client = _gnmi_clients.get(device_id)
+    if not client or not client.is_streaming:
+        return None, "No active monitoring"
+
+    subscriber = TrafficSubscriber(client, interface_filter)
+    with _subscribers_lock:
+        if max_subscribers and len(_subscribers) >= max_subscribers:
+            return None, "Terlalu banyak stream aktif"
+        _subscribers.add(subscriber)
+    client.add_callback(subscriber)
+    return subscriber, "subscribed"
@@ -0,0 +1,303 @@
+"""Penyimpanan riwayat rate interface dari stream gNMI.
+
+Dua tingkat data:
+
+* ring buffer ``array('d')`` per interface berisi sampel mentah terakhir
+  (resolusi sesuai sample interval gNMI), hanya di memori;
+* rollup per ``TRAFFIC_HISTORY_ROLLUP_SECONDS`` (jumlah, maksimum, jumlah
+  sampel) yang ditulis ke tabel SQLite ``traffic_rollups`` setiap kali
+  satu bucket selesai, untuk riwayat berjam-jam hingga berhari-hari.
+"""
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from src.models.traffic import get_traffic_rollups, prune_traffic_rollups, save_traffic_rollups
+from src.utils.log import get_logger
+from .subscriptions import match_interface
+
+logger = get_logger('history')
+
+RATE_FIELDS = ('in_rate', 'out_rate', 'in_pps', 'out_pps')
+
+# Index kolom accumulator bucket: [bucket, samples, in_sum, in_max, out_sum, out_max, in_pps_sum, out_pps_sum]
+_BUCKET, _SAMPLES, _IN_SUM, _IN_MAX, _OUT_SUM, _OUT_MAX, _IN_PPS_SUM, _OUT_PPS_SUM = range(8)
+
+_PRUNE_EVERY = 3600
+
+
+class _RingBuffer:
+    """Buffer melingkar sampel mentah satu interface (kolom timestamp + rate)"""
+
+    __slots__ = ('capacity', 'size', 'head', 'timestamps', 'columns')
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 1)
+        self.size = 0
+        self.head = 0
+        self.timestamps = array('d', bytes(8 * self.capacity))
+        self.columns = tuple(array('d', bytes(8 * self.capacity)) for _ in RATE_FIELDS)
+
+    def append(self, timestamp: float, values: tuple):
+        index = self.head
+        self.timestamps[index] = timestamp
+        for column, value in zip(self.columns, values):
+            column[index] = value
+        self.head = (index + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def oldest(self) -> Optional[float]:
+        if not self.size:
+            return None
+        return self.timestamps[(self.head - self.size) % self.capacity]
+
+    def iter_range(self, start: float, end: float):
+        """Yield (timestamp, values) berurutan waktu dalam rentang [start, end]"""
+        first = self.head - self.size
+        for offset in range(self.size):
+            index = (first + offset) % self.capacity
+            timestamp = self.timestamps[index]
+            if start <= timestamp <= end:
+                yield timestamp, tuple(column[index] for column in self.columns)
+
+
+def _empty_series(with_max: bool = True) -> Dict[str, list]:
+    series = {'t': []}
+    for field in RATE_FIELDS:
+        series[field] = []
+    if with_max:
+        series['in_rate_max'] = []
+        series['out_rate_max'] = []
+    return series
+
+
+def _matches(interface: str, interface_filter: Optional[str]) -> bool:
+    return match_interface(interface, interface_filter)
+
+
+class TrafficHistory:
+    """Riwayat traffic satu sesi gNMI (key sama dengan key client gNMI)"""
+
+    def __init__(self, device_key: str, raw_points: Optional[int] = None, rollup_seconds: Optional[int] = None):
+        self.device_key = device_key
+        self.raw_points = raw_points or Config.TRAFFIC_HISTORY_RAW_POINTS
+        self.rollup_seconds = max(rollup_seconds or Config.TRAFFIC_HISTORY_ROLLUP_SECONDS, 1)
+        self._lock = threading.Lock()
+        self._rings: Dict[str, _RingBuffer] = {}
+        self._buckets: Dict[str, list] = {}
+        self._pending: List[tuple] = []
+        self._last_prune = 0.0
+
+    # Write path ----------------------------------------------------------
+
+    def record(self, interface: str, timestamp: float, rates: Dict[str, float]):
+        """Catat satu sampel rate (dipanggil dari thread stream gNMI)"""
+        values = tuple(float(rates.get(field) or 0.0) for field in RATE_FIELDS)
+        bucket = int(timestamp // self.rollup_seconds) * self.rollup_seconds
+        with self._lock:
+            ring = self._rings.get(interface)
+            if ring is None:
+                ring = self._rings[interface] = _RingBuffer(self.raw_points)
+            ring.append(timestamp, values)
+
+            acc = self._buckets.get(interface)
+            if acc is not None and acc[_BUCKET] != bucket:
+                self._pending.append(self._row(interface, acc))
+                acc = None
+            if acc is None:
+                acc = self._buckets[interface] = [bucket, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+            in_rate, out_rate, in_pps, out_pps = values
+            acc[_SAMPLES] += 1
+            acc[_IN_SUM] += in_rate
+            acc[_IN_MAX] = max(acc[_IN_MAX], in_rate)
+            acc[_OUT_SUM] += out_rate
+            acc[_OUT_MAX] = max(acc[_OUT_MAX], out_rate)
+            acc[_IN_PPS_SUM] += in_pps
+            acc[_OUT_PPS_SUM] += out_pps
+
+    def _row(self, interface: str, acc: list) -> tuple:
+        return (self.device_key, interface, *acc)
+
+    def collect(self, now: Optional[float] = None, force: bool = False) -> Tuple[List[tuple], Optional[float]]:
+        """Ambil bucket yang sudah selesai tanpa menyentuh SQLite (force: termasuk bucket berjalan).
+
+        Mengembalikan (baris rollup, batas waktu prune atau None) untuk ``write``,
+        sehingga pemanggil bisa menulis di luar lock/event loop miliknya.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            for interface, acc in list(self._buckets.items()):
+                # Interface yang berhenti mengirim data tetap di-flush setelah bucket-nya lewat
+                if force or acc[_BUCKET] + self.rollup_seconds <= now:
+                    self._pending.append(self._row(interface, acc))
+                    del self._buckets[interface]
+            rows, self._pending = self._pending, []
+            prune_before = None
+            if now - self._last_prune >= _PRUNE_EVERY:
+                self._last_prune = now
+                prune_before = now - Config.TRAFFIC_HISTORY_RETENTION_DAYS * 86400
+        return rows, prune_before
+
+    def write(self, rows: List[tuple], prune_before: Optional[float] = None):
+        """Simpan hasil ``collect`` ke SQLite (bisa menunggu lock tulis sampai busy timeout)"""
+        if rows:
+            try:
+                save_traffic_rollups(rows)
+            except Exception as exc:
+                logger.warning("Gagal menyimpan rollup %s: %s", self.device_key, exc)
+
+        if prune_before is not None:
+            try:
+                prune_traffic_rollups(prune_before)
+            except Exception as exc:
+                logger.warning("Gagal menghapus rollup lama: %s", exc)
+
+    def flush(self, now: Optional[float] = None, force: bool = False):
+        """Tulis bucket yang sudah selesai ke SQLite (force: termasuk bucket berjalan)"""
+        self.write(*self.collect(now, force))
+
+    # Read path -----------------------------------------------------------
+
+    def query(self, start: float, end: float, step: int, interface_filter: Optional[str] = None) -> Dict:
+        """Riwayat per interface dalam format kolom (t, in_rate, out_rate, ...).
+
+        ``step`` di bawah resolusi rollup dilayani dari ring buffer; bagian
+        rentang yang lebih tua dari isi ring buffer diisi dari rollup SQLite.
+        Data mentah dimulai di batas rollup pertama setelah sampel tertua ring
+        buffer, sehingga bucket rollup yang memuat sampel tertua tetap dipakai.
+        """
+        step = max(int(step), 1)
+        rollup_step = max(-(-step // self.rollup_seconds), 1) * self.rollup_seconds
+        use_raw = step < self.rollup_seconds
+
+        with self._lock:
+            raw_starts = {}
+            raw_series = {}
+            if use_raw:
+                for interface, ring in self._rings.items():
+                    if not _matches(interface, interface_filter):
+                        continue
+                    oldest = ring.oldest()
+                    raw_start = None if oldest is None else -(-oldest // rollup_step) * rollup_step
+                    raw_starts[interface] = raw_start
+                    raw_series[interface] = self._bucket_raw(
+                        ring, start if raw_start is None else max(start, raw_start), end, step
+                    )
+            open_buckets = [
+                self._row(interface, acc) for interface, acc in self._buckets.items()
+                if _matches(interface, interface_filter)
+            ] + [row for row in self._pending if _matches(row[1], interface_filter)]
+
+        grouped: Dict[str, Dict[int, list]] = {}
+        for row in get_traffic_rollups(self.device_key, start, end, rollup_step):
+            if not _matches(row['interface'], interface_filter):
+                continue
+            grouped.setdefault(row['interface'], {})[row['t']] = [
+                row['samples'], row['in_rate_sum'], row['in_rate_max'], row['out_rate_sum'],
+                row['out_rate_max'], row['in_pps_sum'], row['out_pps_sum'],
+            ]
+        # Bucket yang belum tersimpan di SQLite
+        for _, interface, bucket, *values in open_buckets:
+            if not (start <= bucket <= end):
+                continue
+            slot = grouped.setdefault(interface, {}).setdefault((bucket // rollup_step) * rollup_step, [0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+            samples, in_sum, in_max, out_sum, out_max, in_pps_sum, out_pps_sum = values
+            slot[0] += samples
+            slot[1] += in_sum
+            slot[2] = max(slot[2], in_max)
+            slot[3] += out_sum
+            slot[4] = max(slot[4], out_max)
+            slot[5] += in_pps_sum
+            slot[6] += out_pps_sum
+
+        result = {}
+        for interface in set(grouped) | set(raw_series):
+            series = _empty_series()
+            raw_start = raw_starts.get(interface)
+            for t in sorted(grouped.get(interface, {})):
+                # Rentang yang sudah tercakup ring buffer memakai data mentah
+                if raw_start is not None and t >= raw_start:
+                    continue
+                samples, in_sum, in_max, out_sum, out_max, in_pps_sum, out_pps_sum = grouped[interface][t]
+                if not samples:
+                    continue
+                series['t'].append(t)
+                series['in_rate'].append(in_sum / samples)
+                series['out_rate'].append(out_sum / samples)
+                series['in_pps'].append(in_pps_sum / samples)
+                series['out_pps'].append(out_pps_sum / samples)
+                series['in_rate_max'].append(in_max)
+                series['out_rate_max'].append(out_max)
+            raw = raw_series.get(interface)
+            if raw:
+                for key, values in raw.items():
+                    series[key].extend(values)
+            if series['t']:
+                result[interface] = series
+
+        return {
+            'interfaces': result,
+            'step': step if use_raw else rollup_step,
+            'resolution': 'raw' if use_raw else 'rollup',
+        }
+
+    @staticmethod
+    def _bucket_raw(ring: _RingBuffer, start: float, end: float, step: int) -> Dict[str, list]:
+        series = _empty_series()
+        current = None
+        acc = None
+        for timestamp, values in ring.iter_range(start, end):
+            bucket = int(timestamp // step) * step
+            if bucket != current:
+                if acc:
+                    _append_raw_bucket(series, current, acc)
+                current, acc = bucket, [0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+            acc[0] += 1
+            acc[1] += values[0]
+            acc[2] += values[1]
+            acc[3] += values[2]
+            acc[4] += values[3]
+            acc[5] = max(acc[5], values[0])
+            acc[6] = max(acc[6], values[1])
+        if acc:
+            _append_raw_bucket(series, current, acc)
+        return series
+
+
+def _append_raw_bucket(series: Dict[str, list], bucket: int, acc: list):
+    samples = acc[0]
+    series['t'].append(bucket)
+    series['in_rate'].append(acc[1] / samples)
+    series['out_rate'].append(acc[2] / samples)
+    series['in_pps'].append(acc[3] / samples)
+    series['out_pps'].append(acc[4] / samples)
+    series['in_rate_max'].append(acc[5])
+    series['out_rate_max'].append(acc[6])
+
+
+# Registry process-wide, key sama dengan key client gNMI ("ip:port:tls")
+_histories: Dict[str, TrafficHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def get_traffic_history(device_key: str) -> Optional[TrafficHistory]:
+    """Riwayat untuk key client gNMI, None bila TRAFFIC_HISTORY_ENABLED mati"""
+    if not Config.TRAFFIC_HISTORY_ENABLED:
+        return None
+    with _histories_lock:
+        history = _histories.get(device_key)
+        if history is None:
+            history = _histories[device_key] = TrafficHistory(device_key)
+        return history
+
+
+def flush_all_histories():
+    """Tulis semua bucket yang masih di memori (dipakai saat shutdown)"""
+    with _histories_lock:
+        histories = list(_histories.values())
+    for history in histories:
+        history.flush(force=True)
@@ -0,0 +1,167 @@
+"""Parser incremental untuk response REST Junos (multipart/mixed atau JSON biasa).
+
+Response dibaca per chunk dari ``response.iter_content`` dan setiap part JSON
+langsung diserahkan ke decoder tanpa membangun ``response.text`` secara utuh.
+"""
+import json
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+
+    json_loads: Callable[[bytes], Any] = orjson.loads
+except ImportError:  # pragma: no cover - orjson opsional
+    json_loads = json.loads
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def parse_boundary(content_type: Optional[str]) -> Optional[bytes]:
+    """Ambil parameter boundary dari header Content-Type"""
+    if not content_type or 'multipart/' not in content_type.lower():
+        return None
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'boundary' and value:
+            return value.strip().strip('"').encode('latin-1')
+    return None
+
+
+def decode_json_part(buf, start: int = 0, end: Optional[int] = None, loads: Callable[[bytes], Any] = json_loads):
+    """Decode objek JSON di antara '{' pertama dan '}' terakhir pada buf[start:end].
+
+    Hanya satu salinan (slice objek JSON) yang dibuat. Mengembalikan None jika
+    tidak ada objek JSON (mis. part berisi XML error).
+    """
+    end = len(buf) if end is None else end
+    json_start = buf.find(b'{', start, end)
+    if json_start == -1:
+        return None
+    json_end = buf.rfind(b'}', json_start, end)
+    if json_end == -1:
+        raise json.JSONDecodeError('Unterminated JSON object', '', 0)
+    return loads(buf[json_start:json_end + 1])
+
+
+class MultipartJSONParser:
+    """State machine multipart yang menerima bytes secara bertahap.
+
+    ``feed`` mengembalikan daftar objek JSON dari part yang sudah lengkap;
+    buffer hanya menyimpan part yang sedang dibaca.
+    """
+
+    def __init__(self, boundary: Optional[bytes] = None, loads: Callable[[bytes], Any] = json_loads):
+        self.loads = loads
+        self._buf = bytearray()
+        self._scan_from = 0
+        self._in_part = False
+        self._finished = False
+        self._mode = None  # 'multipart' | 'plain'
+        self._delimiter = b''
+        if boundary:
+            self._set_boundary(boundary)
+
+    def _set_boundary(self, boundary: bytes):
+        self._mode = 'multipart'
+        self._delimiter = b'--' + boundary
+
+    def _sniff(self) -> bool:
+        """Tentukan mode dari awal body jika boundary tidak ada di header"""
+        offset = 0
+        while offset < len(self._buf) and self._buf[offset] in b' \t\r\n':
+            offset += 1
+        if offset == len(self._buf) or self._buf[offset:] == b'-':
+            return False
+        if self._buf.startswith(b'--', offset):
+            line_end = self._buf.find(b'\n', offset)
+            if line_end == -1:
+                return False
+            self._set_boundary(bytes(self._buf[offset + 2:line_end]).strip())
+        else:
+            self._mode = 'plain'
+        return True
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        if self._finished or not chunk:
+            return []
+        self._buf += chunk
+        if self._mode is None and not self._sniff():
+            return []
+        if self._mode == 'plain':
+            return []
+        return self._drain()
+
+    def _drain(self) -> List[Any]:
+        results = []
+        delimiter = self._delimiter
+        while not self._finished:
+            idx = self._buf.find(delimiter, self._scan_from)
+            if idx == -1:
+                # Ekor buffer bisa berisi sebagian delimiter, scan ulang dari sana
+                self._scan_from = max(0, len(self._buf) - len(delimiter))
+                break
+
+            after = idx + len(delimiter)
+            if len(self._buf) < after + 2:
+                # Perlu dua byte setelah delimiter untuk mengenali penutup '--'
+                self._scan_from = idx
+                break
+
+            if self._in_part:
+                parsed = self._finish_part(idx)
+                if parsed is not None:
+                    results.append(parsed)
+
+            if self._buf[after:after + 2] == b'--':
+                self._finished = True
+                self._buf.clear()
+                break
+
+            del self._buf[:after]
+            self._scan_from = 0
+            self._in_part = True
+        return results
+
+    def _finish_part(self, end: int):
+        header_end = self._buf.find(b'\r\n\r\n', 0, end)
+        if header_end != -1:
+            body_start = header_end + 4
+        else:
+            header_end = self._buf.find(b'\n\n', 0, end)
+            body_start = header_end + 2 if header_end != -1 else 0
+        return decode_json_part(self._buf, body_start, end, self.loads)
+
+    def close(self) -> List[Any]:
+        """Selesaikan parsing; part terakhir tetap diproses bila penutup tidak ada"""
+        results = []
+        if self._mode != 'multipart':
+            parsed = decode_json_part(self._buf, loads=self.loads)
+            if parsed is not None:
+                results.append(parsed)
+        elif not self._finished and self._in_part:
+            parsed = self._finish_part(len(self._buf))
+            if parsed is not None:
+                results.append(parsed)
+        self._buf = bytearray()
+        self._finished = True
+        return results
+
+
+def iter_json_parts(
+    chunks: Iterable[bytes],
+    content_type: Optional[str] = None,
+    loads: Callable[[bytes], Any] = json_loads,
+) -> Iterator[Any]:
+    """Yield setiap objek JSON dari stream chunk response Junos"""
+    parser = MultipartJSONParser(parse_boundary(content_type), loads)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def iter_response_json(response, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield objek JSON dari ``requests.Response`` yang dibuka dengan stream=True"""
+    return iter_json_parts(
+        response.iter_content(chunk_size=chunk_size),
+        response.headers.get('Content-Type'),
+    )
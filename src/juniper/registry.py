@@ -0,0 +1,101 @@
+"""Registry device in-memory: data koneksi yang sudah di-resolve per device.
+
+Sebelumnya setiap request membaca baris device lalu password-nya dalam dua query
+terpisah dan men-decrypt password ulang. Registry memuat semua device sekali
+(password sudah di-decrypt, argumen koneksi REST sudah dinormalisasi) dan hanya
+memuat ulang jika ``devices_version`` di tabel ``app_meta`` berubah.
+
+Versi dinaikkan dalam transaksi yang sama dengan create/update/delete, sehingga
+perubahan dari worker gunicorn lain ikut terlihat. Pengecekan versi pun dilewati
+selama ``PRAGMA data_version`` koneksi thread ini tetap (tidak ada commit dari
+koneksi lain), dan token itu sendiri paling sering dibaca sekali per
+``DEVICE_REGISTRY_CHECK_INTERVAL`` detik per thread. Perubahan dari proses ini
+langsung membatalkan cache lewat ``on_device_change``; perubahan dari worker lain
+terlihat paling lambat setelah interval tersebut.
+"""
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+from config import Config
+from src.juniper.api import rest_connection_kwargs
+from src.models.device import get_devices_version, load_devices_with_version, on_device_change
+from src.utils.database import ChangeMonitor
+from src.utils.encryption import crypto
+from src.utils.log import get_logger
+
+logger = get_logger('registry')
+
+
+class DeviceEntry(NamedTuple):
+    device: Dict              # baris device tanpa kolom password
+    password: Optional[str]   # password ter-decrypt (None jika gagal decrypt)
+    rest_args: Dict           # kwargs port/use_ssl/rest_insecure untuk fungsi REST
+
+
+def _make_entry(row: Dict) -> DeviceEntry:
+    encrypted = row.pop('password', None)
+    password = crypto.decrypt(encrypted) if encrypted else None
+    rest_args = rest_connection_kwargs(row.get('api_port'), row.get('api_use_ssl'), row.get('api_verify_ssl'))
+    return DeviceEntry(row, password or None, rest_args)
+
+
+class DeviceRegistry:
+    def __init__(self, check_interval: float = 1.0):
+        self.monitor = ChangeMonitor(check_interval)
+        self._lock = threading.Lock()
+        self._entries: Dict[int, DeviceEntry] = {}
+        self._version: Optional[int] = None
+        self._loaded_generation = -1
+
+    def invalidate(self):
+        self.monitor.invalidate()
+
+    def _current(self) -> Dict[int, DeviceEntry]:
+        if self.monitor.changed() or self._loaded_generation != self.monitor.generation:
+            self._refresh()
+        return self._entries
+
+    def _refresh(self):
+        with self._lock:
+            generation = self.monitor.generation
+            if self._loaded_generation == generation and get_devices_version() == self._version:
+                return
+            version, rows = load_devices_with_version()
+            self._entries = {row['id']: _make_entry(row) for row in rows}
+            self._version = version
+            self._loaded_generation = generation
+        logger.debug("Registry device dimuat ulang: versi %s, %d device", version, len(rows))
+
+    def get(self, device_id: int) -> Optional[DeviceEntry]:
+        return self._current().get(device_id)
+
+    def all(self) -> List[DeviceEntry]:
+        return sorted(self._current().values(), key=lambda entry: entry.device['name'])
+
+
+registry = DeviceRegistry(Config.DEVICE_REGISTRY_CHECK_INTERVAL)
+
+
+@on_device_change
+def _on_device_changed(device_id, ip_addresses):
+    registry.invalidate()
+
+
+def get_device_entry(device_id) -> Optional[DeviceEntry]:
+    return registry.get(device_id)
+
+
+def all_device_entries() -> List[DeviceEntry]:
+    return registry.all()
+
+
+def get_device(device_id) -> Optional[Dict]:
+    """Pengganti get_juniper_device: salinan dict device (tanpa password)"""
+    entry = registry.get(device_id)
+    return dict(entry.device) if entry else None
+
+
+def get_device_password(device_id) -> Optional[str]:
+    """Pengganti get_juniper_device_password tanpa query dan decrypt ulang"""
+    entry = registry.get(device_id)
+    return entry.password if entry else None
@@ -1,29 +1,42 @@
+import json
 import time
 import types
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 
 from src.models.device import (
-    create_juniper_device, get_all_juniper_devices, get_juniper_device,
-    update_juniper_device, delete_juniper_device, get_juniper_device_password
+    create_juniper_device, get_all_juniper_devices,
+    update_juniper_device, delete_juniper_device
 )
 from src.juniper.api import (
     test_juniper_connection, 
     get_juniper_bgp_summary, 
-    get_juniper_system_info,
     get_juniper_bgp_neighbor_detail,
     get_juniper_policy_options,
-    get_juniper_static_routes,
     get_juniper_interfaces,
+    get_juniper_rpcs,
     start_grpc_traffic_monitoring,
     stop_grpc_traffic_monitoring,
     get_interfaces_for_monitoring,
-    get_live_traffic_data
+    resolve_monitoring_interfaces,
+    update_traffic_subscription,
+    get_live_traffic_data,
+    get_traffic_history_data,
+    get_traffic_health,
+    subscribe_live_traffic,
+    rest_connection_kwargs
 )
+from src.juniper.collector import COLLECTOR_KINDS, get_snapshot, snapshot_meta
+from src.juniper.subscriptions import match_interface
+from src.juniper.fleet import poll_fleet
+from src.juniper.registry import all_device_entries, get_device, get_device_entry
+from src.utils.log import payload_capture
 from config import Config
 
 juniper_bp = Blueprint('juniper', __name__)
 
+_NO_PASSWORD_MESSAGE = 'Password device tidak tersedia'
+
 
 def _parse_checkbox(value, default=False):
     if value is None:
@@ -51,17 +64,24 @@ def _checkbox_value(field_name, default=False):
     return _parse_checkbox(values[-1], default=default)
 
 
-def _rest_connection_kwargs(port, use_ssl, verify_ssl):
-    """Normalise REST connection flags for Juniper API calls."""
-    resolved_port = port if port is not None else Config.API_DEFAULT_PORT
-    use_ssl_flag = bool(use_ssl)
-    verify_ssl_flag = bool(verify_ssl)
-    rest_insecure = not verify_ssl_flag if use_ssl_flag else True
-    return {
-        'port': resolved_port,
-        'use_ssl': use_ssl_flag,
-        'rest_insecure': rest_insecure
-    }
+def _load_device_data(device, kind):
+    """Ambil data dari snapshot collector; fallback ke RPC langsung (atau jika ?live=1)"""
+    if request.args.get('live') != '1':
+        snapshot = get_snapshot(device['id'], kind)
+        if snapshot:
+            return True, snapshot['data'], snapshot_meta(snapshot)
+
+    entry = get_device_entry(device['id'])
+    if not entry or not entry.password:
+        return False, _NO_PASSWORD_MESSAGE, snapshot_meta(None)
+
+    success, data = COLLECTOR_KINDS[kind](
+        ip_address=device['ip_address'],
+        username=device['username'],
+        password=entry.password,
+        **entry.rest_args
+    )
+    return success, data, snapshot_meta(None)
 
 @juniper_bp.route('/devices')
 @login_required
@@ -123,7 +143,7 @@ def config():
             if not all([ip_address, username, password]):
                 flash('IP Address, Username, dan Password wajib diisi!', 'danger')
             else:
-                rest_args = _rest_connection_kwargs(api_port, api_use_ssl, api_verify_ssl)
+                rest_args = rest_connection_kwargs(api_port, api_use_ssl, api_verify_ssl)
                 success, result = test_juniper_connection(
                     ip_address=ip_address,
                     username=username,
@@ -151,44 +171,31 @@ def config():
 @juniper_bp.route('/device/<int:device_id>')
 @login_required
 def device_status(device_id):
-    device = get_juniper_device(device_id)
+    device = get_device(device_id)
     if not device:
         flash('Device tidak ditemukan!', 'danger')
         return redirect(url_for('juniper.devices'))
-    status_api = url_for('juniper.api_device_status', device_id=device_id)
-    return render_template('juniper/status.html', device=device, status_api=status_api)
+    overview_api = url_for('juniper.api_device_overview', device_id=device_id)
+    return render_template('juniper/status.html', device=device, overview_api=overview_api)
 
 
 @juniper_bp.route('/api/device/<int:device_id>/status')
 @login_required
 def api_device_status(device_id):
     try:
-        device = get_juniper_device(device_id)
+        device = get_device(device_id)
         if not device:
             return jsonify({'success': False, 'message': 'Device tidak ditemukan'})
 
-        password = get_juniper_device_password(device_id)
-        if not password:
-            return jsonify({'success': False, 'message': 'Password device tidak tersedia'})
-
-        rest_args = _rest_connection_kwargs(
-            device.get('api_port'),
-            device.get('api_use_ssl'),
-            device.get('api_verify_ssl')
-        )
-
-        sys_success, sys_overview = get_juniper_system_info(
-            ip_address=device['ip_address'],
-            username=device['username'],
-            password=password,
-            **rest_args
-        )
+        sys_success, sys_overview, snapshot = _load_device_data(device, 'system_info')
 
         if sys_success and isinstance(sys_overview, dict):
             sys_data = sys_overview.get('system')
             re_data = sys_overview.get('route_engine')
 
-            result = {'success': True, 'system': sys_data, 'route_engine': re_data}
+            result = {'success': True, 'system': sys_data, 'route_engine': re_data, 'snapshot': snapshot}
+        elif sys_overview == _NO_PASSWORD_MESSAGE:
+            result = {'success': False, 'message': sys_overview}
         else:
             result = {
                 'success': False,
@@ -202,43 +209,143 @@ def api_device_status(device_id):
         return jsonify({'success': False, 'message': f'Error: {exc}'})
 
 
+# Data yang ditampilkan di halaman overview (status) device
+OVERVIEW_KINDS = ('system_info', 'bgp_summary', 'static_routes', 'interfaces')
+
+
+@juniper_bp.route('/api/device/<int:device_id>/overview')
+@login_required
+def api_device_overview(device_id):
+    """Semua data overview device dalam satu response.
+
+    Data yang tidak ada di snapshot collector (atau cache RPC) diambil dalam
+    satu POST /rpc multi-RPC ke device.
+    """
+    try:
+        entry = get_device_entry(device_id)
+        if not entry:
+            return jsonify({'success': False, 'message': 'Device tidak ditemukan'})
+        device = entry.device
+
+        result = {}
+        pending = list(OVERVIEW_KINDS)
+        if request.args.get('live') != '1':
+            for kind in OVERVIEW_KINDS:
+                if kind not in COLLECTOR_KINDS:
+                    continue
+                snapshot = get_snapshot(device_id, kind)
+                if snapshot:
+                    result[kind] = {'success': True, 'data': snapshot['data'], 'snapshot': snapshot_meta(snapshot)}
+                    pending.remove(kind)
+
+        if pending and not entry.password:
+            return jsonify({'success': False, 'message': _NO_PASSWORD_MESSAGE})
+
+        if pending:
+            fetched = get_juniper_rpcs(
+                ip_address=device['ip_address'],
+                username=device['username'],
+                password=entry.password,
+                names=pending,
+                **entry.rest_args
+            )
+            for kind, (success, data) in fetched.items():
+                result[kind] = {
+                    'success': success,
+                    'data': data if success else None,
+                    'message': None if success else data,
+                    'snapshot': snapshot_meta(None)
+                }
+
+        return jsonify({
+            'success': any(item['success'] for item in result.values()),
+            'device': {'id': device_id, 'name': device['name'], 'ip_address': device['ip_address']},
+            **result
+        })
+    except Exception as exc:
+        return jsonify({'success': False, 'message': f'Error: {exc}'})
+
+
+@juniper_bp.route('/api/device/<int:device_id>/debug/responses', methods=['GET', 'DELETE'])
+@login_required
+def api_device_debug_responses(device_id):
+    """Response REST mentah terakhir device (DEBUG_CAPTURE_ENABLED), per proses worker"""
+    device = get_device(device_id)
+    if not device:
+        return jsonify({'success': False, 'message': 'Device tidak ditemukan'}), 404
+
+    if request.method == 'DELETE':
+        cleared = payload_capture.clear(device['ip_address'])
+        return jsonify({'success': True, 'cleared': cleared})
+
+    limit = _safe_int(request.args.get('limit'), 0)
+    return jsonify({
+        'success': True,
+        'enabled': payload_capture.enabled,
+        'responses': payload_capture.entries(device['ip_address'], limit or None),
+    })
+
+
+@juniper_bp.route('/api/fleet/status')
+@login_required
+def api_fleet_status():
+    """Status semua device, di-stream sebagai NDJSON begitu tiap device selesai di-poll"""
+    targets = [
+        (dict(entry.device), entry.password, entry.rest_args)
+        for entry in all_device_entries()
+    ]
+
+    deadline = request.args.get('deadline', type=float)
+    if deadline is None or deadline <= 0:
+        deadline = Config.FLEET_DEVICE_DEADLINE
+    deadline = min(deadline, Config.FLEET_DEVICE_DEADLINE)
+
+    def generate():
+        started = time.monotonic()
+        completed = 0
+        for result in poll_fleet(targets, deadline):
+            completed += 1
+            yield json.dumps(result) + '\n'
+        yield json.dumps({
+            'done': True,
+            'total': len(targets),
+            'completed': completed,
+            'elapsed_ms': int((time.monotonic() - started) * 1000)
+        }) + '\n'
+
+    return Response(
+        generate(),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @juniper_bp.route('/device/<int:device_id>/bgp')
 @login_required
 def device_bgp_summary(device_id):
-    device = get_juniper_device(device_id)
+    device = get_device(device_id)
     if not device:
         flash('Device tidak ditemukan!', 'danger')
         return redirect(url_for('juniper.devices'))
 
-    password = get_juniper_device_password(device_id)
-
-    rest_args = _rest_connection_kwargs(
-        device.get('api_port'),
-        device.get('api_use_ssl'),
-        device.get('api_verify_ssl')
-    )
-
-    bgp_success, bgp_data = get_juniper_bgp_summary(
-        ip_address=device['ip_address'],
-        username=device['username'],
-        password=password,
-        **rest_args
-    )
+    bgp_success, bgp_data, snapshot = _load_device_data(device, 'bgp_summary')
 
     return render_template(
         'juniper/bgp_summary.html',
         device=device,
         bgp_data=bgp_data if bgp_success else None,
-        bgp_error=None if bgp_success else bgp_data
+        bgp_error=None if bgp_success else bgp_data,
+        snapshot=snapshot
     )
 
 @juniper_bp.route('/device/<int:device_id>/edit', methods=['GET', 'POST'])
 @login_required
 def edit_device(device_id):
-    device = get_juniper_device(device_id)
-    if not device:
+    entry = get_device_entry(device_id)
+    if not entry:
         flash('Device tidak ditemukan!', 'danger')
         return redirect(url_for('juniper.devices'))
+    device = dict(entry.device)
 
     if request.method == 'POST':
         name = request.form.get('name', '').strip()
@@ -260,7 +367,7 @@ def edit_device(device_id):
         else:
             # Jika password tidak diisi, gunakan password lama
             if not password:
-                password = get_juniper_device_password(device_id)
+                password = entry.password
 
             success, message = update_juniper_device(
                 device_id=device_id,
@@ -302,7 +409,7 @@ def edit_device(device_id):
 @juniper_bp.route('/device/<int:device_id>/delete', methods=['POST'])
 @login_required
 def delete_device(device_id):
-    device = get_juniper_device(device_id)
+    device = get_device(device_id)
     if not device:
         flash('Device tidak ditemukan!', 'danger')
         return redirect(url_for('juniper.devices'))
@@ -333,7 +440,7 @@ def api_test():
         if not all([ip_address, username, password]):
             return jsonify({'success': False, 'message': 'IP, Username, dan Password wajib diisi'})
         
-        rest_args = _rest_connection_kwargs(api_port, api_use_ssl, api_verify_ssl)
+        rest_args = rest_connection_kwargs(api_port, api_use_ssl, api_verify_ssl)
         success, result = test_juniper_connection(
             ip_address=ip_address,
             username=username,
@@ -352,27 +459,17 @@ def api_test():
 @login_required
 def api_bgp_summary(device_id):
     try:
-        device = get_juniper_device(device_id)
+        device = get_device(device_id)
         if not device:
             return jsonify({'success': False, 'message': 'Device not found'})
         
-        password = get_juniper_device_password(device_id)
-        rest_args = _rest_connection_kwargs(
-            device.get('api_port'),
-            device.get('api_use_ssl'),
-            device.get('api_verify_ssl')
-        )
-        success, result = get_juniper_bgp_summary(
-            ip_address=device['ip_address'],
-            username=device['username'],
-            password=password,
-            **rest_args
-        )
+        success, result, snapshot = _load_device_data(device, 'bgp_summary')
         
         return jsonify({
             'success': success,
             'data': result if success else None,
-            'message': None if success else result
+            'message': None if success else result,
+            'snapshot': snapshot
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'Server error: {str(e)}'})
@@ -381,25 +478,18 @@ def api_bgp_summary(device_id):
 @login_required
 def bgp_neighbor_detail(device_id, neighbor_address):
     """Halaman detail BGP neighbor"""
-    device = get_juniper_device(device_id)
-    if not device:
+    entry = get_device_entry(device_id)
+    if not entry:
         flash('Device tidak ditemukan!', 'danger')
         return redirect(url_for('juniper.devices'))
+    device = entry.device
     
-    password = get_juniper_device_password(device_id)
-
-    rest_args = _rest_connection_kwargs(
-        device.get('api_port'),
-        device.get('api_use_ssl'),
-        device.get('api_verify_ssl')
-    )
-
     success, neighbor_data = get_juniper_bgp_neighbor_detail(
         ip_address=device['ip_address'],
         username=device['username'],
-        password=password,
+        password=entry.password,
         neighbor_address=neighbor_address,
-        **rest_args
+        **entry.rest_args
     )
     
     if not success:
@@ -417,23 +507,16 @@ def bgp_neighbor_detail(device_id, neighbor_address):
 def api_refresh_peer(device_id, neighbor_address):
     """API untuk refresh BGP peer secara real-time"""
     try:
-        device = get_juniper_device(device_id)
-        if not device:
+        entry = get_device_entry(device_id)
+        if not entry:
             return jsonify({'success': False, 'message': 'Device not found'})
+        device = entry.device
         
-        password = get_juniper_device_password(device_id)
-
-        rest_args = _rest_connection_kwargs(
-            device.get('api_port'),
-            device.get('api_use_ssl'),
-            device.get('api_verify_ssl')
-        )
-
         success, result = get_juniper_bgp_summary(
             ip_address=device['ip_address'],
             username=device['username'],
-            password=password,
-            **rest_args
+            password=entry.password,
+            **entry.rest_args
         )
         
         if success:
@@ -453,24 +536,17 @@ def api_refresh_peer(device_id, neighbor_address):
 @login_required
 def policy_options(device_id):
     """Halaman Policy Options (Prefix List, Policy Statement, Community)"""
-    device = get_juniper_device(device_id)
-    if not device:
+    entry = get_device_entry(device_id)
+    if not entry:
         flash('Device tidak ditemukan!', 'danger')
         return redirect(url_for('juniper.devices'))
+    device = entry.device
     
-    password = get_juniper_device_password(device_id)
-    
-    rest_args = _rest_connection_kwargs(
-        device.get('api_port'),
-        device.get('api_use_ssl'),
-        device.get('api_verify_ssl')
-    )
-
     success, policy_data = get_juniper_policy_options(
         ip_address=device['ip_address'],
         username=device['username'],
-        password=password,
-        **rest_args
+        password=entry.password,
+        **entry.rest_args
     )
     
     if not success:
@@ -486,21 +562,16 @@ def policy_options(device_id):
 def api_policy_options(device_id):
     """API untuk mendapatkan policy options"""
     try:
-        device = get_juniper_device(device_id)
-        if not device:
+        entry = get_device_entry(device_id)
+        if not entry:
             return jsonify({'success': False, 'message': 'Device not found'})
+        device = entry.device
         
-        password = get_juniper_device_password(device_id)
-        rest_args = _rest_connection_kwargs(
-            device.get('api_port'),
-            device.get('api_use_ssl'),
-            device.get('api_verify_ssl')
-        )
         success, result = get_juniper_policy_options(
             ip_address=device['ip_address'],
             username=device['username'],
-            password=password,
-            **rest_args
+            password=entry.password,
+            **entry.rest_args
         )
         
         return jsonify({
@@ -517,25 +588,12 @@ def api_policy_options(device_id):
 @login_required
 def static_routes(device_id):
     """Halaman Static Routes"""
-    device = get_juniper_device(device_id)
+    device = get_device(device_id)
     if not device:
         flash('Device tidak ditemukan!', 'danger')
         return redirect(url_for('juniper.devices'))
     
-    password = get_juniper_device_password(device_id)
-    
-    rest_args = _rest_connection_kwargs(
-        device.get('api_port'),
-        device.get('api_use_ssl'),
-        device.get('api_verify_ssl')
-    )
-
-    success, routes_data = get_juniper_static_routes(
-        ip_address=device['ip_address'],
-        username=device['username'],
-        password=password,
-        **rest_args
-    )
+    success, routes_data, snapshot = _load_device_data(device, 'static_routes')
     
     if not success:
         flash(f'❌ Gagal mengambil static routes: {routes_data}', 'danger')
@@ -543,34 +601,25 @@ def static_routes(device_id):
     
     return render_template('juniper/static_routes.html', 
                          device=device,
-                         routes_data=routes_data)
+                         routes_data=routes_data,
+                         snapshot=snapshot)
 
 @juniper_bp.route('/api/static-routes/<int:device_id>')
 @login_required
 def api_static_routes(device_id):
     """API untuk mendapatkan static routes"""
     try:
-        device = get_juniper_device(device_id)
+        device = get_device(device_id)
         if not device:
             return jsonify({'success': False, 'message': 'Device not found'})
         
-        password = get_juniper_device_password(device_id)
-        rest_args = _rest_connection_kwargs(
-            device.get('api_port'),
-            device.get('api_use_ssl'),
-            device.get('api_verify_ssl')
-        )
-        success, result = get_juniper_static_routes(
-            ip_address=device['ip_address'],
-            username=device['username'],
-            password=password,
-            **rest_args
-        )
+        success, result, snapshot = _load_device_data(device, 'static_routes')
         
         return jsonify({
             'success': success,
             'data': result if success else None,
-            'message': None if success else result
+            'message': None if success else result,
+            'snapshot': snapshot
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'Server error: {str(e)}'})
@@ -581,24 +630,17 @@ def api_static_routes(device_id):
 @login_required
 def interfaces(device_id):
     """Halaman Interfaces Configuration"""
-    device = get_juniper_device(device_id)
-    if not device:
+    entry = get_device_entry(device_id)
+    if not entry:
         flash('Device tidak ditemukan!', 'danger')
         return redirect(url_for('juniper.devices'))
+    device = entry.device
     
-    password = get_juniper_device_password(device_id)
-    
-    rest_args = _rest_connection_kwargs(
-        device.get('api_port'),
-        device.get('api_use_ssl'),
-        device.get('api_verify_ssl')
-    )
-
     success, interfaces_data = get_juniper_interfaces(
         ip_address=device['ip_address'],
         username=device['username'],
-        password=password,
-        **rest_args
+        password=entry.password,
+        **entry.rest_args
     )
     
     if not success:
@@ -614,21 +656,16 @@ def interfaces(device_id):
 def api_interfaces(device_id):
     """API untuk mendapatkan interfaces configuration"""
     try:
-        device = get_juniper_device(device_id)
-        if not device:
+        entry = get_device_entry(device_id)
+        if not entry:
             return jsonify({'success': False, 'message': 'Device not found'})
+        device = entry.device
         
-        password = get_juniper_device_password(device_id)
-        rest_args = _rest_connection_kwargs(
-            device.get('api_port'),
-            device.get('api_use_ssl'),
-            device.get('api_verify_ssl')
-        )
         success, result = get_juniper_interfaces(
             ip_address=device['ip_address'],
             username=device['username'],
-            password=password,
-            **rest_args
+            password=entry.password,
+            **entry.rest_args
         )
         
         return jsonify({
@@ -647,7 +684,7 @@ def api_interfaces(device_id):
 @login_required
 def interface_traffic(device_id):
     """Halaman Monitoring Live Traffic"""
-    device = get_juniper_device(device_id)
+    device = get_device(device_id)
     if not device:
         flash('Device tidak ditemukan!', 'danger')
         return redirect(url_for('juniper.devices'))
@@ -661,23 +698,16 @@ def interface_traffic(device_id):
 def api_traffic_interfaces(device_id):
     """API untuk mendapatkan list interfaces untuk monitoring"""
     try:
-        device = get_juniper_device(device_id)
-        if not device:
+        entry = get_device_entry(device_id)
+        if not entry:
             return jsonify({'success': False, 'message': 'Device not found'})
+        device = entry.device
         
-        password = get_juniper_device_password(device_id)
-        
-        rest_args = _rest_connection_kwargs(
-            device.get('api_port'),
-            device.get('api_use_ssl'),
-            device.get('api_verify_ssl')
-        )
-
         success, interfaces = get_interfaces_for_monitoring(
             ip_address=device['ip_address'],
             username=device['username'],
-            password=password,
-            **rest_args
+            password=entry.password,
+            **entry.rest_args
         )
         
         if success:
@@ -691,35 +721,61 @@ def api_traffic_interfaces(device_id):
     except Exception as e:
         return jsonify({'success': False, 'message': f'Server error: {str(e)}'})
 
+def _resolve_interfaces(entry, interfaces, patterns):
+    """Nama interface dari list ``interfaces`` dan regex ``patterns`` pada payload"""
+    if isinstance(interfaces, str):
+        interfaces = [interfaces]
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return resolve_monitoring_interfaces(
+        entry.device['ip_address'],
+        entry.device['username'],
+        entry.password,
+        interfaces=interfaces,
+        patterns=patterns,
+        **entry.rest_args
+    )
+
+
 @juniper_bp.route('/api/traffic/<int:device_id>/start', methods=['POST'])
 @login_required
 def api_traffic_start(device_id):
     """API untuk mulai monitoring traffic"""
     try:
-        device = get_juniper_device(device_id)
-        if not device:
+        entry = get_device_entry(device_id)
+        if not entry:
             return jsonify({'success': False, 'message': 'Device not found'})
+        device = entry.device
 
         payload = request.get_json(silent=True) or {}
         interface_filter = payload.get('interface', 'all')
         interval_seconds = payload.get('interval_seconds', 10)
+        include_subinterfaces = payload.get('include_subinterfaces')
 
         try:
             interval_seconds = max(int(interval_seconds), 1)
         except (TypeError, ValueError):
             interval_seconds = 10
 
-        password = get_juniper_device_password(device_id)
+        # Daftar interface/regex: setiap interface disubscribe dengan path ber-key
+        if payload.get('interfaces') or payload.get('patterns'):
+            success, interface_filter = _resolve_interfaces(
+                entry, payload.get('interfaces'), payload.get('patterns')
+            )
+            if not success:
+                return jsonify({'success': False, 'message': interface_filter})
 
         success, result = start_grpc_traffic_monitoring(
             ip_address=device['ip_address'],
             username=device['username'],
-            password=password,
+            password=entry.password,
             interface_filter=interface_filter,
             sample_interval_ms=interval_seconds * 1000,
             gnmi_port=device['gnmi_port'],
             gnmi_use_ssl=device['gnmi_use_ssl'],
-            gnmi_verify_ssl=device['gnmi_verify_ssl']
+            gnmi_verify_ssl=device['gnmi_verify_ssl'],
+            viewer=current_user.get_id(),
+            include_subinterfaces=None if include_subinterfaces is None else _parse_checkbox(include_subinterfaces),
         )
 
         return jsonify({'success': success, 'message': result})
@@ -733,7 +789,7 @@ def api_traffic_start(device_id):
 def api_traffic_stop(device_id):
     """API untuk menghentikan monitoring traffic"""
     try:
-        device = get_juniper_device(device_id)
+        device = get_device(device_id)
         if not device:
             return jsonify({'success': False, 'message': 'Device not found'})
 
@@ -741,41 +797,80 @@ def api_traffic_stop(device_id):
             ip_address=device['ip_address'], 
             gnmi_port=device['gnmi_port'], 
             gnmi_use_ssl=device['gnmi_use_ssl'],
-            gnmi_verify_ssl=device['gnmi_verify_ssl']
+            gnmi_verify_ssl=device['gnmi_verify_ssl'],
+            viewer=current_user.get_id()
         )
         return jsonify({'success': success, 'message': message})
     except Exception as e:
         return jsonify({'success': False, 'message': f'Server error: {str(e)}'})
 
+@juniper_bp.route('/api/traffic/<int:device_id>/subscriptions', methods=['GET', 'POST'])
+@login_required
+def api_traffic_subscriptions(device_id):
+    """Status subscription viewer; POST {add, remove, add_patterns, remove_patterns} mengubah interface tanpa restart"""
+    try:
+        entry = get_device_entry(device_id)
+        if not entry:
+            return jsonify({'success': False, 'message': 'Device not found'})
+        device = entry.device
+
+        add, remove = [], []
+        if request.method == 'POST':
+            payload = request.get_json(silent=True) or {}
+            for key, target in (('add', add), ('remove', remove)):
+                names, patterns = payload.get(key), payload.get(f'{key}_patterns')
+                if not names and not patterns:
+                    continue
+                success, resolved = _resolve_interfaces(entry, names, patterns)
+                if not success:
+                    return jsonify({'success': False, 'message': resolved}), 400
+                target.extend(resolved)
+            if not add and not remove:
+                return jsonify({'success': False, 'message': 'Isi add atau remove'}), 400
+
+        success, result = update_traffic_subscription(
+            ip_address=device['ip_address'],
+            add=add,
+            remove=remove,
+            gnmi_port=device['gnmi_port'],
+            gnmi_use_ssl=device['gnmi_use_ssl'],
+            gnmi_verify_ssl=device['gnmi_verify_ssl'],
+            viewer=current_user.get_id(),
+        )
+        if not success:
+            return jsonify({'success': False, 'message': result})
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Server error: {str(e)}'})
+
 @juniper_bp.route('/api/traffic/<int:device_id>/update')
 @login_required
 def api_traffic_update(device_id):
     """API untuk mendapatkan update traffic data dari GRPC"""
     try:
-        device = get_juniper_device(device_id)
-        if not device:
+        entry = get_device_entry(device_id)
+        if not entry:
             return jsonify({'success': False, 'message': 'Device not found'})
+        device = entry.device
         
         interface_filter = request.args.get('interface', 'all')
-        password = get_juniper_device_password(device_id)
-        
         success, traffic_data = get_live_traffic_data(
             ip_address=device['ip_address'], 
             username=device['username'], 
-            password=password,
+            password=entry.password,
             gnmi_port=device['gnmi_port'],
             gnmi_use_ssl=device['gnmi_use_ssl'],
             gnmi_verify_ssl=device['gnmi_verify_ssl']
         )
         
         if success:
-            # Filter data jika interface spesifik dipilih
+            # Filter data jika interface spesifik dipilih (satu nama atau dipisah koma)
             if interface_filter != 'all':
-                filtered_traffic = {}
-                for iface, data in traffic_data.items():
-                    if interface_filter in iface:
-                        filtered_traffic[iface] = data
-                traffic_data = filtered_traffic
+                traffic_data = {
+                    iface: data
+                    for iface, data in traffic_data.items()
+                    if match_interface(iface, interface_filter)
+                }
             
             return jsonify({
                 'success': True,
@@ -787,3 +882,120 @@ def api_traffic_update(device_id):
         
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error: {str(e)}'})
+
+
+@juniper_bp.route('/api/traffic/<int:device_id>/health')
+@login_required
+def api_traffic_health(device_id):
+    """Status stream gNMI device: state, reconnect, error terakhir per RPC Subscribe"""
+    device = get_device(device_id)
+    if not device:
+        return jsonify({'success': False, 'message': 'Device not found'}), 404
+
+    success, health = get_traffic_health(
+        ip_address=device['ip_address'],
+        gnmi_port=device['gnmi_port'],
+        gnmi_use_ssl=device['gnmi_use_ssl'],
+    )
+    if not success:
+        return jsonify({'success': False, 'message': health}), 503
+    return jsonify({'success': True, 'health': health, 'timestamp': time.time()})
+
+
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@juniper_bp.route('/api/traffic/<int:device_id>/stream')
+@login_required
+def api_traffic_stream(device_id):
+    """Server-Sent Events: push interface yang berubah setiap notifikasi gNMI"""
+    if not Config.TRAFFIC_STREAM_ENABLED:
+        return jsonify({'success': False, 'message': 'Traffic stream dinonaktifkan'}), 404
+
+    device = get_device(device_id)
+    if not device:
+        return jsonify({'success': False, 'message': 'Device not found'}), 404
+
+    success, subscriber = subscribe_live_traffic(
+        ip_address=device['ip_address'],
+        interface_filter=request.args.get('interface', 'all'),
+        gnmi_port=device['gnmi_port'],
+        gnmi_use_ssl=device['gnmi_use_ssl'],
+    )
+    if not success:
+        return jsonify({'success': False, 'message': subscriber}), 503
+
+    def generate():
+        # Stream dibatasi umurnya agar thread worker gunicorn tidak tertahan selamanya;
+        # browser langsung membuka stream baru setelah event "reconnect".
+        deadline = time.monotonic() + Config.TRAFFIC_STREAM_MAX_SECONDS
+        try:
+            yield "retry: 3000\n\n"
+            yield _sse('snapshot', {'traffic': subscriber.snapshot(), 'timestamp': time.time()})
+            while subscriber.active:
+                if time.monotonic() >= deadline:
+                    yield _sse('reconnect', {})
+                    return
+                changed = subscriber.get(Config.TRAFFIC_STREAM_KEEPALIVE)
+                if changed:
+                    yield _sse('traffic', {
+                        'traffic': changed,
+                        'timestamp': time.time(),
+                        'dropped': subscriber.dropped,
+                    })
+                elif subscriber.active:
+                    yield ": keepalive\n\n"
+            yield _sse('end', {'message': 'Monitoring stopped'})
+        finally:
+            subscriber.close()
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@juniper_bp.route('/api/traffic/<int:device_id>/history')
+@login_required
+def api_traffic_history(device_id):
+    """API riwayat traffic (?from=&to=&step=&interface=), timestamp dalam epoch detik"""
+    try:
+        device = get_device(device_id)
+        if not device:
+            return jsonify({'success': False, 'message': 'Device not found'})
+
+        now = time.time()
+        try:
+            end = float(request.args.get('to') or now)
+            start = float(request.args.get('from') or end - 3600)
+            step = int(request.args.get('step') or 0)
+        except ValueError:
+            return jsonify({'success': False, 'message': 'Parameter from/to/step harus berupa angka'}), 400
+        if start >= end:
+            return jsonify({'success': False, 'message': 'Parameter from harus lebih kecil dari to'}), 400
+
+        # Batasi jumlah titik per interface agar response tetap kecil
+        min_step = -(-int(end - start) // max(Config.TRAFFIC_HISTORY_MAX_POINTS, 1))
+        step = max(step, min_step, 1)
+
+        success, history = get_traffic_history_data(
+            ip_address=device['ip_address'],
+            start=start,
+            end=end,
+            step=step,
+            interface_filter=request.args.get('interface', 'all'),
+            gnmi_port=device['gnmi_port'],
+            gnmi_use_ssl=device['gnmi_use_ssl'],
+        )
+        if not success:
+            return jsonify({'success': False, 'message': history})
+
+        return jsonify({
+            'success': True,
+            'from': start,
+            'to': end,
+            **history,
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'})
@@ -0,0 +1,106 @@
+import hashlib
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+
+from config import Config
+
+
+class _PooledSession:
+    """requests.Session milik satu device beserta waktu terakhir dipakai"""
+
+    __slots__ = ('session', 'host', 'last_used')
+
+    def __init__(self, session: requests.Session, host: str):
+        self.session = session
+        self.host = host
+        self.last_used = time.monotonic()
+
+
+# Registry process-wide: satu Session (dan connection pool) per device
+_sessions: Dict[tuple, _PooledSession] = {}
+_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def session_key(base_url: str, username: str, password: str, verify: bool) -> tuple:
+    """Key satu device/kredensial; dipakai juga untuk batcher RPC dan client httpx"""
+    # Password tidak disimpan di key, cukup fingerprint agar perubahan kredensial membuat session baru
+    fingerprint = hashlib.sha256(f"{username}\0{password}".encode()).hexdigest()[:16]
+    return (base_url, fingerprint, bool(verify))
+
+
+def _build_session(username: str, password: str, verify: bool) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=Config.API_POOL_MAXSIZE,
+        max_retries=0,
+        pool_block=False,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.auth = HTTPBasicAuth(username, password)
+    session.verify = verify
+    session.headers.update({
+        'Content-Type': 'application/xml',
+        'Accept': 'application/json',
+        'Connection': 'keep-alive',
+    })
+    return session
+
+
+def _sweep_idle(now: float):
+    """Tutup session yang tidak dipakai melewati API_SESSION_IDLE_TIMEOUT"""
+    global _last_sweep
+    idle_timeout = Config.API_SESSION_IDLE_TIMEOUT
+    if now - _last_sweep < min(idle_timeout, 30):
+        return
+    _last_sweep = now
+
+    expired = [key for key, entry in _sessions.items() if now - entry.last_used > idle_timeout]
+    for key in expired:
+        _sessions.pop(key).session.close()
+
+
+def get_device_session(
+    base_url: str,
+    host: str,
+    username: str,
+    password: str,
+    verify: bool = False,
+) -> requests.Session:
+    """Ambil (atau buat) Session keep-alive untuk device"""
+    key = session_key(base_url, username, password, verify)
+    now = time.monotonic()
+
+    with _lock:
+        _sweep_idle(now)
+        entry = _sessions.get(key)
+        if entry is None:
+            entry = _PooledSession(_build_session(username, password, verify), host)
+            _sessions[key] = entry
+        entry.last_used = now
+        return entry.session
+
+
+def close_device_sessions(host: Optional[str] = None) -> int:
+    """Tutup session untuk host tertentu (atau semua jika host None)"""
+    with _lock:
+        keys = [key for key, entry in _sessions.items() if host is None or entry.host == host]
+        for key in keys:
+            _sessions.pop(key).session.close()
+    return len(keys)
+
+
+def get_session_stats() -> Dict[str, int]:
+    """Ringkasan jumlah session aktif per host (untuk diagnostik)"""
+    with _lock:
+        stats: Dict[str, int] = {}
+        for entry in _sessions.values():
+            stats[entry.host] = stats.get(entry.host, 0) + 1
+        return stats
@@ -0,0 +1,130 @@
+"""Profil subscription gNMI untuk counter interface.
+
+Profil menentukan mode Subscribe per path (SAMPLE, ON_CHANGE, TARGET_DEFINED),
+``suppress_redundant`` dan heartbeat. Dengan ``suppress_redundant`` router hanya
+mengirim leaf yang berubah; heartbeat memastikan interface idle tetap dikirim
+ulang sesekali. Counter subinterface hanya disubscribe jika diminta.
+
+Interface yang dipilih disubscribe dengan path ber-key (satu path per
+interface), sehingga filter terjadi di router, bukan setelah data diterima.
+"""
+from typing import FrozenSet, Iterable, List, Optional, Union
+
+from config import Config
+
+try:
+    from .gnmi.gnmi_pb2 import Path, Subscription, SubscriptionMode
+except ImportError:  # pragma: no cover - guarded by JuniperGNMIClient.connect
+    Path = Subscription = SubscriptionMode = None
+
+SUBSCRIPTION_PROFILES = {
+    # Perilaku lama: sampel penuh setiap interval
+    'sample': {'mode': 'SAMPLE', 'suppress_redundant': False, 'heartbeat': False},
+    # Sampel hanya untuk leaf yang berubah, heartbeat untuk interface idle
+    'suppress': {'mode': 'SAMPLE', 'suppress_redundant': True, 'heartbeat': True},
+    'on_change': {'mode': 'ON_CHANGE', 'suppress_redundant': False, 'heartbeat': True},
+    # Router memilih SAMPLE/ON_CHANGE per leaf
+    'target_defined': {'mode': 'TARGET_DEFINED', 'suppress_redundant': False, 'heartbeat': False},
+}
+
+INTERFACE_COUNTERS = ('state', 'counters')
+SUBINTERFACE_COUNTERS = ('subinterfaces', 'subinterface', 'state', 'counters')
+
+
+def get_profile(name: str) -> dict:
+    profile = SUBSCRIPTION_PROFILES.get(name)
+    if profile is None:
+        raise ValueError(
+            f"Profil subscription tidak dikenal: {name} "
+            f"(pilihan: {', '.join(SUBSCRIPTION_PROFILES)})"
+        )
+    return profile
+
+
+def profile_skips_idle(name: str) -> bool:
+    """True jika profil tidak mengirim ulang counter yang tidak berubah setiap interval"""
+    profile = get_profile(name)
+    return profile['suppress_redundant'] or profile['mode'] == 'ON_CHANGE'
+
+
+def normalize_interfaces(value: Union[None, str, Iterable[str]]) -> Optional[FrozenSet[str]]:
+    """Pilihan interface sebagai frozenset nama; None berarti semua interface.
+
+    Menerima None/'all', satu nama, nama dipisah koma, atau list nama.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    names = frozenset(name.strip() for name in value if name and name.strip())
+    if not names or 'all' in names:
+        return None
+    return names
+
+
+def match_interface(iface: str, interface_filter: Union[None, str, FrozenSet[str]]) -> bool:
+    """Cocokkan interface dengan filter viewer.
+
+    Filter string lama (satu nama) tetap dicocokkan sebagai substring; set nama
+    cocok dengan nama tersebut dan subinterface-nya.
+    """
+    if not interface_filter or interface_filter == 'all':
+        return True
+    if isinstance(interface_filter, str):
+        if ',' not in interface_filter:
+            return interface_filter in iface
+        interface_filter = normalize_interfaces(interface_filter)
+    return iface in interface_filter or iface.split('.', 1)[0] in interface_filter
+
+
+def _interface_path(interface_name: Optional[str], leaf: Iterable[str]):
+    path = Path()
+    path.elem.add(name='interfaces')
+    elem = path.elem.add(name='interface')
+    unit = None
+    if interface_name:
+        # Nama unit Junos (ge-0/0/0.100) dipetakan ke subinterface[index] OpenConfig
+        interface_name, _, unit = interface_name.partition('.')
+        elem.key['name'] = interface_name
+    if unit:
+        path.elem.add(name='subinterfaces')
+        path.elem.add(name='subinterface').key['index'] = unit
+        leaf = INTERFACE_COUNTERS
+    for name in leaf:
+        path.elem.add(name=name)
+    return path
+
+
+def _subscription(path, profile: dict, interval_ns: int):
+    subscription = Subscription(path=path, mode=SubscriptionMode.Value(profile['mode']))
+    if profile['mode'] == 'SAMPLE':
+        subscription.sample_interval = interval_ns
+        subscription.suppress_redundant = profile['suppress_redundant']
+    if profile['heartbeat'] and Config.GNMI_HEARTBEAT_SECONDS > 0:
+        subscription.heartbeat_interval = max(Config.GNMI_HEARTBEAT_SECONDS * 1_000_000_000, interval_ns)
+    return subscription
+
+
+def build_subscriptions(
+    interface_names: List[Optional[str]],
+    sample_interval_ms: int,
+    include_subinterfaces: bool = False,
+    profile: Optional[str] = None,
+    subinterface_profile: Optional[str] = None,
+) -> list:
+    """Daftar Subscription untuk counter interface (dan opsional subinterface).
+
+    ``interface_names`` berisi nama interface (atau unit, mis. ``ge-0/0/0.100``);
+    ``None`` berarti semua interface.
+    """
+    interval_ns = max(sample_interval_ms, 1000) * 1_000_000
+    interface_profile = get_profile(profile or Config.GNMI_SUBSCRIPTION_PROFILE)
+    sub_profile = get_profile(subinterface_profile or Config.GNMI_SUBINTERFACE_PROFILE)
+    sub_interval_ns = interval_ns * max(Config.GNMI_SUBINTERFACE_INTERVAL_FACTOR, 1)
+
+    subscriptions = []
+    for name in interface_names:
+        subscriptions.append(_subscription(_interface_path(name, INTERFACE_COUNTERS), interface_profile, interval_ns))
+        if include_subinterfaces and not (name and '.' in name):
+            subscriptions.append(_subscription(_interface_path(name, SUBINTERFACE_COUNTERS), sub_profile, sub_interval_ns))
+    return subscriptions
@@ -0,0 +1,296 @@
+"""Backend telemetry gNMI: in-process atau lewat telemetry broker.
+
+Tanpa ``TELEMETRY_BROKER_ADDRESS`` semua stream Subscribe hidup di proses web
+(hanya aman dengan satu worker gunicorn). Jika alamat broker diisi, worker web
+hanya menjadi pembaca: start/stop/data/riwayat/stream diteruskan ke proses
+broker (``src/cli/telemetry_broker.py``) lewat Unix socket, sehingga satu
+device tetap hanya punya satu stream gNMI berapa pun jumlah worker dan viewer.
+"""
+import logging
+import os
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+# Implementasi lokal (dipakai langsung atau oleh broker) ----------------------
+
+def _local_start(key, ip_address, port, username, password, interface_filter=None,
+                 sample_interval_ms=None, use_tls=False, viewer=None, include_subinterfaces=None):
+    from src.juniper.gnmi_client import start_gnmi_monitoring
+    return start_gnmi_monitoring(
+        key, ip_address, port, username, password,
+        interface_filter, sample_interval_ms, use_tls, viewer=viewer,
+        include_subinterfaces=include_subinterfaces,
+    )
+
+
+def _local_stop(key, viewer=None):
+    from src.juniper.gnmi_client import stop_gnmi_monitoring
+    return stop_gnmi_monitoring(key, viewer)
+
+
+def _local_subscriptions(key, viewer=None, add=(), remove=()):
+    from src.juniper.gnmi_client import update_gnmi_subscription
+    return update_gnmi_subscription(key, viewer, add, remove)
+
+
+def _local_traffic(key):
+    from src.juniper.gnmi_client import get_gnmi_traffic_data
+    return get_gnmi_traffic_data(key)
+
+
+def _local_health(key):
+    from src.juniper.gnmi_client import get_gnmi_health
+    return get_gnmi_health(key)
+
+
+def _local_history(key, start, end, step, interface_filter=None):
+    from src.juniper.history import get_traffic_history
+    history = get_traffic_history(key)
+    if history is None:
+        return False, "Riwayat traffic dinonaktifkan (TRAFFIC_HISTORY_ENABLED=false)"
+    return True, history.query(start, end, step, interface_filter)
+
+
+def _local_subscribe(key, interface_filter=None):
+    from src.juniper.gnmi_client import subscribe_gnmi_traffic
+    return subscribe_gnmi_traffic(key, interface_filter, Config.TRAFFIC_STREAM_MAX_CLIENTS)
+
+
+_LOCAL_OPS = {
+    'start': _local_start,
+    'stop': _local_stop,
+    'subscriptions': _local_subscriptions,
+    'traffic': _local_traffic,
+    'health': _local_health,
+    'history': _local_history,
+}
+
+
+# Client broker ------------------------------------------------------------------
+
+class BrokerUnavailable(Exception):
+    pass
+
+
+def _authkey() -> bytes:
+    return (Config.TELEMETRY_BROKER_AUTHKEY or Config.SECRET_KEY).encode()
+
+
+def _connect():
+    try:
+        return Client(Config.TELEMETRY_BROKER_ADDRESS, family='AF_UNIX', authkey=_authkey())
+    except (OSError, EOFError, AuthenticationError) as exc:
+        raise BrokerUnavailable(f"Telemetry broker tidak dapat dihubungi: {exc}") from exc
+
+
+def _remote_call(op, **kwargs):
+    conn = _connect()
+    try:
+        conn.send((op, kwargs))
+        ok, result = conn.recv()
+    except (OSError, EOFError) as exc:
+        raise BrokerUnavailable(f"Koneksi ke telemetry broker terputus: {exc}") from exc
+    finally:
+        conn.close()
+    if not ok:
+        raise BrokerUnavailable(result)
+    return result
+
+
+class RemoteSubscriber:
+    """Subscriber SSE yang membaca update dari broker (antarmuka sama dengan TrafficSubscriber)"""
+
+    def __init__(self, conn, snapshot: Dict[str, Dict]):
+        self._conn = conn
+        self._snapshot = snapshot
+        self._closed = False
+        self.dropped = 0
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return self._snapshot
+
+    def get(self, timeout: float) -> Dict[str, Dict]:
+        if self._closed:
+            return {}
+        try:
+            if not self._conn.poll(timeout):
+                return {}
+            message = self._conn.recv()
+        except (OSError, EOFError):
+            self.close()
+            return {}
+        if message[0] == 'traffic':
+            self.dropped = message[2]
+            return message[1]
+        if message[0] == 'end':
+            self.close()
+        return {}
+
+    @property
+    def active(self) -> bool:
+        return not self._closed
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._conn.close()
+
+
+# API backend (dipakai src/juniper/api.py) --------------------------------------
+
+def broker_enabled() -> bool:
+    return bool(Config.TELEMETRY_BROKER_ADDRESS)
+
+
+def _dispatch(op, **kwargs):
+    if not broker_enabled():
+        return _LOCAL_OPS[op](**kwargs)
+    return _remote_call(op, **kwargs)
+
+
+def start_monitoring(key, ip_address, port, username, password, interface_filter=None,
+                     sample_interval_ms=None, use_tls=False, viewer=None,
+                     include_subinterfaces=None) -> tuple[bool, str]:
+    try:
+        return _dispatch(
+            'start', key=key, ip_address=ip_address, port=port, username=username,
+            password=password, interface_filter=interface_filter,
+            sample_interval_ms=sample_interval_ms, use_tls=use_tls, viewer=viewer,
+            include_subinterfaces=include_subinterfaces,
+        )
+    except BrokerUnavailable as exc:
+        return False, str(exc)
+
+
+def stop_monitoring(key, viewer=None) -> tuple[bool, str]:
+    try:
+        return _dispatch('stop', key=key, viewer=viewer)
+    except BrokerUnavailable as exc:
+        return False, str(exc)
+
+
+def update_subscriptions(key, viewer=None, add=(), remove=()) -> tuple[bool, object]:
+    try:
+        return _dispatch('subscriptions', key=key, viewer=viewer, add=list(add), remove=list(remove))
+    except BrokerUnavailable as exc:
+        return False, str(exc)
+
+
+def get_traffic(key) -> Dict:
+    return _dispatch('traffic', key=key)
+
+
+def get_health(key) -> Dict:
+    return _dispatch('health', key=key)
+
+
+def query_history(key, start, end, step, interface_filter=None):
+    try:
+        return _dispatch('history', key=key, start=start, end=end, step=step, interface_filter=interface_filter)
+    except BrokerUnavailable as exc:
+        return False, str(exc)
+
+
+def subscribe(key, interface_filter=None):
+    """Subscriber push untuk SSE: (subscriber, pesan); subscriber None jika gagal"""
+    if not broker_enabled():
+        return _local_subscribe(key, interface_filter)
+    try:
+        conn = _connect()
+    except BrokerUnavailable as exc:
+        return None, str(exc)
+    try:
+        conn.send(('subscribe', {'key': key, 'interface_filter': interface_filter}))
+        ok, result = conn.recv()
+    except (OSError, EOFError) as exc:
+        conn.close()
+        return None, f"Koneksi ke telemetry broker terputus: {exc}"
+    if not ok:
+        conn.close()
+        return None, result
+    return RemoteSubscriber(conn, result), "subscribed"
+
+
+# Server broker ------------------------------------------------------------------
+
+class TelemetryBroker:
+    """Proses pemilik semua stream gNMI; melayani worker web lewat Unix socket"""
+
+    def __init__(self, address: Optional[str] = None):
+        self.address = address or Config.TELEMETRY_BROKER_ADDRESS
+        self._listener: Optional[Listener] = None
+        self._stop = threading.Event()
+
+    def serve_forever(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.address)), exist_ok=True)
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._listener = Listener(self.address, family='AF_UNIX', authkey=_authkey())
+        os.chmod(self.address, 0o600)
+        logger.info("Telemetry broker listening on %s", self.address)
+
+        while not self._stop.is_set():
+            try:
+                conn = self._listener.accept()
+            except Exception as exc:
+                if self._stop.is_set():
+                    break
+                # Handshake authkey gagal atau client putus saat accept
+                logger.warning("Broker accept gagal: %s", exc)
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.close()
+        from src.juniper.gnmi_client import _gnmi_clients, stop_gnmi_monitoring
+        for key in list(_gnmi_clients):
+            stop_gnmi_monitoring(key)
+
+    def _handle(self, conn):
+        try:
+            op, kwargs = conn.recv()
+            if op == 'subscribe':
+                self._stream(conn, **kwargs)
+                return
+            handler = _LOCAL_OPS.get(op)
+            if handler is None:
+                conn.send((False, f"Operasi broker tidak dikenal: {op}"))
+                return
+            conn.send((True, handler(**kwargs)))
+        except (OSError, EOFError):
+            pass
+        except Exception as exc:
+            logger.error("Broker request gagal", exc_info=True)
+            try:
+                conn.send((False, f"Telemetry broker error: {exc}"))
+            except (OSError, EOFError):
+                pass
+        finally:
+            conn.close()
+
+    def _stream(self, conn, key, interface_filter=None):
+        subscriber, message = _local_subscribe(key, interface_filter)
+        if subscriber is None:
+            conn.send((False, message))
+            return
+        try:
+            conn.send((True, subscriber.snapshot()))
+            # Keepalive rutin juga mendeteksi worker web yang sudah menutup koneksi
+            while subscriber.active:
+                changed = subscriber.get(Config.TRAFFIC_STREAM_KEEPALIVE)
+                if changed:
+                    conn.send(('traffic', changed, subscriber.dropped))
+                elif subscriber.active:
+                    conn.send(('keepalive',))
+            conn.send(('end',))
+        finally:
+            subscriber.close()
@@ -1,13 +1,43 @@
 import sqlite3
 from config import Config
-from src.utils.database import get_db_connection
+from src.utils.database import db_connection
 from src.utils.encryption import crypto
+from src.utils.log import get_logger
+
+logger = get_logger('models')
+
+# Callback yang dipanggil setiap kali baris device berubah (create/update/delete)
+_device_change_listeners = []
 
 def _bool_to_int(value):
     if isinstance(value, str):
         value = value.lower() in {'1', 'true', 'yes', 'on'}
     return 1 if value else 0
 
+def on_device_change(callback):
+    """Daftarkan callback(device_id, ip_addresses) saat data device berubah (create/update/delete).
+
+    ``ip_addresses`` berisi IP lama dan baru (tanpa duplikat); callback dipanggil
+    sekali per perubahan, termasuk saat IP device diganti.
+    """
+    _device_change_listeners.append(callback)
+    return callback
+
+def _bump_devices_version(conn):
+    """Naikkan versi data device (dalam transaksi yang sama dengan perubahannya)"""
+    conn.execute("UPDATE app_meta SET value = value + 1 WHERE key = 'devices_version'")
+
+def _notify_device_change(device_id, *ip_addresses):
+    ip_addresses = tuple(dict.fromkeys(ip for ip in ip_addresses if ip))
+    for callback in list(_device_change_listeners):
+        try:
+            callback(device_id, ip_addresses)
+        except Exception:
+            logger.exception(
+                "Listener perubahan device %s.%s gagal (device %s)",
+                callback.__module__, getattr(callback, '__qualname__', callback), device_id
+            )
+
 def create_juniper_device(
     name,
     ip_address,
@@ -22,8 +52,6 @@ def create_juniper_device(
     gnmi_verify_ssl=None
 ):
     """Membuat device Juniper baru dengan password terenkripsi"""
-    conn = get_db_connection()
-    
     try:
         encrypted_password = crypto.encrypt(password)
 
@@ -34,39 +62,37 @@ def create_juniper_device(
         gnmi_use_ssl = _bool_to_int(gnmi_use_ssl if gnmi_use_ssl is not None else Config.GNMI_DEFAULT_USE_SSL)
         gnmi_verify_ssl = _bool_to_int(gnmi_verify_ssl if gnmi_verify_ssl is not None else Config.GNMI_DEFAULT_VERIFY_SSL)
 
-        conn.execute('''
-            INSERT INTO juniper_devices 
-            (name, ip_address, api_port, username, password, description, api_use_ssl, api_verify_ssl, gnmi_port, gnmi_use_ssl, gnmi_verify_ssl) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (name, ip_address, api_port, username, encrypted_password, description, api_use_ssl, api_verify_ssl, gnmi_port, gnmi_use_ssl, gnmi_verify_ssl))
-        
-        conn.commit()
+        with db_connection() as conn:
+            cursor = conn.execute('''
+                INSERT INTO juniper_devices 
+                (name, ip_address, api_port, username, password, description, api_use_ssl, api_verify_ssl, gnmi_port, gnmi_use_ssl, gnmi_verify_ssl) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (name, ip_address, api_port, username, encrypted_password, description, api_use_ssl, api_verify_ssl, gnmi_port, gnmi_use_ssl, gnmi_verify_ssl))
+            _bump_devices_version(conn)
+            conn.commit()
+        _notify_device_change(cursor.lastrowid, ip_address)
         return True, "Device berhasil ditambahkan"
     except sqlite3.IntegrityError:
         return False, "Nama device sudah digunakan"
     except Exception as e:
         return False, f"Error: {str(e)}"
-    finally:
-        conn.close()
 
 def get_all_juniper_devices():
     """Mendapatkan semua devices Juniper"""
-    conn = get_db_connection()
-    devices = conn.execute('''
-        SELECT id, name, ip_address, api_port, username, description, created_at, api_use_ssl, api_verify_ssl, gnmi_port, gnmi_use_ssl, gnmi_verify_ssl
-        FROM juniper_devices 
-        ORDER BY name
-    ''').fetchall()
-    conn.close()
+    with db_connection() as conn:
+        devices = conn.execute('''
+            SELECT id, name, ip_address, api_port, username, description, created_at, api_use_ssl, api_verify_ssl, gnmi_port, gnmi_use_ssl, gnmi_verify_ssl
+            FROM juniper_devices 
+            ORDER BY name
+        ''').fetchall()
     return [dict(device) for device in devices]
 
 def get_juniper_device(device_id):
     """Mendapatkan device Juniper berdasarkan ID"""
-    conn = get_db_connection()
-    device = conn.execute('''
-        SELECT * FROM juniper_devices WHERE id = ?
-    ''', (device_id,)).fetchone()
-    conn.close()
+    with db_connection() as conn:
+        device = conn.execute('''
+            SELECT * FROM juniper_devices WHERE id = ?
+        ''', (device_id,)).fetchone()
     
     if device:
         return dict(device)
@@ -74,11 +100,10 @@ def get_juniper_device(device_id):
 
 def get_juniper_device_password(device_id):
     """Mendapatkan dan decrypt password device"""
-    conn = get_db_connection()
-    device = conn.execute('''
-        SELECT password FROM juniper_devices WHERE id = ?
-    ''', (device_id,)).fetchone()
-    conn.close()
+    with db_connection() as conn:
+        device = conn.execute('''
+            SELECT password FROM juniper_devices WHERE id = ?
+        ''', (device_id,)).fetchone()
     
     if device:
         decrypted_password = crypto.decrypt(device['password'])
@@ -101,8 +126,6 @@ def update_juniper_device(
     gnmi_verify_ssl=None
 ):
     """Update device Juniper"""
-    conn = get_db_connection()
-    
     try:
         encrypted_password = crypto.encrypt(password)
 
@@ -113,37 +136,53 @@ def update_juniper_device(
         gnmi_use_ssl = _bool_to_int(gnmi_use_ssl if gnmi_use_ssl is not None else Config.GNMI_DEFAULT_USE_SSL)
         gnmi_verify_ssl = _bool_to_int(gnmi_verify_ssl if gnmi_verify_ssl is not None else Config.GNMI_DEFAULT_VERIFY_SSL)
 
-        conn.execute('''
-            UPDATE juniper_devices 
-            SET name=?, ip_address=?, api_port=?, username=?, password=?, description=?, api_use_ssl=?, api_verify_ssl=?, gnmi_port=?, gnmi_use_ssl=?, gnmi_verify_ssl=?, updated_at=CURRENT_TIMESTAMP
-            WHERE id=?
-        ''', (name, ip_address, api_port, username, encrypted_password, description, api_use_ssl, api_verify_ssl, gnmi_port, gnmi_use_ssl, gnmi_verify_ssl, device_id))
-        
-        conn.commit()
+        with db_connection() as conn:
+            previous = conn.execute('SELECT ip_address FROM juniper_devices WHERE id=?', (device_id,)).fetchone()
+
+            conn.execute('''
+                UPDATE juniper_devices 
+                SET name=?, ip_address=?, api_port=?, username=?, password=?, description=?, api_use_ssl=?, api_verify_ssl=?, gnmi_port=?, gnmi_use_ssl=?, gnmi_verify_ssl=?, updated_at=CURRENT_TIMESTAMP
+                WHERE id=?
+            ''', (name, ip_address, api_port, username, encrypted_password, description, api_use_ssl, api_verify_ssl, gnmi_port, gnmi_use_ssl, gnmi_verify_ssl, device_id))
+            _bump_devices_version(conn)
+            conn.commit()
+
+        _notify_device_change(device_id, previous['ip_address'] if previous else None, ip_address)
         return True, "Device berhasil diupdate"
     except sqlite3.IntegrityError:
         return False, "Nama device sudah digunakan"
     except Exception as e:
         return False, f"Error: {str(e)}"
-    finally:
-        conn.close()
 
 def delete_juniper_device(device_id):
     """HARD DELETE - Hapus permanent dari database"""
-    conn = get_db_connection()
-    
     try:
-        conn.execute('DELETE FROM juniper_devices WHERE id=?', (device_id,))
-        conn.commit()
+        with db_connection() as conn:
+            previous = conn.execute('SELECT ip_address FROM juniper_devices WHERE id=?', (device_id,)).fetchone()
+            conn.execute('DELETE FROM juniper_devices WHERE id=?', (device_id,))
+            _bump_devices_version(conn)
+            conn.commit()
+        _notify_device_change(device_id, previous['ip_address'] if previous else None)
         return True, "Device berhasil dihapus permanent"
     except Exception as e:
         return False, f"Error: {str(e)}"
-    finally:
-        conn.close()
 
 def get_juniper_devices_count():
     """Mendapatkan jumlah devices"""
-    conn = get_db_connection()
-    count = conn.execute('SELECT COUNT(*) as count FROM juniper_devices').fetchone()
-    conn.close()
+    with db_connection() as conn:
+        count = conn.execute('SELECT COUNT(*) as count FROM juniper_devices').fetchone()
     return count['count'] if count else 0
+
+def get_devices_version():
+    """Versi data device saat ini (naik setiap create/update/delete)"""
+    with db_connection() as conn:
+        row = conn.execute("SELECT value FROM app_meta WHERE key = 'devices_version'").fetchone()
+    return row['value'] if row else 0
+
+def load_devices_with_version():
+    """Semua baris device (termasuk password terenkripsi) beserta versinya dari snapshot baca yang sama"""
+    with db_connection() as conn:
+        conn.execute('BEGIN')
+        row = conn.execute("SELECT value FROM app_meta WHERE key = 'devices_version'").fetchone()
+        devices = conn.execute('SELECT * FROM juniper_devices ORDER BY name').fetchall()
+    return (row['value'] if row else 0), [dict(device) for device in devices]
@@ -0,0 +1,78 @@
+import json
+import time
+from src.utils.database import db_connection
+
+def save_device_snapshot(device_id, kind, success, data, duration_ms=None, peers_down=None):
+    """Simpan hasil polling collector.
+
+    Jika polling gagal, payload terakhir yang berhasil tetap disimpan dan
+    hanya kolom error/attempted_at yang diperbarui. ``peers_down`` adalah
+    counter ringkas (BGP peer down) untuk statistik dashboard.
+    """
+    now = time.time()
+    with db_connection() as conn:
+        if success:
+            conn.execute('''
+                INSERT INTO device_snapshots (device_id, kind, payload, collected_at, attempted_at, duration_ms, error, peers_down)
+                VALUES (?, ?, ?, ?, ?, ?, NULL, ?)
+                ON CONFLICT(device_id, kind) DO UPDATE SET
+                    payload=excluded.payload,
+                    collected_at=excluded.collected_at,
+                    attempted_at=excluded.attempted_at,
+                    duration_ms=excluded.duration_ms,
+                    error=NULL,
+                    peers_down=excluded.peers_down
+            ''', (device_id, kind, json.dumps(data), now, now, duration_ms, peers_down))
+        else:
+            conn.execute('''
+                INSERT INTO device_snapshots (device_id, kind, attempted_at, duration_ms, error)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(device_id, kind) DO UPDATE SET
+                    attempted_at=excluded.attempted_at,
+                    duration_ms=excluded.duration_ms,
+                    error=excluded.error
+            ''', (device_id, kind, now, duration_ms, str(data)))
+        conn.commit()
+
+def _row_to_snapshot(row, now):
+    collected_at = row['collected_at']
+    return {
+        'device_id': row['device_id'],
+        'kind': row['kind'],
+        'data': json.loads(row['payload']) if row['payload'] is not None else None,
+        'collected_at': collected_at,
+        'attempted_at': row['attempted_at'],
+        'age': (now - collected_at) if collected_at is not None else None,
+        'duration_ms': row['duration_ms'],
+        'error': row['error']
+    }
+
+def get_device_snapshot(device_id, kind):
+    """Snapshot terakhir untuk satu device dan jenis data, atau None"""
+    with db_connection() as conn:
+        row = conn.execute('''
+            SELECT * FROM device_snapshots WHERE device_id = ? AND kind = ?
+        ''', (device_id, kind)).fetchone()
+    return _row_to_snapshot(row, time.time()) if row else None
+
+def get_all_device_snapshots(kind=None):
+    """Semua snapshot (opsional difilter per jenis data)"""
+    with db_connection() as conn:
+        if kind:
+            rows = conn.execute('SELECT * FROM device_snapshots WHERE kind = ?', (kind,)).fetchall()
+        else:
+            rows = conn.execute('SELECT * FROM device_snapshots').fetchall()
+    now = time.time()
+    return [_row_to_snapshot(row, now) for row in rows]
+
+def delete_device_snapshots(device_id):
+    """Hapus semua snapshot milik device (mis. setelah device diubah/dihapus)"""
+    with db_connection() as conn:
+        conn.execute('DELETE FROM device_snapshots WHERE device_id = ?', (device_id,))
+        conn.commit()
+
+def prune_device_snapshots():
+    """Hapus snapshot milik device yang sudah tidak ada"""
+    with db_connection() as conn:
+        conn.execute('DELETE FROM device_snapshots WHERE device_id NOT IN (SELECT id FROM juniper_devices)')
+        conn.commit()
@@ -0,0 +1,56 @@
+from src.utils.database import db_connection
+
+def save_traffic_rollups(rows):
+    """Simpan bucket rollup; bucket yang sudah ada digabung (mis. setelah restart)
+
+    Setiap row: (device_key, interface, bucket, samples, in_rate_sum, in_rate_max,
+    out_rate_sum, out_rate_max, in_pps_sum, out_pps_sum)
+    """
+    if not rows:
+        return
+    with db_connection() as conn:
+        conn.executemany('''
+            INSERT INTO traffic_rollups
+            (device_key, interface, bucket, samples, in_rate_sum, in_rate_max, out_rate_sum, out_rate_max, in_pps_sum, out_pps_sum)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(device_key, interface, bucket) DO UPDATE SET
+                samples = samples + excluded.samples,
+                in_rate_sum = in_rate_sum + excluded.in_rate_sum,
+                in_rate_max = MAX(in_rate_max, excluded.in_rate_max),
+                out_rate_sum = out_rate_sum + excluded.out_rate_sum,
+                out_rate_max = MAX(out_rate_max, excluded.out_rate_max),
+                in_pps_sum = in_pps_sum + excluded.in_pps_sum,
+                out_pps_sum = out_pps_sum + excluded.out_pps_sum
+        ''', rows)
+        conn.commit()
+
+def get_traffic_rollups(device_key, start, end, step):
+    """Rollup per interface yang dikelompokkan ulang ke resolusi ``step`` detik.
+
+    Nilai dikembalikan sebagai jumlah (bukan rata-rata) beserta jumlah sampel
+    agar caller bisa menggabungkannya dengan bucket yang belum tersimpan.
+    """
+    step = max(int(step), 1)
+    with db_connection() as conn:
+        rows = conn.execute('''
+            SELECT interface,
+                   (bucket / ?) * ? AS t,
+                   SUM(samples) AS samples,
+                   SUM(in_rate_sum) AS in_rate_sum,
+                   MAX(in_rate_max) AS in_rate_max,
+                   SUM(out_rate_sum) AS out_rate_sum,
+                   MAX(out_rate_max) AS out_rate_max,
+                   SUM(in_pps_sum) AS in_pps_sum,
+                   SUM(out_pps_sum) AS out_pps_sum
+            FROM traffic_rollups
+            WHERE device_key = ? AND bucket >= ? AND bucket <= ?
+            GROUP BY interface, t
+            ORDER BY interface, t
+        ''', (step, step, device_key, int(start), int(end))).fetchall()
+    return [dict(row) for row in rows]
+
+def prune_traffic_rollups(before):
+    """Hapus bucket yang lebih tua dari timestamp ``before``"""
+    with db_connection() as conn:
+        conn.execute('DELETE FROM traffic_rollups WHERE bucket < ?', (int(before),))
+        conn.commit()
@@ -1,8 +1,29 @@
 import sqlite3
-from src.utils.database import get_db_connection
+from src.utils.database import db_connection
 from src.utils.validators import is_username_valid, is_password_strong
+from src.utils.log import get_logger
 from werkzeug.security import generate_password_hash, check_password_hash
 
+logger = get_logger('models')
+
+# Callback yang dipanggil setiap kali jumlah/status user berubah (create/delete)
+_user_change_listeners = []
+
+def on_user_change(callback):
+    """Daftarkan callback(user_id) saat user dibuat atau dihapus"""
+    _user_change_listeners.append(callback)
+    return callback
+
+def _notify_user_change(user_id):
+    for callback in list(_user_change_listeners):
+        try:
+            callback(user_id)
+        except Exception:
+            logger.exception(
+                "Listener perubahan user %s.%s gagal (user %s)",
+                callback.__module__, getattr(callback, '__qualname__', callback), user_id
+            )
+
 def create_user(username, password, email=None):
     """Membuat user baru dengan validasi"""
     # Validasi input
@@ -14,35 +35,33 @@ def create_user(username, password, email=None):
     if not password_strong:
         return False, password_msg
     
-    conn = get_db_connection()
-    
     try:
         password_hash = generate_password_hash(password)
-        conn.execute(
-            'INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)',
-            (username, password_hash, email)
-        )
-        conn.commit()
+        with db_connection() as conn:
+            cursor = conn.execute(
+                'INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)',
+                (username, password_hash, email)
+            )
+            conn.commit()
+        _notify_user_change(cursor.lastrowid)
         return True, "User berhasil dibuat"
     except sqlite3.IntegrityError:
         return False, "Username sudah digunakan"
     except Exception as e:
         return False, f"Error: {str(e)}"
-    finally:
-        conn.close()
 
 def verify_user(username, password):
     """Verifikasi username dan password untuk login"""
-    conn = get_db_connection()
-    
-    user = conn.execute(
-        'SELECT * FROM users WHERE username = ? AND is_active = 1', 
-        (username,)
-    ).fetchone()
-    
-    if user:
+    with db_connection() as conn:
+        user = conn.execute(
+            'SELECT * FROM users WHERE username = ? AND is_active = 1', 
+            (username,)
+        ).fetchone()
+        
+        if not user:
+            return None, "User tidak ditemukan"
+
         if user['failed_login_attempts'] >= 5:
-            conn.close()
             return None, "Akun terkunci. Terlalu banyak percobaan gagal."
         
         if check_password_hash(user['password_hash'], password):
@@ -52,34 +71,27 @@ def verify_user(username, password):
                 (user['id'],)
             )
             conn.commit()
-            user_data = {
+            return {
                 'id': user['id'],
                 'username': user['username'],
                 'email': user['email']
-            }
-            conn.close()
-            return user_data, None
-        else:
-            # Increment failed attempts
-            conn.execute(
-                'UPDATE users SET failed_login_attempts = failed_login_attempts + 1 WHERE id = ?',
-                (user['id'],)
-            )
-            conn.commit()
-            conn.close()
-            return None, "Username atau password salah"
-    
-    conn.close()
-    return None, "User tidak ditemukan"
+            }, None
+
+        # Increment failed attempts
+        conn.execute(
+            'UPDATE users SET failed_login_attempts = failed_login_attempts + 1 WHERE id = ?',
+            (user['id'],)
+        )
+        conn.commit()
+        return None, "Username atau password salah"
 
 def get_user_by_id(user_id):
     """Mendapatkan user berdasarkan ID"""
-    conn = get_db_connection()
-    user = conn.execute(
-        'SELECT id, username, email FROM users WHERE id = ? AND is_active = 1', 
-        (user_id,)
-    ).fetchone()
-    conn.close()
+    with db_connection() as conn:
+        user = conn.execute(
+            'SELECT id, username, email FROM users WHERE id = ? AND is_active = 1', 
+            (user_id,)
+        ).fetchone()
     
     if user:
         return {
@@ -91,11 +103,10 @@ def get_user_by_id(user_id):
 
 def get_all_users():
     """Mendapatkan semua user (untuk admin)"""
-    conn = get_db_connection()
-    users = conn.execute(
-        'SELECT id, username, email, created_at, last_login FROM users WHERE is_active = 1'
-    ).fetchall()
-    conn.close()
+    with db_connection() as conn:
+        users = conn.execute(
+            'SELECT id, username, email, created_at, last_login FROM users WHERE is_active = 1'
+        ).fetchall()
     return [dict(user) for user in users]
 
 def update_user_password(user_id, new_password):
@@ -104,30 +115,25 @@ def update_user_password(user_id, new_password):
     if not password_strong:
         return False, password_msg
     
-    conn = get_db_connection()
-    
     try:
         password_hash = generate_password_hash(new_password)
-        conn.execute(
-            'UPDATE users SET password_hash = ? WHERE id = ?',
-            (password_hash, user_id)
-        )
-        conn.commit()
+        with db_connection() as conn:
+            conn.execute(
+                'UPDATE users SET password_hash = ? WHERE id = ?',
+                (password_hash, user_id)
+            )
+            conn.commit()
         return True, "Password berhasil diupdate"
     except Exception as e:
         return False, f"Error: {str(e)}"
-    finally:
-        conn.close()
 
 def delete_user(user_id):
     """Soft delete user"""
-    conn = get_db_connection()
-    
     try:
-        conn.execute('UPDATE users SET is_active = 0 WHERE id = ?', (user_id,))
-        conn.commit()
+        with db_connection() as conn:
+            conn.execute('UPDATE users SET is_active = 0 WHERE id = ?', (user_id,))
+            conn.commit()
+        _notify_user_change(user_id)
         return True, "User berhasil dihapus"
     except Exception as e:
-        return False, f"Error: {str(e)}"
-    finally:
-        conn.close()
\ No newline at end of file
+        return False, f"Error: {str(e)}"
\ No newline at end of file
@@ -1,17 +1,185 @@
+import atexit
 import sqlite3
 import os
 import datetime
-import shutil
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from config import Config
+from src.utils import metrics
+
+_STATEMENTS = frozenset(('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'ALTER', 'PRAGMA', 'WITH'))
+
+
+def _statement_label(sql):
+    verb = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+    return verb if verb in _STATEMENTS else 'OTHER'
+
+
+class PooledConnection(sqlite3.Connection):
+    """Koneksi milik satu thread yang dipakai ulang antar query (lihat db_connection)"""
+
+
+class InstrumentedConnection(PooledConnection):
+    """Koneksi SQLite yang mencatat durasi statement ke metrik Prometheus"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            metrics.SQLITE_QUERY_DURATION.labels(_statement_label(sql)).observe(time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            metrics.SQLITE_QUERY_DURATION.labels(_statement_label(sql)).observe(time.perf_counter() - start)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            metrics.SQLITE_QUERY_DURATION.labels('COMMIT').observe(time.perf_counter() - start)
+
+
+# Satu koneksi per thread; registry lemah agar bisa ditutup semua saat worker berhenti
+_local = threading.local()
+_connections = weakref.WeakSet()
+_connections_lock = threading.Lock()
+# Naik setiap close_all_connections; thread dengan koneksi generasi lama membuka ulang
+_generation = 0
+_dir_ready = False
+
 
 def get_db_connection():
-    """Create database connection"""
-    os.makedirs(os.path.dirname(Config.DATABASE_PATH), exist_ok=True)
-    
-    conn = sqlite3.connect(Config.DATABASE_PATH)
+    """Create database connection (koneksi baru, caller wajib menutupnya)"""
+    global _dir_ready
+    if not _dir_ready:
+        os.makedirs(os.path.dirname(Config.DATABASE_PATH), exist_ok=True)
+        _dir_ready = True
+
+    # Factory biasa jika metrik nonaktif agar query tidak menanggung overhead
+    factory = InstrumentedConnection if metrics.ENABLED else PooledConnection
+    conn = sqlite3.connect(
+        Config.DATABASE_PATH,
+        timeout=Config.DATABASE_BUSY_TIMEOUT,
+        cached_statements=Config.DATABASE_STATEMENT_CACHE,
+        # Ditutup dari thread lain oleh close_all_connections, tidak pernah dipakai bersama
+        check_same_thread=False,
+        factory=factory,
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
     return conn
 
+
+def _thread_connection():
+    conn = getattr(_local, 'conn', None)
+    # Koneksi warisan fork tidak boleh dipakai di proses anak
+    if conn is None or _local.pid != os.getpid() or _local.generation != _generation:
+        conn = get_db_connection()
+        _local.conn = conn
+        _local.pid = os.getpid()
+        _local.generation = _generation
+        with _connections_lock:
+            _connections.add(conn)
+    return conn
+
+
+@contextmanager
+def db_connection():
+    """Koneksi SQLite thread-local yang dipakai ulang (prepared statement tetap di-cache).
+
+    Transaksi yang belum di-commit saat blok selesai (mis. karena exception)
+    di-rollback agar lock tulis tidak tertahan di koneksi milik thread ini.
+    """
+    conn = _thread_connection()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+
+
+def data_version():
+    """Token perubahan database: (koneksi thread ini, PRAGMA data_version).
+
+    ``data_version`` hanya berubah jika koneksi lain (thread atau proses worker lain)
+    melakukan commit, sehingga cache in-memory bisa melewati query validasi selama
+    token-nya sama.
+    """
+    with db_connection() as conn:
+        return id(conn), conn.execute('PRAGMA data_version').fetchone()[0]
+
+
+class ChangeMonitor:
+    """Penanda validitas cache in-memory yang bersumber dari database.
+
+    ``invalidate()`` dipanggil untuk perubahan dari proses ini (commit di thread
+    sendiri tidak mengubah ``data_version``); ``changed()`` mendeteksi commit dari
+    koneksi lain, paling sering sekali per ``check_interval`` detik per thread.
+    """
+
+    def __init__(self, check_interval=1.0):
+        self.check_interval = check_interval
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+
+    def changed(self):
+        local = self._local
+        now = time.monotonic()
+        if now < getattr(local, 'next_check', 0.0):
+            return False
+        local.next_check = now + self.check_interval
+        token = data_version()
+        if token == getattr(local, 'token', None):
+            return False
+        local.token = token
+        return True
+
+
+def get_meta_value(key, default=0):
+    with db_connection() as conn:
+        row = conn.execute('SELECT value FROM app_meta WHERE key = ?', (key,)).fetchone()
+    return row['value'] if row else default
+
+
+def set_meta_value(key, value):
+    with db_connection() as conn:
+        conn.execute(
+            'INSERT INTO app_meta (key, value) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value=excluded.value',
+            (key, value)
+        )
+        conn.commit()
+
+
+def close_all_connections():
+    """Tutup semua koneksi pool (saat worker/proses berhenti)"""
+    global _generation
+    with _connections_lock:
+        _generation += 1
+        connections = list(_connections)
+        _connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            continue
+
+
+atexit.register(close_all_connections)
+
 def init_db():
     """Initialize database tables"""
     conn = get_db_connection()
@@ -114,33 +282,76 @@ def init_db():
     if "gnmi_verify_ssl" not in existing:
         conn.execute("ALTER TABLE juniper_devices ADD COLUMN gnmi_verify_ssl BOOLEAN DEFAULT 0")
 
+    # Snapshot terakhir hasil collector (satu baris per device per jenis data)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS device_snapshots (
+            device_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            payload TEXT,
+            collected_at REAL,
+            attempted_at REAL NOT NULL,
+            duration_ms INTEGER,
+            error TEXT,
+            peers_down INTEGER,
+            PRIMARY KEY (device_id, kind)
+        )
+    ''')
+    # --- Jumlah BGP peer down (snapshot bgp_summary) untuk statistik dashboard
+    columns = conn.execute("PRAGMA table_info(device_snapshots)").fetchall()
+    if "peers_down" not in {col["name"] for col in columns}:
+        conn.execute("ALTER TABLE device_snapshots ADD COLUMN peers_down INTEGER")
+
+    # Rollup traffic interface per bucket waktu (jumlah & maksimum agar bisa diagregasi ulang)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS traffic_rollups (
+            device_key TEXT NOT NULL,
+            interface TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            samples INTEGER NOT NULL,
+            in_rate_sum REAL NOT NULL,
+            in_rate_max REAL NOT NULL,
+            out_rate_sum REAL NOT NULL,
+            out_rate_max REAL NOT NULL,
+            in_pps_sum REAL NOT NULL,
+            out_pps_sum REAL NOT NULL,
+            PRIMARY KEY (device_key, interface, bucket)
+        )
+    ''')
+
+    # Versi data per entitas; dinaikkan setiap perubahan agar cache di semua worker tahu harus reload
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS app_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO app_meta (key, value) VALUES ('devices_version', 0)")
+    conn.execute("INSERT OR IGNORE INTO app_meta (key, value) VALUES ('gnmi_streams_active', 0)")
 
     conn.commit()
     conn.close()
     print("✅ Database initialized successfully!")
 
 def get_database_stats():
-    """Mendapatkan statistik database"""
-    conn = get_db_connection()
-    
-    stats = {}
-    
-    # User stats
-    user_count = conn.execute('SELECT COUNT(*) as count FROM users WHERE is_active=1').fetchone()
-    stats['active_users'] = user_count['count'] if user_count else 0
-    
-    # Device stats
-    device_count = conn.execute('SELECT COUNT(*) as count FROM juniper_devices').fetchone()
-    stats['active_devices'] = device_count['count'] if device_count else 0
-    
-    # Total records
-    total_users = conn.execute('SELECT COUNT(*) as count FROM users').fetchone()
-    stats['total_users'] = total_users['count'] if total_users else 0
-    
-    total_devices = conn.execute('SELECT COUNT(*) as count FROM juniper_devices').fetchone()
-    stats['total_devices'] = total_devices['count'] if total_devices else 0
-    
-    conn.close()
+    """Mendapatkan statistik database dan counter fleet dalam satu query"""
+    with db_connection() as conn:
+        row = conn.execute('''
+            SELECT
+                (SELECT COUNT(*) FROM users WHERE is_active = 1) AS active_users,
+                (SELECT COUNT(*) FROM users) AS total_users,
+                (SELECT COUNT(*) FROM juniper_devices) AS total_devices,
+                (SELECT COUNT(*) FROM device_snapshots
+                    WHERE kind = 'system_info' AND error IS NULL AND collected_at IS NOT NULL) AS devices_up,
+                (SELECT COUNT(*) FROM device_snapshots
+                    WHERE kind = 'system_info' AND error IS NOT NULL) AS devices_down,
+                (SELECT COALESCE(SUM(peers_down), 0) FROM device_snapshots
+                    WHERE kind = 'bgp_summary') AS bgp_peers_down,
+                (SELECT COALESCE(MAX(value), 0) FROM app_meta
+                    WHERE key = 'gnmi_streams_active') AS streams_active
+        ''').fetchone()
+
+    stats = dict(row)
+    stats['active_devices'] = stats['total_devices']
     return stats
 
 def backup_database():
@@ -148,7 +359,14 @@ def backup_database():
     try:
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_file = f"users_backup_{timestamp}.db"
-        shutil.copy2(Config.DATABASE_PATH, backup_file)
+        # Backup API SQLite: isi WAL yang belum di-checkpoint ikut tersalin
+        source = get_db_connection()
+        target = sqlite3.connect(backup_file)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
         return True, f"Backup berhasil: {backup_file}"
     except Exception as e:
         return False, f"Backup gagal: {str(e)}"
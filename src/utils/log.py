@@ -0,0 +1,163 @@
+"""Logger per subsistem dan capture payload debug response REST.
+
+``get_logger('api')`` mengembalikan logger ``junos_ui.api``. Pesan memakai argumen
+``%s`` (format lazy), sehingga string hanya dibentuk jika level tersebut aktif.
+Level global diatur ``LOG_LEVEL``, per subsistem lewat ``LOG_LEVELS``
+(mis. ``api=DEBUG,collector=WARNING``).
+
+Capture payload (``DEBUG_CAPTURE_ENABLED``) menyimpan body response mentah per
+device di ring buffer, disampling dan dibatasi per menit. Jika nonaktif,
+``payload_capture.wrap`` mengembalikan iterable chunk asli tanpa biaya tambahan.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+from config import Config
+
+ROOT_LOGGER = 'junos_ui'
+_LOG_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+_configured = False
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+def _parse_level(value: str, default: int) -> int:
+    level = logging.getLevelName(value.strip().upper())
+    return level if isinstance(level, int) else default
+
+
+def configure_logging():
+    """Pasang level dan handler logger aplikasi (sekali per proses)"""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(_parse_level(Config.LOG_LEVEL, logging.INFO))
+    # Handler sendiri hanya jika logging belum dikonfigurasi (mis. oleh CLI broker)
+    if not logging.getLogger().handlers and not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(_LOG_FORMAT))
+        root.addHandler(handler)
+        root.propagate = False
+
+    for item in Config.LOG_LEVELS.split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            get_logger(name.strip()).setLevel(_parse_level(level, logging.NOTSET))
+
+
+logger = get_logger('capture')
+
+
+class PayloadCapture:
+    """Ring buffer response REST mentah terakhir per device.
+
+    Setiap response lolos sampling dengan peluang ``sample_rate`` lalu dibatasi
+    token bucket ``per_minute`` per device; body dipotong ke ``max_bytes``.
+    """
+
+    def __init__(self, enabled: bool, ring_size: int = 20, max_bytes: int = 65536,
+                 per_minute: int = 30, sample_rate: float = 1.0):
+        self.enabled = enabled and ring_size > 0
+        self.ring_size = ring_size
+        self.max_bytes = max_bytes
+        self.per_minute = per_minute
+        self.sample_rate = sample_rate
+        self._rings: Dict[str, Deque[Dict]] = {}
+        # Token bucket per device: (token tersisa, waktu isi ulang terakhir)
+        self._buckets: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _admit(self, device: str) -> bool:
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return False
+        if self.per_minute <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(device, (float(self.per_minute), now))
+            tokens = min(float(self.per_minute), tokens + (now - last) * self.per_minute / 60.0)
+            if tokens < 1:
+                self._buckets[device] = (tokens, now)
+                return False
+            self._buckets[device] = (tokens - 1, now)
+            return True
+
+    def wrap(self, device: str, rpc: str, response, chunks: Iterable[bytes]) -> Iterable[bytes]:
+        """Salin awal body sambil chunk dibaca parser; iterable asli jika tidak di-capture"""
+        if not self.enabled or not self._admit(device):
+            return chunks
+        return self._tee(device, rpc, response, chunks)
+
+    def _tee(self, device: str, rpc: str, response, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        head = bytearray()
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                if len(head) < self.max_bytes:
+                    head += chunk[:self.max_bytes - len(head)]
+                yield chunk
+        finally:
+            self.record(device, rpc, response.status_code, response.headers.get('Content-Type'), bytes(head), size)
+
+    def capture_response(self, device: str, rpc: str, response):
+        """Capture response yang body-nya sudah dibaca (mis. status error)"""
+        if not self.enabled or not self._admit(device):
+            return
+        body = response.content or b''
+        self.record(device, rpc, response.status_code, response.headers.get('Content-Type'),
+                    body[:self.max_bytes], len(body))
+
+    def record(self, device: str, rpc: str, status: Optional[int], content_type: Optional[str],
+               body: bytes, size: int):
+        text = body.decode('utf-8', errors='replace')
+        entry = {
+            'time': time.time(),
+            'rpc': rpc,
+            'status': status,
+            'content_type': content_type,
+            'size': size,
+            'truncated': size > len(body),
+            'body': text,
+        }
+        with self._lock:
+            ring = self._rings.get(device)
+            if ring is None:
+                ring = self._rings[device] = deque(maxlen=self.ring_size)
+            ring.append(entry)
+        logger.debug("%s %s status=%s %d byte: %.500s", device, rpc, status, size, text)
+
+    def entries(self, device: str, limit: Optional[int] = None) -> List[Dict]:
+        """Response ter-capture untuk device, terbaru lebih dulu"""
+        with self._lock:
+            items = list(self._rings.get(device, ()))
+        items.reverse()
+        return items[:limit] if limit else items
+
+    def clear(self, device: Optional[str] = None) -> int:
+        with self._lock:
+            if device is None:
+                count = sum(len(ring) for ring in self._rings.values())
+                self._rings.clear()
+                return count
+            ring = self._rings.pop(device, None)
+            return len(ring) if ring else 0
+
+
+# Dipakai bersama semua JuniperAPI dalam proses ini
+payload_capture = PayloadCapture(
+    Config.DEBUG_CAPTURE_ENABLED,
+    ring_size=Config.DEBUG_CAPTURE_RING_SIZE,
+    max_bytes=Config.DEBUG_CAPTURE_MAX_BYTES,
+    per_minute=Config.DEBUG_CAPTURE_PER_MINUTE,
+    sample_rate=Config.DEBUG_CAPTURE_SAMPLE_RATE,
+)
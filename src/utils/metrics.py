@@ -0,0 +1,218 @@
+"""Metrik internal aplikasi dalam format Prometheus (``/metrics``).
+
+``prometheus_client`` opsional: tanpa library (atau METRICS_ENABLED=false) semua
+metrik adalah objek no-op dan decorator mengembalikan fungsi aslinya, sehingga
+jalur panas tidak menanggung biaya apa pun.
+
+Dengan gunicorn multi-worker (atau telemetry broker terpisah), set
+``PROMETHEUS_MULTIPROC_DIR`` ke direktori kosong sebelum proses dijalankan;
+setiap proses menulis nilai ke file mmap di sana dan ``/metrics`` menggabungkannya.
+"""
+import functools
+import inspect
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Tuple
+
+from config import Config
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+    HAS_PROMETHEUS = True
+except ImportError:  # pragma: no cover - prometheus_client opsional
+    HAS_PROMETHEUS = False
+    CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+ENABLED = HAS_PROMETHEUS and Config.METRICS_ENABLED
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_FAST_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+
+class _NoopMetric:
+    """Pengganti metrik ketika Prometheus tidak aktif"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, amount):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+
+_NOOP = _NoopMetric()
+
+
+def _metric(kind: str, name: str, documentation: str, labelnames=(), **kwargs):
+    if not ENABLED:
+        return _NOOP
+    factory = {'counter': Counter, 'gauge': Gauge, 'histogram': Histogram}[kind]
+    return factory(name, documentation, labelnames, **kwargs)
+
+
+# REST API Junos (per method JuniperAPI)
+RPC_DURATION = _metric(
+    'histogram', 'junos_ui_rpc_duration_seconds',
+    'Durasi RPC REST Junos per method JuniperAPI', ('rpc', 'outcome'), buckets=_LATENCY_BUCKETS,
+)
+RPC_RESPONSE_BYTES = _metric(
+    'counter', 'junos_ui_rpc_response_bytes',
+    'Byte body response REST Junos yang diterima', ('rpc',),
+)
+JSON_PARSE_DURATION = _metric(
+    'histogram', 'junos_ui_json_parse_seconds',
+    'Waktu decode JSON response REST Junos', ('rpc',), buckets=_FAST_BUCKETS,
+)
+
+# gNMI (per device ip:port)
+GNMI_NOTIFICATIONS = _metric(
+    'counter', 'junos_ui_gnmi_notifications',
+    'Notifikasi gNMI yang diproses', ('device',),
+)
+GNMI_DECODE_DURATION = _metric(
+    'histogram', 'junos_ui_gnmi_decode_seconds',
+    'Waktu decode + hitung rate satu notifikasi gNMI', ('device',), buckets=_FAST_BUCKETS,
+)
+GNMI_DELIVERY_LATENCY = _metric(
+    'histogram', 'junos_ui_gnmi_delivery_latency_seconds',
+    'Latency pengiriman notifikasi gNMI (setelah koreksi offset jam)', ('device',), buckets=_LATENCY_BUCKETS,
+)
+QUEUE_DEPTH = _metric(
+    'gauge', 'junos_ui_gnmi_queue_depth',
+    'Item yang menunggu diproses (aio: response gNMI, subscriber: update SSE)', ('queue',),
+    multiprocess_mode='livesum',
+)
+
+# SQLite
+SQLITE_QUERY_DURATION = _metric(
+    'histogram', 'junos_ui_sqlite_query_seconds',
+    'Durasi statement SQLite', ('statement',), buckets=_FAST_BUCKETS,
+)
+
+def timed_rpc(rpc: str):
+    """Decorator method JuniperAPI: durasi per RPC, outcome ``ok`` bila hasilnya ``(True, ...)``.
+
+    Berlaku juga untuk coroutine (AsyncJuniperAPI); durasi dihitung sampai coroutine selesai.
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        histogram = RPC_DURATION
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                outcome = 'error'
+                try:
+                    result = await func(*args, **kwargs)
+                    if isinstance(result, tuple) and result and result[0]:
+                        outcome = 'ok'
+                    return result
+                finally:
+                    histogram.labels(rpc, outcome).observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = func(*args, **kwargs)
+                if isinstance(result, tuple) and result and result[0]:
+                    outcome = 'ok'
+                return result
+            finally:
+                histogram.labels(rpc, outcome).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count_bytes(chunks: Iterable[bytes], rpc: str) -> Iterable[bytes]:
+    """Hitung byte chunk response yang lewat (iterable asli jika metrik nonaktif)"""
+    if not ENABLED:
+        return chunks
+    return _counted(chunks, RPC_RESPONSE_BYTES.labels(rpc))
+
+
+def _counted(chunks: Iterable[bytes], counter) -> Iterator[bytes]:
+    total = 0
+    try:
+        for chunk in chunks:
+            total += len(chunk)
+            yield chunk
+    finally:
+        counter.inc(total)
+
+
+def timed_loads(loads, rpc: str):
+    """Bungkus fungsi decode JSON agar waktunya tercatat per RPC"""
+    if not ENABLED:
+        return loads
+    histogram = JSON_PARSE_DURATION.labels(rpc)
+
+    def _loads(data):
+        start = time.perf_counter()
+        try:
+            return loads(data)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return _loads
+
+
+@contextmanager
+def timer(histogram, *labels):
+    """Context manager pencatat durasi ke histogram berlabel"""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(*labels).observe(time.perf_counter() - start)
+
+
+def gnmi_device_metrics(device: str) -> Tuple:
+    """Child metrik (notifikasi, decode, latency) untuk satu device, dibuat sekali per client"""
+    return (
+        GNMI_NOTIFICATIONS.labels(device),
+        GNMI_DECODE_DURATION.labels(device),
+        GNMI_DELIVERY_LATENCY.labels(device),
+    )
+
+
+def multiprocess_dir() -> str:
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR') or os.environ.get('prometheus_multiproc_dir') or ''
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Eksposisi teks Prometheus (gabungan semua proses dalam mode multiprocess)"""
+    if not ENABLED:
+        return b'', CONTENT_TYPE_LATEST
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
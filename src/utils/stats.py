@@ -0,0 +1,52 @@
+"""Statistik dashboard (user, device, dan counter fleet) yang di-cache di memori.
+
+Semua angka dihitung oleh satu query (``get_database_stats``). Hasilnya dipakai
+ulang sampai user/device diubah dari proses ini atau ada commit dari koneksi
+lain (collector, telemetry broker, worker lain), sehingga render halaman tidak
+menanggung query sama sekali.
+
+Counter fleet dimaterialisasi oleh pemilik datanya: collector menyimpan jumlah
+BGP peer down di setiap snapshot ``bgp_summary`` dan status up/down device dari
+snapshot ``system_info``; pemilik stream gNMI menulis jumlah stream aktif ke
+``app_meta``.
+"""
+from typing import Dict, Optional
+
+from config import Config
+from src.models.device import on_device_change
+from src.models.user import on_user_change
+from src.utils.database import ChangeMonitor, get_database_stats
+
+
+class StatsService:
+    def __init__(self, check_interval: float = 1.0):
+        self.monitor = ChangeMonitor(check_interval)
+        self._stats: Optional[Dict] = None
+        self._loaded_generation = -1
+
+    def invalidate(self):
+        self.monitor.invalidate()
+
+    def get(self) -> Dict:
+        if self.monitor.changed() or self._stats is None or self._loaded_generation != self.monitor.generation:
+            generation = self.monitor.generation
+            self._stats = get_database_stats()
+            self._loaded_generation = generation
+        return dict(self._stats)
+
+
+stats_service = StatsService(Config.STATS_CHECK_INTERVAL)
+
+
+@on_device_change
+def _on_device_changed(device_id, ip_addresses):
+    stats_service.invalidate()
+
+
+@on_user_change
+def _on_user_changed(user_id):
+    stats_service.invalidate()
+
+
+def get_stats() -> Dict:
+    return stats_service.get()
@@ -8,6 +8,8 @@
     const state = {
         isMonitoring: false,
         timerId: null,
+        chartTimerId: null,
+        eventSource: null,
         currentFilter: 'all',
         updateIntervalMs: 10000,
         trafficData: {},
@@ -25,6 +27,7 @@
     function init() {
         elements.interfaceSelect = document.getElementById('interfaceSelect');
         elements.intervalSelect = document.getElementById('intervalSelect');
+        elements.subinterfaceCheck = document.getElementById('subinterfaceCheck');
         elements.viewSelect = document.getElementById('viewSelect');
         elements.startBtn = document.getElementById('startBtn');
         elements.stopBtn = document.getElementById('stopBtn');
@@ -49,6 +52,7 @@
 
         loadInterfaces();
         initializeCharts();
+        loadHistory();
         applyView(elements.viewSelect.value);
         setStatus('Ready to start monitoring');
     }
@@ -115,6 +119,7 @@
                 body: JSON.stringify({
                     interface: state.currentFilter,
                     interval_seconds: intervalSeconds,
+                    include_subinterfaces: Boolean(elements.subinterfaceCheck && elements.subinterfaceCheck.checked),
                 }),
             });
 
@@ -124,8 +129,11 @@
             }
 
             state.isMonitoring = true;
-            scheduleUpdates();
-            await updateTrafficData();
+            await loadHistory();
+            if (!startStream()) {
+                scheduleUpdates();
+                await updateTrafficData();
+            }
             setStatus(data.message || 'Monitoring started');
         } catch (error) {
             console.error('Unable to start monitoring:', error);
@@ -139,6 +147,7 @@
             return;
         }
 
+        stopStream();
         clearInterval(state.timerId);
         state.timerId = null;
         state.isMonitoring = false;
@@ -157,6 +166,74 @@
         }
     }
 
+    function startStream() {
+        if (!config.endpoints.stream || typeof EventSource === 'undefined') {
+            return false;
+        }
+
+        const url = new URL(config.endpoints.stream, window.location.origin);
+        url.searchParams.set('interface', state.currentFilter || 'all');
+
+        const source = new EventSource(url);
+        state.eventSource = source;
+
+        source.addEventListener('snapshot', event => {
+            const data = JSON.parse(event.data);
+            state.trafficData = data.traffic || {};
+            renderTraffic();
+        });
+        source.addEventListener('traffic', event => {
+            const data = JSON.parse(event.data);
+            Object.assign(state.trafficData, data.traffic || {});
+            renderTraffic();
+        });
+        // Server menutup stream secara berkala; buka lagi tanpa jatuh ke polling
+        source.addEventListener('reconnect', () => {
+            stopStream();
+            if (state.isMonitoring) {
+                startStream();
+            }
+        });
+        source.addEventListener('end', event => {
+            const data = JSON.parse(event.data);
+            stopStream();
+            state.isMonitoring = false;
+            toggleButtons(false);
+            setStatus(data.message || 'Monitoring stopped');
+        });
+        source.onerror = () => {
+            // Stream tidak tersedia (mis. batas client tercapai): kembali ke polling
+            if (state.eventSource !== source) {
+                return;
+            }
+            stopStream();
+            if (state.isMonitoring) {
+                console.warn('Traffic stream unavailable, falling back to polling');
+                scheduleUpdates();
+            }
+        };
+
+        // Grafik tetap bertambah satu titik per interval, bukan per event
+        clearInterval(state.chartTimerId);
+        state.chartTimerId = setInterval(updateCharts, state.updateIntervalMs);
+        return true;
+    }
+
+    function stopStream() {
+        if (state.eventSource) {
+            state.eventSource.close();
+            state.eventSource = null;
+        }
+        clearInterval(state.chartTimerId);
+        state.chartTimerId = null;
+    }
+
+    function renderTraffic() {
+        elements.lastUpdate.textContent = `Last update: ${new Date().toLocaleTimeString()}`;
+        updateTrafficTable();
+        updateSummaryStats();
+    }
+
     function scheduleUpdates() {
         clearInterval(state.timerId);
         state.timerId = setInterval(() => {
@@ -186,6 +263,54 @@
         updateCharts();
     }
 
+    async function loadHistory() {
+        if (!config.endpoints.history || !charts.traffic || !charts.packets) {
+            return;
+        }
+
+        const stepSeconds = Math.max(Math.round(state.updateIntervalMs / 1000), 1);
+        const to = Date.now() / 1000;
+        const url = new URL(config.endpoints.history, window.location.origin);
+        url.searchParams.set('interface', state.currentFilter || 'all');
+        url.searchParams.set('from', Math.floor(to - stepSeconds * state.maxChartPoints));
+        url.searchParams.set('to', Math.ceil(to));
+        url.searchParams.set('step', stepSeconds);
+
+        try {
+            const response = await fetch(url);
+            const data = await response.json();
+            if (!data.success) {
+                return;
+            }
+
+            // Jumlahkan semua interface per timestamp (sama seperti total pada grafik live)
+            const totals = new Map();
+            Object.values(data.interfaces || {}).forEach(series => {
+                series.t.forEach((t, index) => {
+                    const point = totals.get(t) || [0, 0, 0, 0];
+                    point[0] += series.in_rate[index] || 0;
+                    point[1] += series.out_rate[index] || 0;
+                    point[2] += series.in_pps[index] || 0;
+                    point[3] += series.out_pps[index] || 0;
+                    totals.set(t, point);
+                });
+            });
+
+            const points = [...totals.entries()].sort((a, b) => a[0] - b[0]).slice(-state.maxChartPoints);
+            [charts.traffic, charts.packets].forEach(chart => {
+                chart.data.labels = [];
+                chart.data.datasets.forEach(dataset => { dataset.data = []; });
+            });
+            points.forEach(([t, [inRate, outRate, inPps, outPps]]) => {
+                const label = new Date(t * 1000).toLocaleTimeString();
+                pushChartData(charts.traffic, label, [inRate / 1_000_000, outRate / 1_000_000]);
+                pushChartData(charts.packets, label, [inPps, outPps]);
+            });
+        } catch (error) {
+            console.warn('Unable to load traffic history:', error);
+        }
+    }
+
     function updateTrafficTable() {
         const tbody = elements.trafficTableBody;
         if (!tbody) {